@@ -0,0 +1,67 @@
+"""
+Management command to rebuild visitor session totals from recorded page views.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Min
+
+from analytics.models import PageView, VisitorSession
+from utils.bulk_operations import DEFAULT_BATCH_SIZE, bulk_upsert
+
+
+class Command(BaseCommand):
+    """Recompute VisitorSession page view counts and durations."""
+
+    help = (
+        'Recomputes page_views_count and duration_seconds for every visitor session from '
+        'PageView rows, creating sessions that are missing. Safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Sessions per upsert statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def iter_sessions(self, batch_size):
+        """Yield unsaved sessions with recomputed totals, walking session ids in keyset order."""
+        totals = (
+            PageView.objects.exclude(session_id='')
+            .values('session_id')
+            .annotate(views=Count('id'), first=Min('viewed_at'), last=Max('viewed_at'))
+            .order_by('session_id')
+        )
+        last_session_id = None
+        while True:
+            chunk_qs = totals if last_session_id is None else totals.filter(session_id__gt=last_session_id)
+            chunk = list(chunk_qs[:batch_size])
+            if not chunk:
+                return
+            last_session_id = chunk[-1]['session_id']
+            for row in chunk:
+                yield VisitorSession(
+                    session_id=row['session_id'],
+                    page_views_count=row['views'],
+                    duration_seconds=int((row['last'] - row['first']).total_seconds()),
+                )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        batch_size = options['batch_size']
+
+        def report(stats):
+            self.stdout.write(f"  {stats.rows} sessions ({stats.rows_per_second:.0f}/s)")
+
+        self.stdout.write('Backfilling visitor sessions from page views...')
+        stats = bulk_upsert(
+            VisitorSession,
+            self.iter_sessions(batch_size),
+            unique_fields=['session_id'],
+            update_fields=['page_views_count', 'duration_seconds'],
+            batch_size=batch_size,
+            progress=report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {stats.rows} sessions in {stats.batches} batches ({stats.elapsed:.1f}s)"
+        ))
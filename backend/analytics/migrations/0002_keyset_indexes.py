@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0001_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pageview",
+            name="analytics_p_viewed__863699_idx",
+        ),
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="analytics_a_created_b773c1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pageview",
+            index=models.Index(
+                fields=["-viewed_at", "-id"], name="analytics_p_viewed__f84aff_idx"
+            ),
+        ),
+    ]
@@ -17,7 +17,7 @@ class PageView(models.Model):
         ordering = ['-viewed_at']
         indexes = [
             models.Index(fields=['page_path', '-viewed_at']),
-            models.Index(fields=['-viewed_at']),
+            models.Index(fields=['-viewed_at', '-id']),  # keyset pagination
             models.Index(fields=['session_id']),
         ]
 
@@ -64,4 +64,5 @@ class ActivityLog(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['activity_type', '-created_at']),
+            models.Index(fields=['-created_at', '-id']),  # keyset pagination
         ]
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import ActivityLog
+from .models import ActivityLog, PageView
 from .utils import get_activity_icon
 
 
@@ -43,3 +43,19 @@ class ActivityLogSerializer(serializers.ModelSerializer):
     def get_icon(self, obj):
         return get_activity_icon(obj.activity_type)
 
+
+
+class PageViewSerializer(serializers.ModelSerializer):
+    """API representation for raw page views."""
+
+    class Meta:
+        model = PageView
+        fields = [
+            'id',
+            'page_path',
+            'page_title',
+            'referrer',
+            'session_id',
+            'ip_address',
+            'viewed_at',
+        ]
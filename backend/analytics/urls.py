@@ -9,6 +9,7 @@ urlpatterns = [
     path('dashboard/vehicle-usage/', views.vehicle_usage, name='vehicle_usage'),
     path('dashboard/recent-activity/', views.recent_activity, name='recent_activity'),
     path('dashboard/activity-log/', views.activity_log, name='activity_log'),
+    path('dashboard/page-views/', views.page_views, name='page_views'),
     path('dashboard/chatbot-stats/', views.chatbot_stats, name='chatbot_stats'),
     path('dashboard/web-overview/', views.web_analytics_overview, name='web_analytics_overview'),
 ]
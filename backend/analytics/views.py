@@ -1,5 +1,4 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Avg, Count, Q, Sum
@@ -16,14 +15,22 @@ from gallery.models import GalleryImage
 from faq.models import FAQ
 from inquiries.models import Inquiry
 from .models import PageView, ActivityLog, VisitorSession
-from .serializers import ActivityLogSerializer
+from .serializers import ActivityLogSerializer, PageViewSerializer
 from .utils import get_activity_icon
+from utils.pagination import KeysetPagination
 
 
-class ActivityLogPagination(PageNumberPagination):
+class ActivityLogPagination(KeysetPagination):
     page_size = 25
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+    serializer_class = ActivityLogSerializer
+    # Read by the serializer's method fields
+    only_extra_fields = ('user', 'activity_type')
+
+
+class PageViewPagination(KeysetPagination):
+    page_size = 50
+    ordering = ('-viewed_at', '-id')
+    serializer_class = PageViewSerializer
 
 
 def _safe_percentage(value: int | float, total: int | float) -> float:
@@ -210,6 +217,28 @@ def activity_log(request):
     return paginator.get_paginated_response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def page_views(request):
+    """Return raw page views, newest first, with optional path/session filters."""
+    queryset = PageView.objects.all()
+
+    page_path = request.query_params.get('path')
+    session_id = request.query_params.get('session')
+
+    if page_path:
+        queryset = queryset.filter(page_path=page_path)
+
+    if session_id:
+        queryset = queryset.filter(session_id=session_id)
+
+    paginator = PageViewPagination()
+    paginated_queryset = paginator.paginate_queryset(queryset, request)
+    serializer = PageViewSerializer(paginated_queryset, many=True)
+
+    return paginator.get_paginated_response(serializer.data)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def web_analytics_overview(request):
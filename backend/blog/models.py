@@ -16,6 +16,8 @@ class BlogPost(models.Model):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     featured_image = models.ImageField(upload_to='blog/', null=True, blank=True)
+    # Optimized copy and renditions written by utils.media_pipeline
+    featured_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     views = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 
+from utils.media_pipeline import rendition_urls
 from .models import BlogPost
 
 
 class BlogPostSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     featured_image_url = serializers.SerializerMethodField()
+    featured_image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
@@ -16,6 +18,9 @@ class BlogPostSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.featured_image.url)
         return None
 
+    def get_featured_image_renditions(self, obj):
+        return rendition_urls(obj.featured_image, obj.featured_image_renditions, self.context.get('request'))
+
 
 class BlogPostCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,12 +1,16 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
+from rest_framework.response import Response
 
 from .models import BlogPost
 from .serializers import BlogPostCreateSerializer, BlogPostSerializer
+from utils.cache import CachedListMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
+from utils.view_counter import record_view
 
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(CachedListMixin, viewsets.ModelViewSet):
+    cache_namespace = 'blog'
     queryset = BlogPost.objects.select_related('author')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status']
@@ -35,6 +39,8 @@ class BlogPostViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        return super().retrieve(request, *args, **kwargs)
+        if record_view(instance, request):
+            # Written behind by utils.view_counter; reflect this view in the response
+            instance.views += 1
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
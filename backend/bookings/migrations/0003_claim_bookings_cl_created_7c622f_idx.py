@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_add_indexes"),
+        ("vehicles", "0003_add_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="claim",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="bookings_cl_created_7c622f_idx"
+            ),
+        ),
+    ]
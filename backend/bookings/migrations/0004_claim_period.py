@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:40
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_claim_bookings_cl_created_7c622f_idx"),
+        ("vehicles", "0004_vehicle_image_renditions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="claim",
+            name="period",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        end_date__gte=models.F("start_date"),
+                        start_date__isnull=False,
+                        then=models.Func(
+                            models.F("start_date"),
+                            models.F("end_date"),
+                            models.Value("[]"),
+                            function="daterange",
+                        ),
+                    ),
+                    output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="claim",
+            index=django.contrib.postgres.indexes.GistIndex(
+                condition=models.Q(
+                    ("vehicle__isnull", False),
+                    models.Q(("status", "cancelled"), _negated=True),
+                ),
+                fields=["period"],
+                name="bookings_claim_period_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:37
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_claim_period"),
+    ]
+
+    operations = [
+        # Generated columns cannot be altered in place
+        migrations.RemoveIndex(
+            model_name="claim",
+            name="bookings_claim_period_idx",
+        ),
+        migrations.RemoveField(
+            model_name="claim",
+            name="period",
+        ),
+        migrations.AddField(
+            model_name="claim",
+            name="period",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        end_date__gte=models.F("start_date"),
+                        start_date__isnull=False,
+                        then=models.Func(
+                            models.F("start_date"),
+                            models.F("end_date"),
+                            models.Value("[]"),
+                            function="daterange",
+                        ),
+                    ),
+                    models.When(
+                        end_date__isnull=True,
+                        start_date__isnull=False,
+                        then=models.Func(
+                            models.F("start_date"),
+                            models.Value(None, output_field=models.DateField()),
+                            models.Value("[)"),
+                            function="daterange",
+                        ),
+                    ),
+                    output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="claim",
+            index=django.contrib.postgres.indexes.GistIndex(
+                condition=models.Q(
+                    ("vehicle__isnull", False),
+                    models.Q(("status", "cancelled"), _negated=True),
+                ),
+                fields=["period"],
+                name="bookings_claim_period_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,10 @@
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.models import Case, F, Func, Q, Value, When
+
+# Claims that hold their vehicle for their dates
+BLOCKING_CLAIMS = Q(vehicle__isnull=False) & ~Q(status='cancelled')
 
 class Claim(models.Model):
     STATUS_CHOICES = [
@@ -28,6 +34,26 @@ class Claim(models.Model):
     pickup_location = models.CharField(max_length=200)
     drop_location = models.CharField(max_length=200)
     notes = models.TextField(blank=True)
+    # Booked days as an inclusive daterange for overlap queries; open-ended (no end
+    # date yet) claims run from start_date on without bound; NULL without valid dates
+    period = models.GeneratedField(
+        expression=Case(
+            When(
+                start_date__isnull=False,
+                end_date__gte=F('start_date'),
+                then=Func(F('start_date'), F('end_date'), Value('[]'), function='daterange'),
+            ),
+            When(
+                start_date__isnull=False,
+                end_date__isnull=True,
+                then=Func(F('start_date'), Value(None, output_field=models.DateField()), Value('[)'),
+                          function='daterange'),
+            ),
+            output_field=DateRangeField(),
+        ),
+        output_field=DateRangeField(),
+        db_persist=True,
+    )
 
     # Status & Assignment
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -41,6 +67,10 @@ class Claim(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),  # keyset pagination
+            GistIndex(fields=['period'], name='bookings_claim_period_idx', condition=BLOCKING_CLAIMS),
+        ]
 
 class ClaimDocument(models.Model):
     claim = models.ForeignKey(Claim, on_delete=models.CASCADE, related_name='documents')
@@ -23,7 +23,7 @@ class ClaimSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Claim
-        fields = '__all__'
+        exclude = ['period']
 
     def get_vehicle_details(self, obj):
         if obj.vehicle:
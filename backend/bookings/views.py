@@ -6,6 +6,7 @@ from rest_framework.response import Response
 
 from .models import Claim
 from .serializers import ClaimSerializer, ClaimCreateSerializer
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdmin
 from utils.email import send_claim_confirmation
 
@@ -24,6 +25,7 @@ class ClaimViewSet(viewsets.ModelViewSet):
     queryset = Claim.objects.select_related('vehicle', 'assigned_staff').prefetch_related('documents')
     filter_backends = [DjangoFilterBackend]
     filterset_class = ClaimFilter
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
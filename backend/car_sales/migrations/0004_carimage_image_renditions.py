@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_sales", "0003_add_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carimage",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("car_sales", "0004_carimage_image_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CarListingFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("facet", models.CharField(max_length=20)),
+                ("value", models.CharField(max_length=100)),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="carlisting",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "make", "model", "description", config="english"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carlisting",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="car_sales_search_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="carlistingfacet",
+            constraint=models.UniqueConstraint(
+                fields=("facet", "value"), name="car_sales_facet_value_unique"
+            ),
+        ),
+    ]
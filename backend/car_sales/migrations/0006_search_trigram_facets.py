@@ -0,0 +1,97 @@
+"""
+Add trigram indexes for partial make/model matches and fill the facet counts.
+
+The ``make`` and ``model`` filters use ``icontains``, which PostgreSQL runs as
+``UPPER(col) LIKE UPPER('%term%')``; a trigram GIN index on ``UPPER(col)``
+serves that without a sequential scan. pg_trgm is optional: where the
+extension is not available or the role may not create it, the indexes are
+skipped and the filters keep working unindexed.
+"""
+from collections import Counter
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN insufficient_privilege THEN
+            RAISE NOTICE 'pg_trgm not installed: %', SQLERRM;
+        END;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS car_sales_make_trgm_idx
+            ON car_sales_carlisting USING gin (UPPER(make) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS car_sales_model_trgm_idx
+            ON car_sales_carlisting USING gin (UPPER(model) gin_trgm_ops);
+    END IF;
+END
+$$;
+"""
+
+
+# Facet buckets as defined when this migration was written (car_sales.search may change later)
+YEAR_BUCKETS = (
+    ('pre-2010', None, 2010),
+    ('2010-2014', 2010, 2015),
+    ('2015-2019', 2015, 2020),
+    ('2020-plus', 2020, None),
+)
+PRICE_BUCKETS = (
+    ('under-10k', None, 10000),
+    ('10k-20k', 10000, 20000),
+    ('20k-30k', 20000, 30000),
+    ('30k-50k', 30000, 50000),
+    ('50k-plus', 50000, None),
+)
+
+
+def _bucket(buckets, value):
+    if value is None:
+        return None
+    for key, low, high in buckets:
+        if (low is None or value >= low) and (high is None or value < high):
+            return key
+    return None
+
+
+def fill_facets(apps, schema_editor):
+    CarListing = apps.get_model('car_sales', 'CarListing')
+    CarListingFacet = apps.get_model('car_sales', 'CarListingFacet')
+    counts = Counter()
+    rows = CarListing.objects.filter(status='published').values_list(
+        'make', 'fuel_type', 'transmission', 'year', 'price'
+    )
+    for make, fuel_type, transmission, year, price in rows.iterator():
+        values = {
+            'make': make,
+            'fuel_type': fuel_type,
+            'transmission': transmission,
+            'year': _bucket(YEAR_BUCKETS, year),
+            'price': _bucket(PRICE_BUCKETS, price),
+        }
+        counts.update((facet, value) for facet, value in values.items() if value)
+    CarListingFacet.objects.all().delete()
+    CarListingFacet.objects.bulk_create(
+        CarListingFacet(facet=facet, value=value, count=count) for (facet, value), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('car_sales', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=TRIGRAM_INDEXES,
+            reverse_sql=[
+                "DROP INDEX IF EXISTS car_sales_make_trgm_idx;",
+                "DROP INDEX IF EXISTS car_sales_model_trgm_idx;",
+            ]
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 
@@ -46,17 +48,43 @@ class CarListing(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     sold_at = models.DateTimeField(null=True, blank=True)
+    # Full-text document for car_sales.search, kept current by PostgreSQL
+    search_vector = models.GeneratedField(
+        expression=SearchVector('make', 'model', 'description', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ['-featured', '-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='car_sales_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.make} {self.model} ({self.registration})"
 
 
+class CarListingFacet(models.Model):
+    """Number of published listings per facet value, maintained by car_sales.signals."""
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='car_sales_facet_value_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.count})"
+
+
 class CarImage(models.Model):
     car_listing = models.ForeignKey(CarListing, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='car_sales/images/')
+    # Optimized copy and renditions written by utils.media_pipeline
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     is_primary = models.BooleanField(default=False)
     alt_text = models.CharField(max_length=200, blank=True)
     order = models.IntegerField(default=0)
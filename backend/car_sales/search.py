@@ -0,0 +1,200 @@
+"""
+Full-text search and facet counts for car listings.
+
+Text queries run against ``CarListing.search_vector``, a generated tsvector
+over make, model and description with a GIN index. Facet counts for the
+published catalogue are kept in ``CarListingFacet`` and adjusted by
+``car_sales.signals`` on every save and delete, so the unfiltered counts cost
+one small query. Counts for a filtered result set are computed with a single
+conditional aggregate over that set.
+"""
+import re
+from collections import Counter
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import CarListing, CarListingFacet
+
+# Bucket key, inclusive lower bound, exclusive upper bound
+YEAR_BUCKETS: Tuple[Tuple[str, Optional[int], Optional[int]], ...] = (
+    ('pre-2010', None, 2010),
+    ('2010-2014', 2010, 2015),
+    ('2015-2019', 2015, 2020),
+    ('2020-plus', 2020, None),
+)
+PRICE_BUCKETS: Tuple[Tuple[str, Optional[int], Optional[int]], ...] = (
+    ('under-10k', None, 10000),
+    ('10k-20k', 10000, 20000),
+    ('20k-30k', 20000, 30000),
+    ('30k-50k', 30000, 50000),
+    ('50k-plus', 50000, None),
+)
+BUCKETS = {'year': YEAR_BUCKETS, 'price': PRICE_BUCKETS}
+CHOICES = {
+    'fuel_type': CarListing.FUEL_TYPE_CHOICES,
+    'transmission': CarListing.TRANSMISSION_CHOICES,
+}
+FACETS = ('make', 'fuel_type', 'transmission', 'year', 'price')
+
+# Only published listings are searchable, so only they are counted
+SEARCHABLE = Q(status='published')
+
+_TERM = re.compile(r'\w+')
+
+
+def bucket_for(buckets, value) -> Optional[str]:
+    if value is None:
+        return None
+    for key, low, high in buckets:
+        if (low is None or value >= low) and (high is None or value < high):
+            return key
+    return None
+
+
+def bucket_filter(field: str, key: str) -> Optional[Q]:
+    """Q selecting rows in bucket ``key`` of ``field`` ('year' or 'price'), or None if unknown."""
+    for bucket, low, high in BUCKETS[field]:
+        if bucket == key:
+            q = Q()
+            if low is not None:
+                q &= Q(**{f'{field}__gte': low})
+            if high is not None:
+                q &= Q(**{f'{field}__lt': high})
+            return q
+    return None
+
+
+def facet_values(row: Dict[str, Any]) -> Dict[str, str]:
+    """Facet value per facet for one listing's field values; empty unless published."""
+    if row.get('status') != 'published':
+        return {}
+    values = {
+        'make': row['make'],
+        'fuel_type': row['fuel_type'],
+        'transmission': row['transmission'],
+        'year': bucket_for(YEAR_BUCKETS, row['year']),
+        'price': bucket_for(PRICE_BUCKETS, Decimal(row['price']) if row['price'] is not None else None),
+    }
+    return {facet: value for facet, value in values.items() if value}
+
+
+FACET_SOURCE_FIELDS = ('status', 'make', 'fuel_type', 'transmission', 'year', 'price')
+
+
+def _increment(facet: str, value: str, delta: int) -> None:
+    rows = CarListingFacet.objects.filter(facet=facet, value=value)
+    if rows.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            CarListingFacet.objects.create(facet=facet, value=value, count=delta)
+    except IntegrityError:
+        # Created concurrently; apply the delta to that row
+        rows.update(count=F('count') + delta)
+
+
+def apply_facet_change(old: Dict[str, str], new: Dict[str, str]) -> None:
+    """Move one listing's contribution from its ``old`` facet values to its ``new`` ones."""
+    for facet in FACETS:
+        before, after = old.get(facet), new.get(facet)
+        if before == after:
+            continue
+        if before:
+            _increment(facet, before, -1)
+        if after:
+            _increment(facet, after, 1)
+
+
+def compute_facet_counts(rows: Iterable[Dict[str, Any]]) -> Counter:
+    """Count (facet, value) pairs over listing field values."""
+    counts: Counter = Counter()
+    for row in rows:
+        counts.update(facet_values(row).items())
+    return counts
+
+
+@transaction.atomic
+def rebuild_facets() -> int:
+    """
+    Recount every facet from the listings table.
+
+    Use after bulk changes that bypass signals (``QuerySet.update()``, raw SQL).
+
+    Returns:
+        Number of facet rows written
+    """
+    counts = compute_facet_counts(
+        CarListing.objects.filter(SEARCHABLE).values(*FACET_SOURCE_FIELDS).iterator()
+    )
+    CarListingFacet.objects.all().delete()
+    CarListingFacet.objects.bulk_create(
+        CarListingFacet(facet=facet, value=value, count=count) for (facet, value), count in counts.items()
+    )
+    return len(counts)
+
+
+def _ordered(facet: str, counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    if facet in BUCKETS:
+        order = [key for key, _, _ in BUCKETS[facet]]
+    elif facet in CHOICES:
+        order = [key for key, _ in CHOICES[facet]]
+    else:
+        order = sorted(counts, key=lambda value: (-counts[value], value.lower()))
+    return [{'value': value, 'count': counts[value]} for value in order if counts.get(value)]
+
+
+def stored_facets() -> Dict[str, List[Dict[str, Any]]]:
+    """Facet counts for the whole published catalogue (one query)."""
+    counts: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+    for facet, value, count in CarListingFacet.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        if facet in counts:
+            counts[facet][value] = count
+    return {facet: _ordered(facet, counts[facet]) for facet in FACETS}
+
+
+def filtered_facets(queryset) -> Dict[str, List[Dict[str, Any]]]:
+    """Facet counts within ``queryset`` (one aggregate query, plus one for the list of makes)."""
+    makes = list(
+        CarListingFacet.objects.filter(facet='make', count__gt=0).values_list('value', flat=True)
+    )
+    conditions: Dict[str, Tuple[str, str, Q]] = {}
+    for index, make in enumerate(makes):
+        conditions[f'make_{index}'] = ('make', make, Q(make=make))
+    for facet, choices in CHOICES.items():
+        for index, (value, _) in enumerate(choices):
+            conditions[f'{facet}_{index}'] = (facet, value, Q(**{facet: value}))
+    for facet, buckets in BUCKETS.items():
+        for index, (key, _, _) in enumerate(buckets):
+            conditions[f'{facet}_{index}'] = (facet, key, bucket_filter(facet, key))
+
+    totals = queryset.order_by().aggregate(
+        **{alias: Count('pk', filter=condition) for alias, (_, _, condition) in conditions.items()}
+    )
+    counts: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+    for alias, (facet, value, _) in conditions.items():
+        counts[facet][value] = totals[alias]
+    return {facet: _ordered(facet, counts[facet]) for facet in FACETS}
+
+
+def search_query(text: str) -> Optional[SearchQuery]:
+    """Prefix-matching tsquery for user input ('bmw x5 aut' matches 'automatic'), or None if empty."""
+    terms = _TERM.findall(text.lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='english')
+
+
+def search_listings(queryset, text: str):
+    """Restrict ``queryset`` to listings matching ``text``, best matches first."""
+    query = search_query(text)
+    if query is None:
+        return queryset
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', '-featured', '-created_at')
+    )
@@ -6,11 +6,13 @@ from utils.email import (
     send_purchase_request_acknowledgement,
     send_sell_request_acknowledgement,
 )
+from utils.media_pipeline import rendition_urls
 from .models import CarImage, CarListing, CarPurchaseRequest, CarSellRequest
 
 
 class CarImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = CarImage
@@ -21,6 +23,9 @@ class CarImageSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj.image, obj.image_renditions, self.context.get('request'))
+
 
 class CarImageUploadSerializer(serializers.ModelSerializer):
     class Meta:
@@ -40,10 +45,11 @@ class CarListingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CarListing
-        fields = '__all__'
+        exclude = ['search_vector']
 
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
+        # Use the prefetched images; same order as CarImage.Meta.ordering
+        primary = next((image for image in obj.images.all() if image.is_primary), None)
         if primary and (request := self.context.get('request')):
             return request.build_absolute_uri(primary.image.url)
         return None
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from car_sales.models import CarListing
+from car_sales.search import FACET_SOURCE_FIELDS, apply_facet_change, facet_values
+
+
+@receiver(pre_save, sender=CarListing)
+def remember_facet_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Record the stored facet values so post_save can apply only the difference"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(FACET_SOURCE_FIELDS):
+        instance._facet_values = None
+        return
+    previous = None
+    if instance.pk is not None:
+        previous = CarListing.objects.filter(pk=instance.pk).values(*FACET_SOURCE_FIELDS).first()
+    instance._facet_values = facet_values(previous) if previous else {}
+
+
+@receiver(post_save, sender=CarListing)
+def update_facets_on_save(sender, instance, raw=False, **kwargs):
+    """Move the listing's facet counts from its old values to its new ones"""
+    old = getattr(instance, '_facet_values', {})
+    if raw or old is None:
+        return
+    new = facet_values({name: getattr(instance, name) for name in FACET_SOURCE_FIELDS})
+    instance._facet_values = new
+    if old != new:
+        with transaction.atomic():
+            apply_facet_change(old, new)
+
+
+@receiver(post_delete, sender=CarListing)
+def update_facets_on_delete(sender, instance, **kwargs):
+    """Remove a deleted listing from the facet counts"""
+    old = facet_values({name: getattr(instance, name) for name in FACET_SOURCE_FIELDS})
+    if old:
+        with transaction.atomic():
+            apply_facet_change(old, {})
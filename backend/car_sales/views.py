@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .models import CarListing, CarPurchaseRequest, CarSellRequest
+from .search import PRICE_BUCKETS, SEARCHABLE, YEAR_BUCKETS, bucket_filter, filtered_facets, search_listings, stored_facets
 from .serializers import (
     CarImageSerializer,
     CarImageUploadSerializer,
@@ -15,7 +16,9 @@ from .serializers import (
     CarSellRequestCreateSerializer,
     CarSellRequestSerializer,
 )
+from utils.cache import CachedListMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
+from utils.view_counter import record_view
 
 
 class CarListingFilter(filters.FilterSet):
@@ -27,13 +30,23 @@ class CarListingFilter(filters.FilterSet):
     fuel_type = filters.ChoiceFilter(choices=CarListing.FUEL_TYPE_CHOICES)
     transmission = filters.ChoiceFilter(choices=CarListing.TRANSMISSION_CHOICES)
     status = filters.ChoiceFilter(choices=CarListing.STATUS_CHOICES)
+    year_bucket = filters.ChoiceFilter(
+        choices=[(key, key) for key, _, _ in YEAR_BUCKETS], method='filter_bucket', field_name='year'
+    )
+    price_bucket = filters.ChoiceFilter(
+        choices=[(key, key) for key, _, _ in PRICE_BUCKETS], method='filter_bucket', field_name='price'
+    )
 
     class Meta:
         model = CarListing
         fields = ['make', 'model', 'year', 'fuel_type', 'transmission', 'status']
 
+    def filter_bucket(self, queryset, name, value):
+        return queryset.filter(bucket_filter(name, value))
 
-class CarListingViewSet(viewsets.ModelViewSet):
+
+class CarListingViewSet(CachedListMixin, viewsets.ModelViewSet):
+    cache_namespace = 'car_sales'
     queryset = CarListing.objects.prefetch_related('images')
     serializer_class = CarListingSerializer
     filter_backends = [DjangoFilterBackend]
@@ -42,24 +55,51 @@ class CarListingViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action == 'purchase_request':
             return []
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search']:
             return [IsPublicOrAdmin()]
         return [IsAdmin()]
 
     def get_queryset(self):
-        queryset = CarListing.objects.prefetch_related('images')
+        # The search document is only read by the database
+        queryset = CarListing.objects.defer('search_vector').prefetch_related('images')
         action = getattr(self, 'action', None)
         user = getattr(self.request, 'user', None)
 
-        if action == 'list' and (not user or not user.is_authenticated):
+        if action == 'search':
+            # Search and its facet counts cover the published catalogue only
+            queryset = queryset.filter(SEARCHABLE)
+        elif action == 'list' and (not user or not user.is_authenticated):
             queryset = queryset.filter(status='published')
         return queryset
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        return super().retrieve(request, *args, **kwargs)
+        if record_view(instance, request):
+            # Written behind by utils.view_counter; reflect this view in the response
+            instance.views += 1
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search with facet counts in one response.
+
+        ``q`` matches make, model and description by word prefix; the list
+        filters (including ``year_bucket`` and ``price_bucket``) narrow the
+        results. ``facets`` counts the matching listings per facet value.
+        """
+        text = request.query_params.get('q', '').strip()
+        queryset = search_listings(self.filter_queryset(self.get_queryset()), text)
+        filtered = bool(text) or any(
+            request.query_params.get(name) not in (None, '') for name in self.filterset_class.base_filters
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['facets'] = filtered_facets(queryset) if filtered else stored_facets()
+        return response
 
     @action(detail=True, methods=['post'], permission_classes=[])
     def purchase_request(self, request, pk=None):
@@ -79,4 +79,4 @@ class ChatbotSettingsAdmin(admin.ModelAdmin):
     
     def get_object(self, request, object_id=None, from_db=None):
         """Get or create the singleton instance"""
-        return ChatbotSettings.get_settings()
+        return ChatbotSettings.get_settings(use_cache=False)
@@ -12,6 +12,8 @@ class ChatbotConfig(AppConfig):
     
     def ready(self):
         """Called when Django starts. Auto-populate default contexts if none exist."""
+        import chatbot.signals  # noqa
+
         # Always connect to post_migrate signal to populate after migrations
         post_migrate.connect(self._populate_after_migrate, sender=self)
         
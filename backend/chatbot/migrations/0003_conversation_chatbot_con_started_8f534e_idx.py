@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatbot", "0002_chatbotsettings"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["-started_at", "-id"], name="chatbot_con_started_8f534e_idx"
+            ),
+        ),
+    ]
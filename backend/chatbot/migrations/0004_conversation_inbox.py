@@ -0,0 +1,92 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.utils.text import Truncator
+
+
+def fill_summaries(apps, schema_editor):
+    """Summarize existing conversations; their history counts as already read."""
+    Conversation = apps.get_model("chatbot", "Conversation")
+    ConversationMessage = apps.get_model("chatbot", "ConversationMessage")
+    totals = (
+        ConversationMessage.objects.values("conversation_id")
+        .annotate(count=Count("id"), last_id=Max("id"))
+        .order_by()
+    )
+    for total in totals.iterator():
+        last = ConversationMessage.objects.get(pk=total["last_id"])
+        Conversation.objects.filter(pk=total["conversation_id"]).update(
+            message_count=total["count"],
+            unread_count=0,
+            last_message_id=last.id,
+            last_message_at=last.timestamp,
+            last_message_type=last.message_type,
+            last_message_preview=Truncator(" ".join(last.content.split())).chars(200, truncate="..."),
+            last_read_message_id=last.id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chatbot", "0003_conversation_chatbot_con_started_8f534e_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_preview",
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_type",
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_read_message_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="message_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="unread_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="User messages since an admin last read or replied"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversationmessage",
+            index=models.Index(
+                fields=["conversation", "id"], name="chatbot_message_conv_id_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="conversationmessage",
+            name="conversation",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="chatbot.conversation",
+            ),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,16 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils.text import Truncator
 import uuid
 
+from utils.cache import TwoTierCache
+
+# Singleton settings are read on every chatbot request and change rarely
+chatbot_settings_cache = TwoTierCache('chatbot_settings')
+
+# Length of the last-message excerpt stored on each conversation
+PREVIEW_LENGTH = 200
+
 class ChatbotContext(models.Model):
     """Context sections for chatbot to classify intents and generate responses"""
 
@@ -69,10 +78,25 @@ class Conversation(models.Model):
     ended_at = models.DateTimeField(null=True, blank=True)
     last_activity = models.DateTimeField(auto_now=True)
 
+    # Inbox summary, kept current by chatbot.signals as messages are written
+    message_count = models.PositiveIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0, help_text="User messages since an admin last read or replied")
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_type = models.CharField(max_length=20, blank=True)
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True)
+    last_read_message_id = models.BigIntegerField(null=True, blank=True)
+
+    SUMMARY_FIELDS = (
+        'message_count', 'unread_count', 'last_message_id', 'last_message_at',
+        'last_message_type', 'last_message_preview', 'last_read_message_id',
+    )
+
     class Meta:
         ordering = ['-started_at']
         indexes = [
             models.Index(fields=['status', '-started_at']),
+            models.Index(fields=['-started_at', '-id']),  # keyset pagination
             models.Index(fields=['session_id']),
             models.Index(fields=['ip_address']),
         ]
@@ -80,6 +104,16 @@ class Conversation(models.Model):
     def __str__(self):
         return f"Conversation {self.id} - {self.session_id} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        # Summary fields are updated in place by chatbot.signals; a plain save()
+        # of an instance loaded before the latest message must not roll them back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SUMMARY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def duration(self):
         """Calculate conversation duration in minutes"""
@@ -87,6 +121,30 @@ class Conversation(models.Model):
             return None
         return (self.ended_at - self.started_at).total_seconds() / 60
 
+    def refresh_summary(self):
+        """Recompute the inbox summary from the stored messages (after deletes or bulk imports)"""
+        messages = self.messages.order_by('-id')
+        last = messages.first()
+        read_up_to = self.last_read_message_id or 0
+        updates = {
+            'message_count': messages.count(),
+            'unread_count': messages.filter(message_type='user', id__gt=read_up_to).count(),
+            'last_message_id': last.id if last else None,
+            'last_message_at': last.timestamp if last else None,
+            'last_message_type': last.message_type if last else '',
+            'last_message_preview': last.preview if last else '',
+        }
+        Conversation.objects.filter(pk=self.pk).update(**updates)
+        for name, value in updates.items():
+            setattr(self, name, value)
+
+    def mark_read(self):
+        """Mark every message up to the latest as read by admins"""
+        Conversation.objects.filter(pk=self.pk).update(
+            unread_count=0, last_read_message_id=models.F('last_message_id')
+        )
+        self.refresh_from_db(fields=['unread_count', 'last_read_message_id'])
+
     def mark_completed(self):
         """Mark conversation as completed (only called automatically)"""
         from django.utils import timezone
@@ -129,7 +187,8 @@ class ConversationMessage(models.Model):
         ('admin', 'Admin Message (Manual)'),
     ]
 
-    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
+    # Indexed by (conversation, id) below
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages', db_index=False)
     message_type = models.CharField(max_length=20, choices=MESSAGE_TYPES, default='user')
     content = models.TextField()
     response_time_ms = models.IntegerField(null=True, blank=True)
@@ -138,10 +197,18 @@ class ConversationMessage(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['conversation', 'id'], name='chatbot_message_conv_id_idx'),  # transcript pages
+        ]
 
     def __str__(self):
         return f"{self.get_message_type_display()} - {self.content[:50]}"
 
+    @property
+    def preview(self):
+        """Single-line excerpt shown in the conversation inbox (ASCII ellipsis, so it fits in bytes too)"""
+        return Truncator(' '.join(self.content.split())).chars(PREVIEW_LENGTH, truncate='...')
+
 
 class ChatbotSettings(models.Model):
     """Chatbot configuration settings - singleton model"""
@@ -235,10 +302,23 @@ class ChatbotSettings(models.Model):
         self.id = 1
         self.clean()
         super().save(*args, **kwargs)
+        chatbot_settings_cache.invalidate()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        chatbot_settings_cache.invalidate()
+        return result
     
     @classmethod
-    def get_settings(cls):
-        """Get or create the singleton settings instance"""
+    def get_settings(cls, use_cache=True):
+        """
+        Get or create the singleton settings instance.
+        
+        The cached instance is shared between requests and must not be modified;
+        pass use_cache=False to get a fresh instance for editing.
+        """
+        if use_cache:
+            return chatbot_settings_cache.get_or_set('singleton', lambda: cls.get_settings(use_cache=False))
         settings, created = cls.objects.get_or_create(id=1)
         return settings
     
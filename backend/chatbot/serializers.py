@@ -16,21 +16,19 @@ class ConversationMessageSerializer(serializers.ModelSerializer):
         return data
 
 class ConversationSerializer(serializers.ModelSerializer):
-    """Serializer for conversations"""
-    messages = ConversationMessageSerializer(many=True, read_only=True)
-    message_count = serializers.SerializerMethodField()
+    """Conversation with its inbox summary; the transcript is paged from the messages endpoint"""
 
     class Meta:
         model = Conversation
         fields = [
-            'id', 'session_id', 'user_email', 'user_name', 'user_phone', 
+            'id', 'session_id', 'user_email', 'user_name', 'user_phone',
             'ip_address', 'is_lead', 'status', 'manual_reply_active',
             'collected_data', 'intent_classification', 'confidence_score',
-            'started_at', 'ended_at', 'last_activity', 'messages', 'message_count'
+            'started_at', 'ended_at', 'last_activity', 'message_count',
+            'unread_count', 'last_message_id', 'last_message_at', 'last_message_type',
+            'last_message_preview', 'last_read_message_id',
         ]
-
-    def get_message_count(self, obj):
-        return obj.messages.count()
+        read_only_fields = list(Conversation.SUMMARY_FIELDS)
 
 class ChatbotContextSerializer(serializers.ModelSerializer):
     """Serializer for chatbot context sections"""
@@ -0,0 +1,45 @@
+from django.db.models import Case, F, Q, QuerySet, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from chatbot.models import Conversation, ConversationMessage
+
+
+@receiver(post_save, sender=ConversationMessage)
+def update_conversation_summary(sender, instance, created, raw=False, **kwargs):
+    """Fold a new message into its conversation's inbox summary with one UPDATE"""
+    if not created or raw:
+        return
+    # Messages saved concurrently may commit out of order; the highest id wins
+    is_latest = Q(last_message_id__isnull=True) | Q(last_message_id__lt=instance.pk)
+
+    def latest(value, field):
+        return Case(When(is_latest, then=Value(value)), default=F(field),
+                    output_field=Conversation._meta.get_field(field))
+
+    if instance.message_type == 'admin' or instance.is_admin_reply:
+        # Replying reads the conversation
+        unread = {'unread_count': Value(0), 'last_read_message_id': latest(instance.pk, 'last_read_message_id')}
+    elif instance.message_type == 'user':
+        unread = {'unread_count': F('unread_count') + 1}
+    else:
+        unread = {}
+
+    Conversation.objects.filter(pk=instance.conversation_id).update(
+        message_count=F('message_count') + 1,
+        last_message_at=latest(instance.timestamp, 'last_message_at'),
+        last_message_type=latest(instance.message_type, 'last_message_type'),
+        last_message_preview=latest(instance.preview, 'last_message_preview'),
+        last_message_id=latest(instance.pk, 'last_message_id'),
+        **unread,
+    )
+
+
+@receiver(post_delete, sender=ConversationMessage)
+def refresh_conversation_summary(sender, instance, origin=None, **kwargs):
+    """Recount the conversation after a message is deleted on its own"""
+    if isinstance(origin, Conversation) or (isinstance(origin, QuerySet) and origin.model is Conversation):
+        # The conversation is being deleted with its messages
+        return
+    conversation = Conversation.objects.filter(pk=instance.conversation_id).first()
+    if conversation is not None:
+        conversation.refresh_summary()
@@ -18,6 +18,7 @@ from .serializers import (
     ChatbotContextSerializer,
     ChatbotSettingsSerializer
 )
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdmin
 
 class ChatbotContextViewSet(viewsets.ModelViewSet):
@@ -38,7 +39,7 @@ class ChatbotSettingsViewSet(viewsets.ModelViewSet):
     
     def get_object(self):
         """Always return the singleton instance"""
-        return ChatbotSettings.get_settings()
+        return ChatbotSettings.get_settings(use_cache=False)
     
     def list(self, request, *args, **kwargs):
         """Return the singleton instance as a list"""
@@ -87,13 +88,47 @@ class ChatbotSettingsViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 logger.error(f"Error resetting react agent after settings update: {e}")
 
+class ConversationPagination(KeysetPagination):
+    ordering = ('-started_at', '-id')
+
+
+class ConversationMessagePagination(KeysetPagination):
+    # Newest first: the first page is the end of the transcript, ``next`` pages back
+    ordering = ('-id',)
+    # The conversation's message_count already says how many there are
+    count_mode = 'none'
+    page_size = 50
+    serializer_class = ConversationMessageSerializer
+
+
 class ConversationViewSet(viewsets.ModelViewSet):
     """Manage conversations (admin only)"""
-    queryset = Conversation.objects.prefetch_related('messages').order_by('-started_at')
+    queryset = Conversation.objects.order_by('-started_at')
     serializer_class = ConversationSerializer
+    pagination_class = ConversationPagination
     permission_classes = [IsAdmin]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'is_lead', 'manual_reply_active']
+    # Reads: count estimate, page rows and auth lookups
+    query_budget = 6
+
+    @action(detail=True, methods=['get'])
+    def messages(self, request, pk=None):
+        """Transcript of one conversation, newest messages first, in keyset pages"""
+        conversation = self.get_object()
+        paginator = ConversationMessagePagination()
+        page = paginator.paginate_queryset(
+            ConversationMessage.objects.filter(conversation=conversation), request, view=self
+        )
+        serializer = ConversationMessageSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def mark_read(self, request, pk=None):
+        """Clear the conversation's unread count"""
+        conversation = self.get_object()
+        conversation.mark_read()
+        return Response({'unread_count': 0, 'last_read_message_id': conversation.last_read_message_id})
 
     @action(detail=True, methods=['post'])
     def toggle_manual_reply(self, request, pk=None):
@@ -409,11 +444,11 @@ def get_conversation_messages(request):
         return Response({'error': 'session_id is required'}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        conversation = Conversation.objects.prefetch_related('messages').get(session_id=session_id)
+        conversation = Conversation.objects.get(session_id=session_id)
         messages = conversation.messages.all().order_by('id')  # Ensure ordered by ID (chronological)
         
-        # Get the latest message ID before filtering (for tracking)
-        latest_message_id = messages.last().id if messages.exists() else 0
+        # Latest message ID in the conversation (for tracking), kept on the row by chatbot.signals
+        latest_message_id = conversation.last_message_id or 0
         
         # Filter messages after last_message_id if provided (only return new messages)
         if last_message_id:
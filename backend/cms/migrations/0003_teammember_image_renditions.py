@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cms", "0002_teammember"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teammember",
+            name="image_renditions",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Optimized copy and renditions written by utils.media_pipeline",
+            ),
+        ),
+    ]
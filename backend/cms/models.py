@@ -92,6 +92,12 @@ class TeamMember(models.Model):
         null=True,
         help_text="Profile photo of the team member",
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Optimized copy and renditions written by utils.media_pipeline",
+    )
     order = models.PositiveIntegerField(
         default=0,
         help_text="Display order (lower numbers appear first)",
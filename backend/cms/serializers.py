@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from utils.media_pipeline import rendition_urls
+
 from .models import LandingPageConfig, TeamMember
 
 
@@ -37,6 +39,7 @@ class TeamMemberSerializer(serializers.ModelSerializer):
     """Serializer for team members displayed on the Our People page."""
 
     image_url = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = TeamMember
@@ -48,4 +51,7 @@ class TeamMemberSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj.image, obj.image_renditions, self.context.get("request"))
+
 
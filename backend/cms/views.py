@@ -3,10 +3,12 @@ from rest_framework.response import Response
 
 from .models import LandingPageConfig, TeamMember
 from .serializers import LandingPageConfigSerializer, TeamMemberSerializer
+from utils.cache import CachedListMixin
+from utils.conditional import ConditionalGetMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
 
 
-class LandingPageConfigViewSet(viewsets.ModelViewSet):
+class LandingPageConfigViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Manage simplified landing page configuration.
     Only one config instance should exist.
@@ -14,6 +16,7 @@ class LandingPageConfigViewSet(viewsets.ModelViewSet):
 
     queryset = LandingPageConfig.objects.all()
     serializer_class = LandingPageConfigSerializer
+    conditional_timestamp_field = "last_updated"
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -27,8 +30,13 @@ class LandingPageConfigViewSet(viewsets.ModelViewSet):
         config = LandingPageConfig.objects.first()
         if not config:
             config = LandingPageConfig.objects.create()
-        serializer = self.get_serializer(config, context={"request": request})
-        return Response(serializer.data)
+        etag, last_modified = self.get_object_validators(request, config)
+        return self.conditional_response(
+            request,
+            etag,
+            last_modified,
+            lambda: Response(self.get_serializer(config, context={"request": request}).data),
+        )
 
     def create(self, request, *args, **kwargs):
         """Create config if none exists, otherwise update existing."""
@@ -53,14 +61,8 @@ class LandingPageConfigViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
         return Response(serializer.data)
 
-    def retrieve(self, request, *args, **kwargs):
-        """Retrieve config with request context."""
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, context={"request": request})
-        return Response(serializer.data)
-
 
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """
     Manage team members for the "Our People" page.
     Public users can list active members, admins can manage all.
@@ -68,6 +70,8 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
 
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
+    pagination_class = None
+    cache_namespace = "team_members"
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -86,18 +90,6 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=True)
         return queryset.order_by("order", "name")
 
-    def list(self, request, *args, **kwargs):
-        """List team members with request context."""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True, context={"request": request})
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        """Retrieve team member with request context."""
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, context={"request": request})
-        return Response(serializer.data)
-
     def create(self, request, *args, **kwargs):
         """Create team member with request context."""
         serializer = self.get_serializer(data=request.data, context={"request": request})
@@ -113,4 +105,3 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
-
@@ -19,4 +19,9 @@ class ConfigConfig(AppConfig):
         # Only validate if explicitly enabled or in production
         if settings.VALIDATE_ENV or not settings.DEBUG:
             validate_environment_on_startup()
-
+        
+        from config.signals import connect_cache_invalidation
+        connect_cache_invalidation()
+        
+        from utils.media_pipeline import connect_media_pipeline
+        connect_media_pipeline()
@@ -0,0 +1,58 @@
+"""
+Management command to benchmark email body rendering.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from utils.email import EmailTemplateCache
+
+
+class Command(BaseCommand):
+    """Compare per-email render cost of the cached template layer against render_to_string + strip_tags."""
+
+    help = 'Benchmarks per-email render cost of the cached email template layer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Number of emails to render per strategy (default: 2000)',
+        )
+        parser.add_argument(
+            '--template',
+            default='emails/otp_email.html',
+            help='Template to benchmark (default: emails/otp_email.html)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        template = options['template']
+
+        def context(i):
+            return {'otp_code': f'{i % 1000000:06d}', 'site_name': settings.SITE_NAME}
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            html_body = render_to_string(template, context(i))
+            strip_tags(html_body)
+        baseline = time.perf_counter() - start
+
+        templates = EmailTemplateCache()
+        start = time.perf_counter()
+        for i in range(iterations):
+            templates.render(template, context(i))
+        cached = time.perf_counter() - start
+
+        baseline_us = baseline / iterations * 1_000_000
+        cached_us = cached / iterations * 1_000_000
+
+        self.stdout.write(f'Template: {template} ({iterations} renders each)')
+        self.stdout.write(f'  render_to_string + strip_tags: {baseline_us:8.1f} us/email')
+        self.stdout.write(f'  cached template layer:         {cached_us:8.1f} us/email')
+        if cached_us:
+            self.stdout.write(self.style.SUCCESS(f'  speedup: {baseline_us / cached_us:.2f}x'))
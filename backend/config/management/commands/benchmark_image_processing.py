@@ -0,0 +1,114 @@
+"""
+Management command to benchmark image processing time and memory.
+"""
+import multiprocessing
+import resource
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from utils.image_processing import ImageSource, ImageVariant
+
+VARIANTS = [
+    ImageVariant('original', (1920, 1080), 'JPEG', 85),
+    ImageVariant('thumbnail', (300, 300), 'JPEG', 75, crop=True),
+]
+
+
+def _legacy(data: bytes) -> int:
+    """Validate, optimize and thumbnail the way each helper used to: a full decode per step."""
+    with Image.open(BytesIO(data)) as img:
+        img.format, img.size
+    written = 0
+    for size in ((1920, 1080), (300, 300)):
+        with Image.open(BytesIO(data)) as img:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            output = BytesIO()
+            img.save(output, format='JPEG', quality=85, optimize=True)
+            written += output.tell()
+    return written
+
+
+def _single_pass(data: bytes) -> int:
+    with ImageSource(BytesIO(data)) as source:
+        source.validate()
+        return sum(output.size for output in source.render(VARIANTS).values())
+
+
+STRATEGIES = {'legacy': _legacy, 'single-pass': _single_pass}
+
+
+def _measure(strategy: str, data: bytes, iterations: int, queue) -> None:
+    # Runs in a forked child so peak RSS reflects this strategy alone
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(iterations):
+        written = STRATEGIES[strategy](data)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((elapsed / iterations, peak, written))
+
+
+class Command(BaseCommand):
+    """Compare per-image cost of the single-pass ImageSource against decoding once per helper call."""
+
+    help = 'Benchmarks time and peak memory of image optimization and thumbnailing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            help='Image to process (default: a generated JPEG of --megapixels)',
+        )
+        parser.add_argument(
+            '--megapixels',
+            type=float,
+            default=40,
+            help='Size of the generated JPEG in megapixels (default: 40)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=3,
+            help='Number of images to process per strategy (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        if options['file']:
+            with open(options['file'], 'rb') as f:
+                data = f.read()
+            label = options['file']
+        else:
+            width = int((options['megapixels'] * 1_000_000 * 4 / 3) ** 0.5)
+            height = width * 3 // 4
+            buffer = BytesIO()
+            Image.linear_gradient('L').resize((width, height)).convert('RGB').save(buffer, format='JPEG', quality=90)
+            data = buffer.getvalue()
+            label = f'generated {width}x{height} JPEG'
+
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            raise CommandError('This benchmark needs the fork start method to isolate peak memory')
+
+        self.stdout.write(f'Image: {label}, {len(data)} bytes ({iterations} runs each)')
+        results = {}
+        for strategy in STRATEGIES:
+            queue = context.Queue()
+            process = context.Process(target=_measure, args=(strategy, data, iterations, queue))
+            process.start()
+            results[strategy] = queue.get()
+            process.join()
+            seconds, peak_kb, written = results[strategy]
+            self.stdout.write(
+                f'  {strategy:<12} {seconds * 1000:8.1f} ms/image  '
+                f'peak +{peak_kb / 1024:7.1f} MB  output {written} bytes'
+            )
+
+        legacy, single = results['legacy'], results['single-pass']
+        if single[0]:
+            self.stdout.write(self.style.SUCCESS(f'  speedup: {legacy[0] / single[0]:.2f}x'))
@@ -0,0 +1,246 @@
+"""
+Management command to re-optimize existing media after rendition settings change.
+"""
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from config.signals import invalidate_model_cache
+from utils.media_pipeline import (
+    MEDIA_IMAGE_FIELDS,
+    STATUS_READY,
+    is_current,
+    processing_signature,
+    render_renditions,
+    renditions_field,
+    store_renditions,
+)
+
+SKIPPED = 'skipped'
+UNREADABLE = 'unreadable'
+
+
+def _init_worker():
+    # Spawned workers start without the project loaded; forked ones already have it
+    django.setup()
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+def _reprocess(label: str, pk: Any, field_name: str, source_name: str, previous: Dict[str, Any],
+               signature: str, force: bool) -> Tuple[str, Any, str, Optional[Dict[str, Any]], int]:
+    """
+    Worker: read, hash and render one source. Touches storage only, never the database.
+
+    Returns:
+        (label, pk, outcome, renditions data or None, source bytes)
+    """
+    storage = apps.get_model(label)._meta.get_field(field_name).storage
+    try:
+        with storage.open(source_name, 'rb') as source:
+            data = source.read()
+    except Exception as exc:
+        # Missing or unreadable file; the row keeps its current renditions
+        return label, pk, UNREADABLE, {'error': str(exc)}, 0
+    if not force and is_current(previous, source_name, hashlib.sha256(data).hexdigest(), signature):
+        return label, pk, SKIPPED, None, len(data)
+    result = render_renditions(data, source_name, storage, signature)
+    return label, pk, result['status'], result, len(data)
+
+
+@dataclass
+class ReprocessStats:
+    """Running totals for the report."""
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    superseded: int = 0
+    source_bytes: int = 0
+    # Optimized full-size copies against the sources they replace
+    original_bytes: int = 0
+    optimized_source_bytes: int = 0
+    # All rendition files, before and after this run
+    previous_bytes: int = 0
+    written_bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def total(self) -> int:
+        return self.processed + self.skipped + self.failed + self.superseded
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def _rendition_bytes(data: Optional[Dict[str, Any]]) -> int:
+    return sum(item.get('size', 0) for item in (data or {}).get('items') or [])
+
+
+def _original_bytes(data: Dict[str, Any]) -> int:
+    return next((item['size'] for item in data['items'] if item['name'] == 'original'), 0)
+
+
+class Command(BaseCommand):
+    """Regenerate renditions for every registered image, in parallel and resumably."""
+
+    help = 'Re-optimizes stored images and their renditions with the current rendition settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            choices=sorted(MEDIA_IMAGE_FIELDS),
+            help='Model to process; repeat for several (default: all registered image models)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes (default: one per CPU core)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows fetched per keyset query (default: 500)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Reprocess images whose source and settings are unchanged',
+        )
+
+    def _rows(self, label: str, batch_size: int) -> Iterator[Tuple[Any, str, Dict[str, Any]]]:
+        """Yield (pk, source name, renditions data), one keyset page at a time."""
+        model = apps.get_model(label)
+        field_name = MEDIA_IMAGE_FIELDS[label]
+        data_field = renditions_field(field_name)
+        queryset = (
+            model._default_manager.exclude(**{field_name: ''})
+            .exclude(**{f'{field_name}__isnull': True})
+            .order_by('pk')
+        )
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            rows = list(page.values_list('pk', field_name, data_field)[:batch_size])
+            if not rows:
+                return
+            yield from rows
+            last_pk = rows[-1][0]
+
+    def _record(self, stats: ReprocessStats, outcome, pending: Dict[Tuple[str, Any], Dict[str, Any]]) -> None:
+        label, pk, status, result, source_size = outcome
+        previous = pending.pop((label, pk))
+        stats.source_bytes += source_size
+        if status == SKIPPED:
+            stats.skipped += 1
+            return
+        if status == UNREADABLE:
+            stats.failed += 1
+            self.stderr.write(f'  {label} {pk}: {result["error"]}')
+            return
+
+        model = apps.get_model(label)
+        field_name = MEDIA_IMAGE_FIELDS[label]
+        storage = model._meta.get_field(field_name).storage
+        if not store_renditions(model, pk, field_name, result, previous, storage):
+            stats.superseded += 1
+            return
+        if status != STATUS_READY:
+            stats.failed += 1
+            self.stderr.write(f'  {label} {pk}: {result.get("error")}')
+            return
+        stats.processed += 1
+        stats.previous_bytes += _rendition_bytes(previous)
+        stats.written_bytes += _rendition_bytes(result)
+        stats.original_bytes += _original_bytes(result)
+        stats.optimized_source_bytes += source_size
+
+    def _progress(self, stats: ReprocessStats) -> None:
+        self.stdout.write(
+            f'  {stats.total} images, {stats.total / max(stats.elapsed, 1e-9):.1f}/s '
+            f'({stats.processed} processed, {stats.skipped} unchanged, {stats.failed} failed)'
+        )
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(MEDIA_IMAGE_FIELDS)
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        force = options['force']
+        signature = processing_signature()
+
+        # Forked workers inherit the configured project; spawned ones run _init_worker
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+
+        stats = ReprocessStats()
+        # Bounded so memory stays flat however many rows there are
+        max_in_flight = workers * 4
+        reported = 0
+
+        self.stdout.write(f'Reprocessing {", ".join(labels)} with {workers} workers')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+            # A fork pool starts every worker on its first submit; do that now, with no
+            # database connection open for the children to inherit and share
+            connections.close_all()
+            executor.submit(_worker_ready).result()
+            for label in labels:
+                field_name = MEDIA_IMAGE_FIELDS[label]
+                pending: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+                futures = set()
+                for pk, source_name, previous in self._rows(label, batch_size):
+                    pending[(label, pk)] = previous
+                    futures.add(executor.submit(
+                        _reprocess, label, pk, field_name, source_name, previous, signature, force
+                    ))
+                    if len(futures) >= max_in_flight:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._record(stats, future.result(), pending)
+                    if stats.total - reported >= batch_size:
+                        reported = stats.total
+                        self._progress(stats)
+                for future in wait(futures).done:
+                    self._record(stats, future.result(), pending)
+                invalidate_model_cache(apps.get_model(label))
+
+        self._report(stats)
+
+    def _report(self, stats: ReprocessStats) -> None:
+        elapsed = stats.elapsed
+        megabytes = stats.source_bytes / (1024 * 1024)
+        self.stdout.write(
+            f'Done: {stats.total} images in {elapsed:.1f}s '
+            f'({stats.total / max(elapsed, 1e-9):.1f} images/s, {megabytes / max(elapsed, 1e-9):.1f} MB/s read)'
+        )
+        self.stdout.write(
+            f'  processed {stats.processed}, unchanged {stats.skipped}, '
+            f'failed {stats.failed}, replaced during run {stats.superseded}'
+        )
+        if stats.processed:
+            saved = stats.optimized_source_bytes - stats.original_bytes
+            self.stdout.write(
+                f'  optimized originals: {stats.optimized_source_bytes} -> {stats.original_bytes} bytes '
+                f'({saved} saved)'
+            )
+            self.stdout.write(
+                f'  renditions: {stats.previous_bytes} -> {stats.written_bytes} bytes '
+                f'({stats.previous_bytes - stats.written_bytes} saved)'
+            )
+        self.stdout.write(self.style.SUCCESS('Reprocessing complete'))
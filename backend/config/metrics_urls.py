@@ -3,12 +3,13 @@ URLs for metrics and monitoring endpoints.
 """
 from django.urls import path
 from config.views import health_check, readiness_check, liveness_check
-from config.metrics_views import metrics_view
+from config.metrics_views import metrics_view, prometheus_metrics_view
 
 urlpatterns = [
     path('health/', health_check, name='health'),
     path('ready/', readiness_check, name='ready'),
     path('live/', liveness_check, name='live'),
+    path('prometheus/', prometheus_metrics_view, name='metrics-prometheus'),
     path('', metrics_view, name='metrics'),
 ]
 
@@ -1,15 +1,29 @@
 """
 Metrics views for monitoring.
 """
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 
-from utils.metrics import MetricsCollector
+from utils.metrics import MetricsCollector, metrics_registry, render_prometheus
+from utils.query_logging import query_metrics, render_query_prometheus
 from utils.permissions import IsAdmin
 from utils.response import success_response
 
 
+class HasMetricsToken(BasePermission):
+    """Allow scrapers presenting METRICS_TOKEN in the X-Metrics-Token header."""
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        supplied = request.headers.get('X-Metrics-Token', '')
+        return bool(token) and hmac.compare_digest(token, supplied)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def metrics_view(request):
@@ -23,3 +37,17 @@ def metrics_view(request):
         message='Metrics retrieved successfully'
     )
 
+
+@api_view(['GET'])
+@permission_classes([HasMetricsToken | IsAdmin])
+# Scrapers hold the token but are not authenticated, so the anonymous rate
+# would throttle a normal 15-30 s scrape interval
+@throttle_classes([])
+def prometheus_metrics_view(request):
+    """
+    Request counters, latency and per-request query histograms in Prometheus text format.
+    Requires admin authentication or the METRICS_TOKEN scrape token. Not throttled.
+    """
+    routes, _, _ = query_metrics.merged()
+    body = render_prometheus(metrics_registry.aggregate()) + render_query_prometheus(routes)
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
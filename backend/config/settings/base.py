@@ -62,9 +62,10 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'utils.middleware.RequestIDMiddleware',  # Request ID tracking
     'utils.metrics.PerformanceMiddleware',  # Performance metrics
+    'utils.query_logging.QueryProfilerMiddleware',  # Per-request query counts and DB time
     'utils.middleware.SuppressPollingLogsMiddleware',  # Suppress verbose polling logs
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'utils.compression.GZipCompressionMiddleware',  # Response compression
+    'utils.compression.CompressionMiddleware',  # Response compression (br/zstd/gzip)
     'analytics.middleware.AnalyticsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -163,8 +164,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'utils.pagination.CustomPagination',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'utils.throttles.SlidingAnonRateThrottle',
+        'utils.throttles.SlidingUserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
@@ -229,6 +230,8 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 SUPPORT_EMAIL = os.getenv('SUPPORT_EMAIL', DEFAULT_FROM_EMAIL or EMAIL_HOST_USER)
 SITE_NAME = os.getenv('SITE_NAME', 'Prestige Car Hire Management')
+# Absolute base URL for links in emails sent outside a request (e.g. Celery tasks)
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
 
 # CKEditor 5 settings
 CKEDITOR_5_UPLOAD_FILE_VIEW = 'ckeditor_5_upload_file'
@@ -303,8 +306,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'utils.tasks.cleanup_expired_backups',
         'schedule': crontab(hour=3, minute=30, day_of_week='sun'),
     },
+    'dispatch-scheduled-campaigns': {
+        'task': 'newsletter.tasks.dispatch_scheduled_campaigns',
+        'schedule': crontab(minute='*'),
+    },
+    'flush-view-counts': {
+        'task': 'utils.tasks.flush_pending_view_counts',
+        'schedule': crontab(minute='*'),
+    },
 }
 
+# Newsletter delivery settings
+NEWSLETTER_SEND_RATE = float(os.getenv('NEWSLETTER_SEND_RATE', '5'))  # Messages per second for scheduled sends
+NEWSLETTER_BATCH_SIZE = int(os.getenv('NEWSLETTER_BATCH_SIZE', '50'))  # Subscribers per batch / SMTP connection
+NEWSLETTER_DISPATCH_LIMIT = int(os.getenv('NEWSLETTER_DISPATCH_LIMIT', '10'))  # Campaigns claimed per beat tick
+NEWSLETTER_STALE_SENDING_SECONDS = int(os.getenv('NEWSLETTER_STALE_SENDING_SECONDS', '900'))  # Resume sends with no batch heartbeat for this long
+
 # Backup settings
 BACKUP_ENABLED = os.getenv('BACKUP_ENABLED', 'True').lower() == 'true'
 BACKUP_RETENTION_DAYS = int(os.getenv('BACKUP_RETENTION_DAYS', '30'))
@@ -326,6 +343,50 @@ VALIDATE_ENV = os.getenv('VALIDATE_ENV', 'False').lower() == 'true'
 
 # Theming settings
 THEMING_ENABLED = os.getenv('THEMING_ENABLED', 'True').lower() == 'true'
+THEME_CALENDAR_DAYS = int(os.getenv('THEME_CALENDAR_DAYS', '60'))  # Dates resolved per precomputed theme calendar
+THEME_CACHE_MAX_AGE = int(os.getenv('THEME_CACHE_MAX_AGE', '3600'))  # Upper bound on active-theme Cache-Control max-age (edits propagate within it)
+
+# Response compression
+# Server preference order; codings whose package is not installed are skipped
+COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',')
+COMPRESSION_LEVELS = {
+    'br': int(os.getenv('COMPRESSION_BROTLI_LEVEL', '4')),  # 0-11
+    'zstd': int(os.getenv('COMPRESSION_ZSTD_LEVEL', '3')),  # 1-22
+    'gzip': int(os.getenv('COMPRESSION_GZIP_LEVEL', '6')),  # 1-9
+}
+COMPRESSION_CACHE_TIMEOUT = int(os.getenv('COMPRESSION_CACHE_TIMEOUT', '300'))  # Seconds to keep compressed bodies per ETag
+
+# Keyset pagination counts (utils.pagination.KeysetPagination)
+PAGINATION_COUNT_MODE = os.getenv('PAGINATION_COUNT_MODE', 'approximate')  # approximate, cached, exact or none
+PAGINATION_COUNT_CACHE_TIMEOUT = int(os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', '60'))  # Seconds to reuse an exact count
+PAGINATION_EXACT_COUNT_THRESHOLD = int(os.getenv('PAGINATION_EXACT_COUNT_THRESHOLD', '10000'))  # Estimates below this are counted exactly
+
+# Request metrics
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', '15'))  # Seconds between per-worker flushes to cache
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Scrape token for /api/metrics/prometheus/ (X-Metrics-Token header)
+
+# View counters (utils.view_counter): buffered in Redis, or per process without it
+VIEW_COUNTER_FLUSH_SECONDS = int(os.getenv('VIEW_COUNTER_FLUSH_SECONDS', '10'))  # Max delay before counts reach the database
+VIEW_COUNTER_DEDUPE_SECONDS = int(os.getenv('VIEW_COUNTER_DEDUPE_SECONDS', '1800'))  # Repeat views by one viewer within this window count once; 0 disables
+
+# Image pipeline (utils.media_pipeline): renditions are generated by a Celery task after upload
+IMAGE_PROCESSING_ASYNC = os.getenv('IMAGE_PROCESSING_ASYNC', 'True').lower() == 'true'  # False processes inline after commit
+IMAGE_RENDITION_FORMATS = os.getenv('IMAGE_RENDITION_FORMATS', 'webp,avif').split(',')  # Formats Pillow cannot encode are skipped
+IMAGE_RENDITION_QUALITY = int(os.getenv('IMAGE_RENDITION_QUALITY', '80'))
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', '89478485'))  # Rejected from the header, before decoding
+
+# Health checks (utils.health_checks.health_monitor)
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '5'))  # Snapshot age before probes trigger a background refresh
+HEALTH_CHECK_MAX_AGE = float(os.getenv('HEALTH_CHECK_MAX_AGE', '60'))  # Older snapshots are reported unhealthy (refreshes not completing)
+HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '2'))  # Per-check timeout in seconds
+HEALTH_CHECK_CELERY_TIMEOUT = float(os.getenv('HEALTH_CHECK_CELERY_TIMEOUT', '1'))  # Seconds to wait for Celery workers to answer
+
+# Query profiler (utils.query_logging.QueryProfilerMiddleware)
+QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', 'True').lower() == 'true'
+QUERY_PROFILER_SLOW_MS = float(os.getenv('QUERY_PROFILER_SLOW_MS', '100'))  # Queries slower than this are sampled with their origin
+QUERY_PROFILER_REPEAT_THRESHOLD = int(os.getenv('QUERY_PROFILER_REPEAT_THRESHOLD', '10'))  # Same SQL this often in one request is logged as a likely N+1
+QUERY_PROFILER_WARN_COUNT = int(os.getenv('QUERY_PROFILER_WARN_COUNT', '20'))  # Log requests issuing more queries than this
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False').lower() == 'true'  # Fail API requests that run a query per row or exceed their view's query_budget
 
 # Logging configuration
 # Check if pythonjsonlogger is available
@@ -2,14 +2,6 @@ import os
 
 from .base import *
 
-# Import query logging middleware conditionally
-if os.getenv('ENABLE_QUERY_LOGGING', 'False').lower() == 'true':
-    # Add query logging middleware after RequestIDMiddleware
-    base_middleware = MIDDLEWARE.copy()
-    request_id_index = base_middleware.index('utils.middleware.RequestIDMiddleware')
-    base_middleware.insert(request_id_index + 1, 'utils.query_logging.QueryLoggingMiddleware')
-    MIDDLEWARE = base_middleware
-
 # Development-specific settings
 DEBUG = True
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
@@ -91,9 +83,5 @@ LOGGING['loggers']['django.utils.autoreload'] = {
     'propagate': False,
 }
 
-# Enable query logging middleware in development
-# Add to MIDDLEWARE if you want query logging
-ENABLE_QUERY_LOGGING = os.getenv('ENABLE_QUERY_LOGGING', 'False').lower() == 'true'
-
 # Enable compression in development (optional)
 ENABLE_COMPRESSION = os.getenv('ENABLE_COMPRESSION', 'False').lower() == 'true'
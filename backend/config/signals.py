@@ -0,0 +1,50 @@
+"""
+Cache invalidation for cached public list endpoints.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from utils.cache import CacheManager
+
+# Model label -> cache namespace used by the corresponding viewset
+CACHE_NAMESPACES = {
+    'vehicles.Vehicle': 'vehicles',
+    'car_sales.CarListing': 'car_sales',
+    'car_sales.CarImage': 'car_sales',
+    'blog.BlogPost': 'blog',
+    'faq.FAQ': 'faq',
+    'gallery.GalleryImage': 'gallery',
+    'testimonials.Testimonial': 'testimonials',
+    'cms.TeamMember': 'team_members',
+}
+
+
+# Saves that only touch these fields do not change list output
+IGNORED_UPDATE_FIELDS = frozenset({'views'})
+
+
+def _make_receiver(namespace: str):
+    def invalidate(sender, update_fields=None, **kwargs):
+        if update_fields and IGNORED_UPDATE_FIELDS.issuperset(update_fields):
+            return
+        CacheManager.invalidate_namespace(namespace)
+    return invalidate
+
+
+def invalidate_model_cache(model) -> None:
+    """
+    Invalidate the namespace of ``model`` after writes that bypass signals.
+
+    ``QuerySet.update()`` (and so ``utils.bulk_operations.bulk_update_fields``)
+    sends no post_save, so callers changing cached models that way call this.
+    """
+    namespace = CACHE_NAMESPACES.get(model._meta.label)
+    if namespace:
+        CacheManager.invalidate_namespace(namespace)
+
+
+def connect_cache_invalidation() -> None:
+    """Invalidate a namespace whenever one of its models is saved or deleted."""
+    for label, namespace in CACHE_NAMESPACES.items():
+        receiver = _make_receiver(namespace)
+        post_save.connect(receiver, sender=label, weak=False, dispatch_uid=f'cache-save:{label}')
+        post_delete.connect(receiver, sender=label, weak=False, dispatch_uid=f'cache-delete:{label}')
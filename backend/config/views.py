@@ -9,7 +9,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
-from utils.health_checks import get_health_status, get_readiness_status
+from utils.health_checks import get_health_status, get_liveness_status, get_readiness_status
 from utils.response import success_response, error_response
 
 
@@ -18,7 +18,8 @@ from utils.response import success_response, error_response
 def health_check(request):
     """
     Health check endpoint.
-    Returns detailed health status of all system components.
+    Returns detailed health status of all system components from the
+    background-refreshed snapshot; no checks run on this request.
     """
     health = get_health_status()
     
@@ -41,7 +42,7 @@ def health_check(request):
 def readiness_check(request):
     """
     Readiness check endpoint.
-    Returns whether the service is ready to accept traffic.
+    Returns whether the service is ready to accept traffic, from the health snapshot.
     """
     readiness = get_readiness_status()
     
@@ -64,10 +65,10 @@ def readiness_check(request):
 def liveness_check(request):
     """
     Liveness check endpoint.
-    Simple check to verify the service is running.
+    Simple check to verify the service is running; touches no dependencies.
     """
     return success_response(
-        data={'status': 'alive'},
+        data=get_liveness_status(),
         message='Service is alive'
     )
 
@@ -5,6 +5,8 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 
 from .models import FAQ
 from .serializers import FAQSerializer
+from utils.cache import CachedListMixin
+from utils.conditional import ConditionalGetMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
 
 class FAQFilter(filters.FilterSet):
@@ -16,8 +18,9 @@ class FAQFilter(filters.FilterSet):
         model = FAQ
         fields = ['category', 'is_active']
 
-class FAQViewSet(viewsets.ModelViewSet):
+class FAQViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
     """FAQ management"""
+    cache_namespace = 'faq'
     queryset = FAQ.objects.select_related('created_by')
     serializer_class = FAQSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
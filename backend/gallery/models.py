@@ -1,8 +1,4 @@
-from io import BytesIO
-
-from django.core.files.base import ContentFile
 from django.db import models
-from PIL import Image
 
 
 class GalleryImage(models.Model):
@@ -23,6 +19,8 @@ class GalleryImage(models.Model):
     display_order = models.IntegerField(default=0)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, blank=True)
+    # Optimized copy and renditions written by utils.media_pipeline
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ['display_order', '-uploaded_at']
@@ -31,44 +29,3 @@ class GalleryImage(models.Model):
 
     def __str__(self):
         return self.title
-
-    def save(self, *args, **kwargs):
-        should_optimize = False
-
-        if self.image:
-            if not self.pk:
-                should_optimize = True
-            else:
-                try:
-                    original = GalleryImage.objects.get(pk=self.pk)
-                except GalleryImage.DoesNotExist:
-                    should_optimize = True
-                else:
-                    if original.image.name != self.image.name or original.image.size != self.image.size:
-                        should_optimize = True
-
-        if should_optimize:
-            self._optimize_image()
-
-        super().save(*args, **kwargs)
-
-    def _optimize_image(self):
-        """Reduce file size while maintaining reasonable quality."""
-        if not self.image:
-            return
-
-        self.image.open()
-        image = Image.open(self.image)
-        image_format = image.format or 'JPEG'
-
-        if image.mode in ('RGBA', 'P'):
-            image = image.convert('RGB')
-            image_format = 'JPEG'
-
-        buffer = BytesIO()
-        image.save(buffer, format=image_format, optimize=True, quality=85)
-        buffer.seek(0)
-
-        optimized_file = ContentFile(buffer.read())
-        filename = self.image.name
-        self.image.save(filename, optimized_file, save=False)
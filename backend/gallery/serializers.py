@@ -1,9 +1,12 @@
 from rest_framework import serializers
+
+from utils.media_pipeline import rendition_urls
 from .models import GalleryImage
 
 class GalleryImageSerializer(serializers.ModelSerializer):
     """Serializer for gallery images"""
     image_url = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
 
     class Meta:
@@ -15,3 +18,6 @@ class GalleryImageSerializer(serializers.ModelSerializer):
         if request and obj.image:
             return request.build_absolute_uri(obj.image.url)
         return None
+
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj.image, obj.image_renditions, self.context.get('request'))
@@ -5,6 +5,7 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 
 from .models import GalleryImage
 from .serializers import GalleryImageSerializer
+from utils.cache import CachedListMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
 
 class GalleryImageFilter(filters.FilterSet):
@@ -16,8 +17,9 @@ class GalleryImageFilter(filters.FilterSet):
         model = GalleryImage
         fields = ['category', 'is_active']
 
-class GalleryImageViewSet(viewsets.ModelViewSet):
+class GalleryImageViewSet(CachedListMixin, viewsets.ModelViewSet):
     """Gallery image management"""
+    cache_namespace = 'gallery'
     queryset = GalleryImage.objects.select_related('uploaded_by')
     serializer_class = GalleryImageSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from utils.bulk_operations import bulk_update_fields
+
 from .models import Inquiry
 
 
@@ -9,3 +11,14 @@ class InquiryAdmin(admin.ModelAdmin):
     list_filter = ('status', 'source', 'is_spam')
     search_fields = ('subject', 'email', 'message')
     readonly_fields = ('created_at', 'updated_at')
+    actions = ('mark_resolved', 'mark_spam')
+
+    @admin.action(description='Mark selected inquiries as resolved')
+    def mark_resolved(self, request, queryset):
+        stats = bulk_update_fields(queryset, {'status': 'resolved'})
+        self.message_user(request, f"{stats.rows} inquiries marked as resolved.")
+
+    @admin.action(description='Mark selected inquiries as spam')
+    def mark_spam(self, request, queryset):
+        stats = bulk_update_fields(queryset, {'is_spam': True})
+        self.message_user(request, f"{stats.rows} inquiries marked as spam.")
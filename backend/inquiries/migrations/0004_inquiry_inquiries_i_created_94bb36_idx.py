@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inquiries", "0003_limit_inquiry_statuses"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inquiry",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="inquiries_i_created_94bb36_idx"
+            ),
+        ),
+    ]
@@ -30,6 +30,9 @@ class Inquiry(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),  # keyset pagination
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.email}"
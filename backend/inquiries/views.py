@@ -6,6 +6,7 @@ from rest_framework.response import Response
 
 from .models import Inquiry
 from .serializers import InquiryCreateSerializer, InquiryReplySerializer, InquirySerializer
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdmin
 from utils.email import notify_inquiry_team, send_inquiry_acknowledgement, send_inquiry_reply
 
@@ -25,19 +26,8 @@ class InquiryViewSet(viewsets.ModelViewSet):
     queryset = Inquiry.objects.all().order_by('-created_at')
     filter_backends = [DjangoFilterBackend]
     filterset_class = InquiryFilter
-    
-    def get_queryset(self):
-        """Optimize queryset for admin list views."""
-        queryset = Inquiry.objects.all().order_by('-created_at')
-        
-        # For list views, limit fields
-        if self.action == 'list':
-            queryset = queryset.only(
-                'id', 'name', 'email', 'subject', 'status', 'source',
-                'is_spam', 'created_at'
-            )
-        
-        return queryset
+    # Keyset pages; list columns are derived from the serializer
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
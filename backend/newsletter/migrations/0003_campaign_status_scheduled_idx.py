@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("newsletter", "0002_newsletterrecipient"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="newslettercampaign",
+            index=models.Index(
+                fields=["status", "scheduled_at"], name="newsletter__status_afc1be_idx"
+            ),
+        ),
+    ]
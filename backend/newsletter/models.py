@@ -34,11 +34,15 @@ class NewsletterCampaign(models.Model):
     opened_count = models.IntegerField(default=0)
     clicked_count = models.IntegerField(default=0)
     created_by = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
+    send_completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_at']),
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.get_status_display()}"
@@ -46,10 +50,22 @@ class NewsletterCampaign(models.Model):
 
 class NewsletterRecipient(models.Model):
     """Per-recipient tracking for a campaign."""
+    DELIVERY_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('bounced', 'Bounced'),
+    ]
+
     campaign = models.ForeignKey(NewsletterCampaign, on_delete=models.CASCADE, related_name='recipients')
     email = models.EmailField()
     token = models.CharField(max_length=255, unique=True)
     is_test = models.BooleanField(default=False)
+    delivery_status = models.CharField(max_length=20, choices=DELIVERY_STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    send_latency_ms = models.FloatField(null=True, blank=True)  # SMTP round trip of the last attempt
+    last_error = models.TextField(blank=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
     open_count = models.IntegerField(default=0)
     click_count = models.IntegerField(default=0)
     first_opened_at = models.DateTimeField(null=True, blank=True)
@@ -63,6 +79,7 @@ class NewsletterRecipient(models.Model):
         unique_together = ('campaign', 'email')
         indexes = [
             models.Index(fields=['campaign', 'email']),
+            models.Index(fields=['campaign', 'delivery_status']),
         ]
 
     def __str__(self):
@@ -20,11 +20,20 @@ class NewsletterCampaignSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
             'sent_at',
+            'send_completed_at',
             'recipients_count',
             'opened_count',
             'clicked_count',
         ]
 
+    def validate(self, attrs):
+        """Scheduled campaigns need a send time for the dispatcher to pick them up"""
+        status = attrs.get('status', getattr(self.instance, 'status', None))
+        scheduled_at = attrs.get('scheduled_at', getattr(self.instance, 'scheduled_at', None))
+        if status == 'scheduled' and not scheduled_at:
+            raise serializers.ValidationError({'scheduled_at': 'Required when status is scheduled.'})
+        return attrs
+
     def get_created_by_name(self, obj):
         """Get full name of creator or fallback to username/email"""
         if obj.created_by:
@@ -0,0 +1,337 @@
+"""
+Newsletter campaign delivery.
+Builds per-recipient campaign emails and sends them at a controlled rate.
+"""
+import logging
+import math
+import re
+import smtplib
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.signing import TimestampSigner
+from django.db.models import Count, Q, Sum
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from utils.bulk_operations import iter_keyset_chunks
+
+from .models import NewsletterCampaign, NewsletterRecipient, NewsletterSubscriber
+
+logger = logging.getLogger(__name__)
+
+_HREF_RE = re.compile(r'href="([^"]+)"')
+
+
+def get_site_url() -> str:
+    """Absolute base URL used for tracking links when no request is available."""
+    return getattr(settings, 'SITE_URL', 'http://localhost:8000').rstrip('/')
+
+
+def render_campaign_html(campaign: NewsletterCampaign, recipient: NewsletterRecipient, base_url: str, *, test: bool = False) -> str:
+    """Render campaign HTML for one recipient with open pixel, click tracking and footer."""
+    email = recipient.email
+    html_content = campaign.content.replace('{{email}}', email)
+    notice = (
+        'This is a test email preview of your campaign.'
+        if test
+        else 'You are receiving this email because you subscribed to our newsletter.'
+    )
+    footer_html = f"""
+    <hr style='border:none;border-top:1px solid #eee;margin:20px 0;'/>
+    <div style='font-size:12px;color:#666'>
+      {notice}
+      <br/>
+      <a href="/unsubscribe?email={email}">Unsubscribe</a>
+    </div>
+    """
+    # Append tracking pixel (open)
+    pixel_url = f"{base_url}{reverse('newsletter:campaign-open', args=[campaign.id])}"
+    tracking_pixel = f'<img src="{pixel_url}?t={recipient.token}" width="1" height="1" style="display:none" alt="." />'
+    # Rewrite links to pass through click tracker
+    click_base = f"{base_url}{reverse('newsletter:campaign-click', args=[campaign.id])}"
+
+    def _rewrite_link(match: re.Match) -> str:
+        href = match.group(1)
+        # Only rewrite http(s) links
+        if href.startswith('http://') or href.startswith('https://'):
+            return f'href="{click_base}?t={recipient.token}&u={href}"'
+        return f'href="{href}"'
+
+    html_content = _HREF_RE.sub(_rewrite_link, html_content)
+    return f"{html_content}{tracking_pixel}{footer_html}"
+
+
+def build_campaign_message(
+    campaign: NewsletterCampaign,
+    recipient: NewsletterRecipient,
+    base_url: str,
+    *,
+    test: bool = False,
+    connection=None,
+) -> EmailMultiAlternatives:
+    """Build the multipart email for one campaign recipient."""
+    html_content = render_campaign_html(campaign, recipient, base_url, test=test)
+    message = EmailMultiAlternatives(
+        subject=f"[TEST] {campaign.subject}" if test else campaign.subject,
+        body=strip_tags(html_content),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient.email],
+        connection=connection,
+    )
+    message.attach_alternative(html_content, "text/html")
+    return message
+
+
+class SendRateLimiter:
+    """Spaces successive sends so throughput never exceeds ``rate`` messages per second."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next_slot > now:
+            time.sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = max(self._next_slot, now) + self.interval
+
+
+def classify_send_error(error: Exception) -> str:
+    """Map a send exception to a recipient delivery status."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # The server rejected the address outright: a synchronous hard bounce
+        return 'bounced'
+    if isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600:
+        return 'bounced'
+    return 'failed'
+
+
+@dataclass
+class CampaignSendResult:
+    """Outcome of a campaign send."""
+    total: int = 0
+    sent: int = 0
+    # Recipients already delivered by an earlier, interrupted run
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+class CampaignSender:
+    """
+    Sends a campaign to all active subscribers.
+
+    Subscribers are walked in primary-key order in batches, recipient tracking
+    rows are created per batch, one SMTP connection is reused per batch, and
+    sends are spaced by ``rate`` (messages per second, ``None`` for unthrottled).
+
+    Recipients already marked ``sent`` are skipped, so sending a campaign again
+    after a worker died resumes it (statuses are saved per batch, so only the
+    batch in flight can be sent twice). The campaign's ``updated_at`` is touched
+    after every batch as a heartbeat; ``dispatch_scheduled_campaigns`` resumes
+    ``sending`` campaigns whose heartbeat has gone stale.
+    """
+
+    DELIVERY_FIELDS = ['delivery_status', 'attempts', 'send_latency_ms', 'last_error', 'last_attempt_at']
+
+    def __init__(self, rate: Optional[float] = None, batch_size: Optional[int] = None) -> None:
+        self.rate = rate
+        self.batch_size = batch_size or getattr(settings, 'NEWSLETTER_BATCH_SIZE', 50)
+        self.signer = TimestampSigner()
+
+    def iter_subscriber_batches(self):
+        """Yield lists of active subscriber emails using keyset pagination."""
+        subscribers = NewsletterSubscriber.objects.filter(is_active=True).only('pk', 'email')
+        for batch in iter_keyset_chunks(subscribers, self.batch_size):
+            yield [subscriber.email for subscriber in batch]
+
+    def get_recipients(self, campaign: NewsletterCampaign, emails: List[str]) -> Dict[str, NewsletterRecipient]:
+        """Return tracking rows for ``emails``, creating any that are missing."""
+        recipients = {
+            recipient.email: recipient
+            for recipient in NewsletterRecipient.objects.filter(campaign=campaign, email__in=emails)
+        }
+        missing = [email for email in emails if email not in recipients]
+        if missing:
+            NewsletterRecipient.objects.bulk_create(
+                [
+                    NewsletterRecipient(
+                        campaign=campaign,
+                        email=email,
+                        is_test=False,
+                        token=self.signer.sign(f"{campaign.id}:{email}"),
+                    )
+                    for email in missing
+                ],
+                ignore_conflicts=True,
+            )
+            recipients.update({
+                recipient.email: recipient
+                for recipient in NewsletterRecipient.objects.filter(campaign=campaign, email__in=missing)
+            })
+        return recipients
+
+    def deliver(
+        self,
+        campaign: NewsletterCampaign,
+        recipient: NewsletterRecipient,
+        base_url: str,
+        connection,
+        result: CampaignSendResult,
+    ) -> None:
+        """Send to one recipient and record status, attempt count and SMTP latency on it (unsaved)."""
+        recipient.attempts += 1
+        recipient.last_attempt_at = timezone.now()
+        try:
+            message = build_campaign_message(campaign, recipient, base_url, connection=connection)
+            started = time.perf_counter()
+            message.send(fail_silently=False)
+            recipient.send_latency_ms = (time.perf_counter() - started) * 1000
+            recipient.delivery_status = 'sent'
+            recipient.last_error = ''
+            result.sent += 1
+        except Exception as e:
+            # Continue sending to other recipients even if one fails
+            recipient.send_latency_ms = None
+            recipient.delivery_status = classify_send_error(e)
+            recipient.last_error = str(e)[:1000]
+            result.errors.append(f"Failed to send to {recipient.email}: {str(e)}")
+
+    def send(self, campaign: NewsletterCampaign, base_url: Optional[str] = None) -> CampaignSendResult:
+        """Send ``campaign`` and record the final status on it."""
+        base_url = (base_url or get_site_url()).rstrip('/')
+        result = CampaignSendResult(
+            total=NewsletterSubscriber.objects.filter(is_active=True).count()
+        )
+
+        campaign.status = 'sending'
+        campaign.recipients_count = result.total
+        # A resumed send keeps its original start
+        campaign.sent_at = campaign.sent_at or timezone.now()
+        campaign.save()
+
+        limiter = SendRateLimiter(self.rate)
+        for emails in self.iter_subscriber_batches():
+            recipients = self.get_recipients(campaign, emails)
+            pending = [recipients[email] for email in emails if recipients[email].delivery_status != 'sent']
+            result.skipped += len(emails) - len(pending)
+            if pending:
+                connection = get_connection()
+                try:
+                    try:
+                        connection.open()
+                    except Exception:
+                        # Each send retries the connection and records its own failure
+                        logger.warning('Could not open mail connection for campaign %s', campaign.pk, exc_info=True)
+                    for recipient in pending:
+                        limiter.wait()
+                        self.deliver(campaign, recipient, base_url, connection, result)
+                finally:
+                    connection.close()
+                NewsletterRecipient.objects.bulk_update(pending, self.DELIVERY_FIELDS)
+            # Heartbeat for the stale-send sweep
+            NewsletterCampaign.objects.filter(pk=campaign.pk).update(updated_at=timezone.now())
+
+        campaign.status = 'sent' if result.sent + result.skipped > 0 else 'cancelled'
+        campaign.send_completed_at = timezone.now()
+        campaign.save()
+        logger.info(
+            'Campaign %s finished: %s sent, %s already sent, %s failed of %s',
+            campaign.pk, result.sent, result.skipped, result.failed, result.total,
+        )
+        return result
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def get_campaign_delivery_stats(campaign: NewsletterCampaign, failure_limit: int = 20) -> dict:
+    """
+    Aggregate delivery metrics for a campaign from its per-recipient log.
+
+    Args:
+        campaign: Campaign to summarise
+        failure_limit: Maximum number of failed/bounced recipients to include
+
+    Returns:
+        Dictionary with status counts, throughput, SMTP latency percentiles and recent failures
+    """
+    recipients = NewsletterRecipient.objects.filter(campaign=campaign, is_test=False)
+    counts = recipients.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(delivery_status='pending')),
+        sent=Count('id', filter=Q(delivery_status='sent')),
+        failed=Count('id', filter=Q(delivery_status='failed')),
+        bounced=Count('id', filter=Q(delivery_status='bounced')),
+        attempts=Sum('attempts'),
+    )
+    latencies = list(
+        recipients.filter(delivery_status='sent', send_latency_ms__isnull=False)
+        .order_by('send_latency_ms')
+        .values_list('send_latency_ms', flat=True)
+    )
+
+    duration = None
+    sends_per_second = None
+    if campaign.sent_at and campaign.send_completed_at:
+        duration = max((campaign.send_completed_at - campaign.sent_at).total_seconds(), 0.0)
+        processed = counts['sent'] + counts['failed'] + counts['bounced']
+        if duration > 0:
+            sends_per_second = round(processed / duration, 2)
+
+    def _ms(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+    failures = list(
+        recipients.filter(delivery_status__in=['failed', 'bounced'])
+        .order_by('-last_attempt_at')
+        .values('email', 'delivery_status', 'attempts', 'last_error', 'last_attempt_at')[:failure_limit]
+    )
+
+    return {
+        'campaign_id': campaign.id,
+        'status': campaign.status,
+        'recipients_count': campaign.recipients_count,
+        'delivery': {
+            'total': counts['total'],
+            'pending': counts['pending'],
+            'sent': counts['sent'],
+            'failed': counts['failed'],
+            'bounced': counts['bounced'],
+            'attempts': counts['attempts'] or 0,
+        },
+        'throughput': {
+            'started_at': campaign.sent_at,
+            'completed_at': campaign.send_completed_at,
+            'duration_seconds': round(duration, 3) if duration is not None else None,
+            'sends_per_second': sends_per_second,
+        },
+        'smtp_latency_ms': {
+            'samples': len(latencies),
+            'p50': _ms(_percentile(latencies, 50)),
+            'p95': _ms(_percentile(latencies, 95)),
+            'max': _ms(latencies[-1] if latencies else None),
+            'avg': _ms(sum(latencies) / len(latencies) if latencies else None),
+        },
+        'engagement': {
+            'opened': campaign.opened_count,
+            'clicked': campaign.clicked_count,
+        },
+        'recent_failures': failures,
+    }
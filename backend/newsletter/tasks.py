@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import List
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NewsletterCampaign
+from .services import CampaignSender
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def dispatch_scheduled_campaigns(self) -> List[int]:
+    """
+    Claim campaigns whose ``scheduled_at`` has passed and queue them for sending.
+
+    Rows are locked with ``SKIP LOCKED`` and flipped to ``sending`` inside the
+    same transaction, so concurrent beat runs never claim the same campaign.
+    Campaigns left in ``sending`` by a worker that died (no batch heartbeat for
+    ``NEWSLETTER_STALE_SENDING_SECONDS``) are queued again; the sender skips
+    recipients that were already sent.
+    """
+    limit = getattr(settings, 'NEWSLETTER_DISPATCH_LIMIT', 10)
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, 'NEWSLETTER_STALE_SENDING_SECONDS', 900))
+    with transaction.atomic():
+        due = list(
+            NewsletterCampaign.objects.select_for_update(skip_locked=True)
+            .filter(status='scheduled', scheduled_at__lte=now)
+            .order_by('scheduled_at')
+            .values_list('pk', flat=True)[:limit]
+        )
+        stale = list(
+            NewsletterCampaign.objects.select_for_update(skip_locked=True)
+            .filter(status='sending', updated_at__lt=stale_before)
+            .order_by('updated_at')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if due or stale:
+            # Claims the stale campaigns too: the fresh updated_at keeps the next sweep off them
+            NewsletterCampaign.objects.filter(pk__in=due + stale).update(status='sending', updated_at=now)
+
+    for campaign_id in due:
+        send_newsletter_campaign.delay(campaign_id)
+        logger.info('Dispatched scheduled campaign %s', campaign_id)
+    for campaign_id in stale:
+        send_newsletter_campaign.delay(campaign_id)
+        logger.warning('Resumed stalled campaign %s', campaign_id)
+    return due + stale
+
+
+@shared_task(bind=True)
+def send_newsletter_campaign(self, campaign_id: int) -> dict | None:
+    """Send a claimed campaign at the configured throughput."""
+    try:
+        campaign = NewsletterCampaign.objects.get(pk=campaign_id)
+    except NewsletterCampaign.DoesNotExist:
+        logger.warning('Campaign %s no longer exists; skipping send.', campaign_id)
+        return None
+
+    if campaign.status != 'sending':
+        logger.info('Campaign %s is %s, not sending; skipping.', campaign_id, campaign.status)
+        return None
+
+    sender = CampaignSender(
+        rate=getattr(settings, 'NEWSLETTER_SEND_RATE', None),
+        batch_size=getattr(settings, 'NEWSLETTER_BATCH_SIZE', None),
+    )
+    result = sender.send(campaign)
+    return {'sent': result.sent, 'failed': result.failed, 'total': result.total}
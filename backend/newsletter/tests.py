@@ -1,3 +1,177 @@
+from datetime import timedelta
+import smtplib
+from unittest.mock import patch
+
+from django.core import mail
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from .models import NewsletterCampaign, NewsletterRecipient, NewsletterSubscriber
+from .services import CampaignSender, get_campaign_delivery_stats
+from .tasks import dispatch_scheduled_campaigns, send_newsletter_campaign
+
+
+class CampaignDeliveryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='pass12345',
+            admin_type='admin'
+        )
+        for i in range(5):
+            NewsletterSubscriber.objects.create(email=f'sub{i}@example.com')
+        NewsletterSubscriber.objects.create(email='gone@example.com', is_active=False)
+
+    def _campaign(self, **kwargs):
+        defaults = {
+            'subject': 'Spring offers',
+            'content': '<p>Hi {{email}}, see <a href="https://example.com/offers">offers</a></p>',
+            'created_by': self.admin,
+        }
+        defaults.update(kwargs)
+        return NewsletterCampaign.objects.create(**defaults)
+
+    def test_sender_delivers_to_active_subscribers_in_batches(self):
+        campaign = self._campaign()
+        result = CampaignSender(batch_size=2).send(campaign, base_url='https://pchm.test')
+
+        campaign.refresh_from_db()
+        self.assertEqual(result.sent, 5)
+        self.assertEqual(campaign.status, 'sent')
+        self.assertEqual(campaign.recipients_count, 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(NewsletterRecipient.objects.filter(campaign=campaign).count(), 5)
+        self.assertIn('https://pchm.test/api/newsletter/campaigns/', mail.outbox[0].alternatives[0][0])
+
+    def test_sender_records_per_recipient_delivery(self):
+        campaign = self._campaign()
+        original_send = mail.EmailMultiAlternatives.send
+
+        def flaky_send(message, *args, **kwargs):
+            if message.to == ['sub3@example.com']:
+                raise smtplib.SMTPRecipientsRefused({'sub3@example.com': (550, b'No such user')})
+            return original_send(message, *args, **kwargs)
+
+        with patch.object(mail.EmailMultiAlternatives, 'send', flaky_send):
+            CampaignSender().send(campaign, base_url='https://pchm.test')
+
+        bounced = NewsletterRecipient.objects.get(campaign=campaign, email='sub3@example.com')
+        self.assertEqual(bounced.delivery_status, 'bounced')
+        self.assertEqual(bounced.attempts, 1)
+        self.assertIn('No such user', bounced.last_error)
+
+        stats = get_campaign_delivery_stats(campaign)
+        self.assertEqual(stats['delivery']['sent'], 4)
+        self.assertEqual(stats['delivery']['bounced'], 1)
+        self.assertEqual(stats['smtp_latency_ms']['samples'], 4)
+        self.assertIsNotNone(stats['smtp_latency_ms']['p95'])
+        self.assertEqual(stats['recent_failures'][0]['email'], 'sub3@example.com')
+
+    def test_dispatcher_claims_only_due_scheduled_campaigns(self):
+        due = self._campaign(status='scheduled', scheduled_at=timezone.now() - timedelta(minutes=1))
+        future = self._campaign(status='scheduled', scheduled_at=timezone.now() + timedelta(hours=1))
+        draft = self._campaign()
+
+        with patch.object(send_newsletter_campaign, 'delay') as delay:
+            claimed = dispatch_scheduled_campaigns()
+
+        self.assertEqual(claimed, [due.pk])
+        delay.assert_called_once_with(due.pk)
+        due.refresh_from_db()
+        future.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertEqual(due.status, 'sending')
+        self.assertEqual(future.status, 'scheduled')
+        self.assertEqual(draft.status, 'draft')
+
+    def test_resent_campaign_skips_delivered_recipients(self):
+        campaign = self._campaign()
+        original_send = mail.EmailMultiAlternatives.send
+
+        def dies_at_sub3(message, *args, **kwargs):
+            if message.to == ['sub3@example.com']:
+                raise SystemExit('worker killed')
+            return original_send(message, *args, **kwargs)
+
+        with patch.object(mail.EmailMultiAlternatives, 'send', dies_at_sub3):
+            with self.assertRaises(SystemExit):
+                CampaignSender(batch_size=2).send(campaign, base_url='https://pchm.test')
+        # Statuses are written per batch: the interrupted batch's sends were not recorded
+        self.assertEqual(len(mail.outbox), 3)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sending')
+        result = CampaignSender(batch_size=2).send(campaign, base_url='https://pchm.test')
+
+        self.assertEqual((result.sent, result.skipped), (3, 2))
+        recipients = [message.to[0] for message in mail.outbox]
+        self.assertEqual(recipients.count('sub0@example.com'), 1)
+        self.assertEqual(recipients.count('sub4@example.com'), 1)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sent')
+
+    def test_dispatcher_resumes_stalled_sends(self):
+        stalled = self._campaign(status='sending')
+        running = self._campaign(status='sending')
+        NewsletterCampaign.objects.filter(pk=stalled.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        with patch.object(send_newsletter_campaign, 'delay') as delay:
+            claimed = dispatch_scheduled_campaigns()
+
+        self.assertEqual(claimed, [stalled.pk])
+        delay.assert_called_once_with(stalled.pk)
+        stalled.refresh_from_db()
+        self.assertGreater(stalled.updated_at, timezone.now() - timedelta(minutes=1))
+        # A send that is still making progress is left to its worker
+        self.assertEqual(NewsletterCampaign.objects.get(pk=running.pk).updated_at, running.updated_at)
+
+    def test_send_task_skips_unclaimed_campaign(self):
+        campaign = self._campaign(status='scheduled', scheduled_at=timezone.now())
+        self.assertIsNone(send_newsletter_campaign(campaign.pk))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class CampaignActionTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='pass12345',
+            admin_type=User.ROLE_ADMIN,
+            status=User.STATUS_ACTIVE,
+            is_email_verified=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        NewsletterSubscriber.objects.create(email='reader@example.com')
+        self.campaign = NewsletterCampaign.objects.create(
+            subject='Hello', content='<p>Hello</p>', created_by=self.admin
+        )
+
+    def test_send_campaign_sends_immediately(self):
+        response = self.client.post(f'/api/newsletter/campaigns/{self.campaign.pk}/send_campaign/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], 'Campaign sent to 1 out of 1 subscribers')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_schedule_and_unschedule(self):
+        when = (timezone.now() + timedelta(days=1)).isoformat()
+        response = self.client.post(
+            f'/api/newsletter/campaigns/{self.campaign.pk}/schedule/', {'scheduled_at': when}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'scheduled')
+
+        response = self.client.post(f'/api/newsletter/campaigns/{self.campaign.pk}/unschedule/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'draft')
 
-# Create your tests here.
+    def test_stats_endpoint(self):
+        self.client.post(f'/api/newsletter/campaigns/{self.campaign.pk}/send_campaign/')
+        response = self.client.get(f'/api/newsletter/campaigns/{self.campaign.pk}/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['delivery']['sent'], 1)
+        self.assertIn('sends_per_second', response.data['throughput'])
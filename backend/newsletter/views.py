@@ -3,19 +3,18 @@ from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.core.mail import send_mass_mail, send_mail, EmailMultiAlternatives
+from django.core.mail import send_mass_mail, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
-from django.utils.html import strip_tags
 from django.utils import timezone
 from django.http import HttpResponse, HttpResponseRedirect
-from django.urls import reverse
 from django.db.models import F
 from django.core.signing import TimestampSigner
-import re
+from django.utils.dateparse import parse_datetime
 
 from .models import NewsletterSubscriber, NewsletterCampaign, NewsletterRecipient
 from .serializers import NewsletterSubscriberSerializer, NewsletterCampaignSerializer
+from .services import CampaignSender, build_campaign_message, get_campaign_delivery_stats
 from utils.permissions import IsAdmin
 
 @api_view(['POST'])
@@ -129,99 +128,65 @@ class NewsletterCampaignViewSet(viewsets.ModelViewSet):
         if campaign.status != 'draft':
             return Response({'error': 'Campaign can only be sent from draft status'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get active subscribers
-        subscribers = NewsletterSubscriber.objects.filter(is_active=True)
-        recipients = [subscriber.email for subscriber in subscribers]
-
-        if not recipients:
+        if not NewsletterSubscriber.objects.filter(is_active=True).exists():
             return Response({'error': 'No active subscribers found'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update campaign status
-        campaign.status = 'sending'
-        campaign.recipients_count = len(recipients)
-        campaign.sent_at = timezone.now()
-        campaign.save()
-
-        # Send emails (this would typically be done asynchronously with Celery)
+        # Interactive sends go out unthrottled; use the schedule action for large lists
         try:
-            # For simplicity, sending synchronously (use Celery in production)
-            sent_count = 0
-            errors = []
-            signer = TimestampSigner()
-            
-            for email in recipients:
-                try:
-                    # Ensure recipient tracking record and token
-                    recipient, _ = NewsletterRecipient.objects.get_or_create(
-                        campaign=campaign,
-                        email=email,
-                        defaults={'is_test': False, 'token': signer.sign(f"{campaign.id}:{email}")}
-                    )
-                    if not recipient.token:
-                        recipient.token = signer.sign(f"{campaign.id}:{email}")
-                        recipient.save(update_fields=['token'])
-
-                    html_content = campaign.content.replace('{{email}}', email)
-                    footer_html = f"""
-                    <hr style='border:none;border-top:1px solid #eee;margin:20px 0;'/>
-                    <div style='font-size:12px;color:#666'>
-                      You are receiving this email because you subscribed to our newsletter.
-                      <br/>
-                      <a href="/unsubscribe?email={email}">Unsubscribe</a>
-                    </div>
-                    """
-                    # Append tracking pixel (open)
-                    pixel_url = request.build_absolute_uri(
-                        reverse('newsletter:campaign-open', args=[campaign.id])
-                    )
-                    tracking_pixel = f'<img src="{pixel_url}?t={recipient.token}" width="1" height="1" style="display:none" alt="." />'
-                    # Rewrite links to pass through click tracker
-                    click_base = request.build_absolute_uri(
-                        reverse('newsletter:campaign-click', args=[campaign.id])
-                    )
-                    def _rewrite_link(match: re.Match) -> str:
-                        href = match.group(1)
-                        # Only rewrite http(s) links
-                        if href.startswith('http://') or href.startswith('https://'):
-                            return f'href="{click_base}?t={recipient.token}&u={href}"'
-                        return f'href="{href}"'
-                    html_content = re.sub(r'href="([^"]+)"', _rewrite_link, html_content)
-                    html_content = f"{html_content}{tracking_pixel}{footer_html}"
-                    plain_content = strip_tags(html_content)
-
-                    # Use EmailMultiAlternatives to support HTML
-                    msg = EmailMultiAlternatives(
-                        subject=campaign.subject,
-                        body=plain_content,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[email],
-                    )
-                    msg.attach_alternative(html_content, "text/html")
-                    msg.send(fail_silently=False)
-                    sent_count += 1
-                except Exception as e:
-                    errors.append(f"Failed to send to {email}: {str(e)}")
-                    # Continue sending to other recipients even if one fails
-
-            if sent_count > 0:
-                campaign.status = 'sent'
-                campaign.save()
-                message = f'Campaign sent to {sent_count} out of {len(recipients)} subscribers'
-                if errors:
-                    message += f'. {len(errors)} failed.'
-                return Response({'message': message})
-            else:
-                campaign.status = 'cancelled'
-                campaign.save()
-                return Response({
-                    'error': f'Failed to send campaign to any subscribers. Errors: {", ".join(errors[:5])}'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+            result = CampaignSender().send(campaign, base_url=_request_base_url(request))
         except Exception as e:
             campaign.status = 'cancelled'
             campaign.save()
             return Response({'error': f'Failed to send campaign: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        if result.sent > 0:
+            message = f'Campaign sent to {result.sent} out of {result.total} subscribers'
+            if result.errors:
+                message += f'. {result.failed} failed.'
+            return Response({'message': message})
+        return Response({
+            'error': f'Failed to send campaign to any subscribers. Errors: {", ".join(result.errors[:5])}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Delivery metrics: per-status counts, sends/sec, SMTP latency percentiles and failures"""
+        campaign = self.get_object()
+        return Response(get_campaign_delivery_stats(campaign))
+
+    @action(detail=True, methods=['post'])
+    def schedule(self, request, pk=None):
+        """Schedule a draft campaign for background delivery at ``scheduled_at``"""
+        campaign = self.get_object()
+
+        if campaign.status not in ('draft', 'scheduled'):
+            return Response({'error': 'Only draft or scheduled campaigns can be scheduled'}, status=status.HTTP_400_BAD_REQUEST)
+
+        scheduled_at = request.data.get('scheduled_at')
+        parsed = parse_datetime(scheduled_at) if scheduled_at else timezone.now()
+        if parsed is None:
+            return Response({'error': 'scheduled_at must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+
+        campaign.status = 'scheduled'
+        campaign.scheduled_at = parsed
+        campaign.save(update_fields=['status', 'scheduled_at', 'updated_at'])
+        return Response(self.get_serializer(campaign).data)
+
+    @action(detail=True, methods=['post'])
+    def unschedule(self, request, pk=None):
+        """Return a scheduled campaign to draft before it is dispatched"""
+        campaign = self.get_object()
+        # Conditional update so a campaign already claimed by the dispatcher is left alone
+        updated = NewsletterCampaign.objects.filter(pk=campaign.pk, status='scheduled').update(
+            status='draft', updated_at=timezone.now()
+        )
+        if not updated:
+            return Response({'error': 'Campaign is not scheduled'}, status=status.HTTP_400_BAD_REQUEST)
+        campaign.refresh_from_db()
+        return Response(self.get_serializer(campaign).data)
+
     @action(detail=True, methods=['post'])
     def send_test(self, request, pk=None):
         """Send a test email of the campaign to a specified address"""
@@ -242,46 +207,17 @@ class NewsletterCampaignViewSet(viewsets.ModelViewSet):
                 recipient.is_test = True
                 recipient.save(update_fields=['token', 'is_test'])
 
-            html_content = campaign.content.replace('{{email}}', email)
-            footer_html = f"""
-            <hr style='border:none;border-top:1px solid #eee;margin:20px 0;'/>
-            <div style='font-size:12px;color:#666'>
-              This is a test email preview of your campaign.
-              <br/>
-              <a href="/unsubscribe?email={email}">Unsubscribe</a>
-            </div>
-            """
-            # Append tracking pixel (open)
-            pixel_url = request.build_absolute_uri(
-                reverse('newsletter:campaign-open', args=[campaign.id])
-            )
-            tracking_pixel = f'<img src="{pixel_url}?t={recipient.token}" width="1" height="1" style="display:none" alt="." />'
-            # Rewrite links to pass through click tracker
-            click_base = request.build_absolute_uri(
-                reverse('newsletter:campaign-click', args=[campaign.id])
-            )
-            def _rewrite_link(match: re.Match) -> str:
-                href = match.group(1)
-                if href.startswith('http://') or href.startswith('https://'):
-                    return f'href="{click_base}?t={recipient.token}&u={href}"'
-                return f'href="{href}"'
-            html_content = re.sub(r'href="([^"]+)"', _rewrite_link, html_content)
-            html_content = f"{html_content}{tracking_pixel}{footer_html}"
-            plain_content = strip_tags(html_content)
-
-            msg = EmailMultiAlternatives(
-                subject=f"[TEST] {campaign.subject}",
-                body=plain_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[email],
-            )
-            msg.attach_alternative(html_content, "text/html")
+            msg = build_campaign_message(campaign, recipient, _request_base_url(request), test=True)
             msg.send(fail_silently=False)
             return Response({'message': f'Test email sent to {email}'})
         except Exception as e:
             return Response({'error': f'Failed to send test email: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _request_base_url(request) -> str:
+    return request.build_absolute_uri('/').rstrip('/')
+
+
 def _one_by_one_transparent_gif() -> bytes:
     # Minimal 1x1 transparent GIF
     return (
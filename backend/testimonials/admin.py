@@ -1,5 +1,8 @@
 from django.contrib import admin
 
+from config.signals import invalidate_model_cache
+from utils.bulk_operations import bulk_update_fields
+
 from .models import Testimonial
 
 
@@ -9,3 +12,17 @@ class TestimonialAdmin(admin.ModelAdmin):
     list_filter = ('status', 'rating')
     search_fields = ('name', 'feedback')
     readonly_fields = ('created_at', 'updated_at')
+    actions = ('approve_testimonials', 'reject_testimonials')
+
+    def _set_status(self, request, queryset, status, label):
+        stats = bulk_update_fields(queryset, {'status': status})
+        invalidate_model_cache(Testimonial)
+        self.message_user(request, f"{stats.rows} testimonials {label}.")
+
+    @admin.action(description='Approve selected testimonials')
+    def approve_testimonials(self, request, queryset):
+        self._set_status(request, queryset, 'approved', 'approved')
+
+    @admin.action(description='Reject selected testimonials')
+    def reject_testimonials(self, request, queryset):
+        self._set_status(request, queryset, 'rejected', 'rejected')
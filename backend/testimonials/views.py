@@ -6,10 +6,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import Testimonial
 from .serializers import TestimonialSerializer, TestimonialCreateSerializer
 from .throttles import TestimonialSubmissionThrottle
+from utils.cache import CachedListMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
 
 
-class TestimonialViewSet(viewsets.ModelViewSet):
+class TestimonialViewSet(CachedListMixin, viewsets.ModelViewSet):
+    cache_namespace = 'testimonials'
     queryset = Testimonial.objects.all().order_by('-created_at')
     filter_backends = []
 
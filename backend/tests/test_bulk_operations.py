@@ -0,0 +1,103 @@
+"""
+Tests for batched bulk write helpers.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from analytics.models import PageView, VisitorSession
+from faq.models import FAQ
+from newsletter.models import NewsletterSubscriber
+from utils.bulk_operations import (
+    BulkOperationError,
+    bulk_create_optimized,
+    bulk_delete_optimized,
+    bulk_update_fields,
+    bulk_update_optimized,
+    bulk_upsert,
+    iter_keyset_chunks,
+)
+
+
+@pytest.mark.django_db
+class TestBulkOperations:
+    """Test keyset-chunked bulk writes."""
+
+    def _faqs(self, count):
+        return [FAQ.objects.create(question=f'Q{i}', answer='A', display_order=i) for i in range(count)]
+
+    def test_keyset_chunks_cover_every_row(self):
+        """Chunks are disjoint and complete."""
+        faqs = self._faqs(7)
+        chunks = list(iter_keyset_chunks(FAQ.objects.all(), batch_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [faq.pk for chunk in chunks for faq in chunk] == [faq.pk for faq in faqs]
+
+    def test_update_fields_single_and_chunked(self):
+        """Both modes update every row, touching auto_now fields and reporting progress."""
+        faqs = self._faqs(5)
+        before = faqs[0].updated_at
+
+        stats = bulk_update_fields(FAQ.objects.all(), {'display_order': F('display_order') + 10})
+        assert (stats.rows, stats.batches) == (5, 1)
+
+        seen = []
+        stats = bulk_update_fields(FAQ.objects.all(), {'is_active': False}, batch_size=2, progress=seen.append)
+        assert (stats.rows, stats.batches) == (5, 3)
+        assert len(seen) == 3
+        assert not FAQ.objects.filter(is_active=True).exists()
+        assert sorted(FAQ.objects.values_list('display_order', flat=True)) == [10, 11, 12, 13, 14]
+        assert FAQ.objects.get(pk=faqs[0].pk).updated_at > before
+
+    def test_update_optimized(self):
+        """Modified instances are saved in batches."""
+        faqs = self._faqs(3)
+        for faq in faqs:
+            faq.answer = 'changed'
+        assert bulk_update_optimized(faqs, ['answer'], batch_size=2).rows == 3
+        assert FAQ.objects.filter(answer='changed').count() == 3
+
+    def test_delete_in_chunks(self):
+        """Deletes commit chunk by chunk and count only the target model."""
+        self._faqs(5)
+        stats = bulk_delete_optimized(FAQ.objects.filter(display_order__lt=4), batch_size=2)
+        assert (stats.rows, stats.batches) == (4, 2)
+        assert FAQ.objects.count() == 1
+
+    def test_upsert_updates_existing_rows(self):
+        """Conflicting rows are updated in the same statement as new inserts."""
+        NewsletterSubscriber.objects.create(email='a@example.com', is_active=False)
+        stats = bulk_upsert(
+            NewsletterSubscriber,
+            (NewsletterSubscriber(email=email, is_active=True) for email in ['a@example.com', 'b@example.com']),
+            unique_fields=['email'],
+            update_fields=['is_active'],
+        )
+        assert stats.rows == 2
+        assert NewsletterSubscriber.objects.filter(is_active=True).count() == 2
+
+    def test_failure_keeps_committed_batches(self):
+        """A failing batch raises with the stats of the batches already committed."""
+        objects = [
+            NewsletterSubscriber(email='x@example.com'),
+            NewsletterSubscriber(email='y@example.com'),
+            NewsletterSubscriber(email='x@example.com'),
+        ]
+        with pytest.raises(BulkOperationError) as excinfo:
+            bulk_create_optimized(NewsletterSubscriber, objects, batch_size=2)
+        assert excinfo.value.stats.rows == 2
+        assert NewsletterSubscriber.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_backfill_visitor_sessions():
+    """Session totals are rebuilt from page views; missing sessions are created."""
+    VisitorSession.objects.create(session_id='s1', page_views_count=99)
+    for session_id in ['s1', 's1', 's2']:
+        PageView.objects.create(page_path='/', session_id=session_id)
+
+    call_command('backfill_visitor_sessions', '--batch-size', '1', stdout=StringIO())
+
+    assert dict(VisitorSession.objects.values_list('session_id', 'page_views_count')) == {'s1': 2, 's2': 1}
@@ -0,0 +1,181 @@
+"""
+Tests for cache key generation and cached list responses.
+"""
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.http import QueryDict
+from rest_framework.test import APIClient
+
+from faq.models import FAQ
+from utils.cache import (
+    _MISSING,
+    CacheManager,
+    TwoTierCache,
+    bump_namespace,
+    cache_result,
+    cache_stats,
+    get_cache_key,
+    get_namespace_version,
+)
+
+
+class TestGetCacheKey:
+    """Test deterministic cache keys."""
+
+    def test_kwargs_order_does_not_matter(self):
+        """Equivalent calls produce the same key."""
+        assert get_cache_key('p', 1, a=1, b=[1, 2]) == get_cache_key('p', 1, b=[1, 2], a=1)
+
+    def test_different_arguments_differ(self):
+        """Different arguments produce different keys."""
+        assert get_cache_key('p', 1) != get_cache_key('p', '1')
+        assert get_cache_key('p', QueryDict('page=1')) != get_cache_key('p', QueryDict('page=2'))
+
+    def test_stable_across_processes(self):
+        """Keys do not depend on per-process hash randomization."""
+        code = (
+            "import django, os;"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development');"
+            "django.setup();"
+            "from utils.cache import get_cache_key;"
+            "print(get_cache_key('vehicles', 'x', page=2, tags={'a', 'b'}))"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        assert output == get_cache_key('vehicles', 'x', page=2, tags={'b', 'a'})
+
+
+class TestCacheResult:
+    """Test the cache_result decorator."""
+
+    def setup_method(self):
+        cache.clear()
+        cache_stats.reset()
+
+    def test_none_results_are_cached(self):
+        """A cached None is a hit, not a miss."""
+        calls = []
+
+        @cache_result(timeout=60, key_prefix='test_none')
+        def lookup(value):
+            calls.append(value)
+            return None
+
+        assert lookup(1) is None
+        assert lookup(1) is None
+        assert calls == [1]
+        assert cache_stats.snapshot()['test_none'] == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+
+class TestNamespaceInvalidation:
+    """Test generation-based namespace invalidation."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_bump_drops_namespace_results_only(self):
+        """Bumping a namespace recomputes its results and leaves other keys alone."""
+        calls = []
+
+        @cache_result(timeout=60, key_prefix='listing', namespace='vehicles')
+        def listing():
+            calls.append(1)
+            return len(calls)
+
+        cache.set('throttle_anon_1.2.3.4', [1, 2, 3])
+        assert listing() == 1
+        assert listing() == 1
+
+        before = get_namespace_version('vehicles')
+        CacheManager.invalidate_vehicle_cache(vehicle_id=5)
+        assert get_namespace_version('vehicles') == before + 1
+        assert listing() == 2
+        assert cache.get('throttle_anon_1.2.3.4') == [1, 2, 3]
+
+    def test_bump_after_counter_eviction_starts_new_generation(self):
+        """A lost version counter never resurrects an old generation."""
+        old = get_namespace_version('blog')
+        cache.delete('pchm:ns_version:blog')
+        bump_namespace('blog')
+        assert get_namespace_version('blog') != old
+
+
+class TestTwoTierCache:
+    """Test the in-process tier in front of the shared cache."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_local_tier_serves_without_shared_cache(self):
+        """Values (including None) are served from process memory."""
+        tier = TwoTierCache('two_tier_test', local_ttl=60, poll_interval=60)
+        calls = []
+        assert tier.get_or_set('k', lambda: calls.append(1)) is None
+        cache.clear()
+        assert tier.get_or_set('k', lambda: calls.append(1)) is None
+        assert calls == [1]
+
+    def test_generation_bump_reaches_other_processes(self):
+        """Another process's invalidation drops local entries on the next poll."""
+        tier = TwoTierCache('two_tier_test', local_ttl=60, poll_interval=0)
+        assert tier.get_or_set('k', lambda: 'old') == 'old'
+        bump_namespace('two_tier_test')  # as done by another worker
+        assert tier.get_or_set('k', lambda: 'new') == 'new'
+
+    def test_single_flight_on_miss(self):
+        """Concurrent misses for one key compute the value once."""
+        tier = TwoTierCache('two_tier_test', local_ttl=60, poll_interval=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+
+        threads = [threading.Thread(target=tier.get_or_set, args=('k', compute)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == [1]
+
+
+    def test_fallback_leaves_other_holders_lock(self, monkeypatch):
+        """Computing after the wait times out does not release another process's lock."""
+        tier = TwoTierCache('two_tier_test', local_ttl=60, poll_interval=60)
+        lock_key = f"{tier._shared_key(tier._current_generation(), 'k')}:lock"
+        cache.add(lock_key, 1, 30)  # held by another process
+        monkeypatch.setattr(tier, '_wait_for', lambda shared_key: _MISSING)
+
+        assert tier.get_or_set('k', lambda: 'value') == 'value'
+        assert cache.get(lock_key) == 1
+
+@pytest.mark.django_db
+class TestCachedListMixin:
+    """Test cached public list responses."""
+
+    def setup_method(self):
+        cache.clear()
+        cache_stats.reset()
+
+    def test_anonymous_list_is_cached_and_invalidated(self):
+        """Second anonymous request is a hit; a model save invalidates it."""
+        client = APIClient()
+        FAQ.objects.create(question='Q1', answer='A1')
+
+        first = client.get('/api/faqs/')
+        second = client.get('/api/faqs/')
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert first.json() == second.json()
+
+        FAQ.objects.create(question='Q2', answer='A2')
+        third = client.get('/api/faqs/')
+        assert third['X-Cache'] == 'MISS'
+        assert len(third.json()['results']) == 2
@@ -0,0 +1,122 @@
+"""
+Tests for car listing search and facet counts.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from car_sales.models import CarListing, CarListingFacet
+from car_sales.search import rebuild_facets, stored_facets
+
+
+def make_listing(registration, **overrides):
+    values = {
+        'make': 'BMW', 'model': 'X5', 'year': 2021, 'mileage': 10000, 'color': 'Black',
+        'registration': registration, 'price': 45000, 'fuel_type': 'diesel',
+        'transmission': 'automatic', 'description': 'Family SUV', 'status': 'published',
+    }
+    values.update(overrides)
+    return CarListing.objects.create(**values)
+
+
+def facet(data, name):
+    return {item['value']: item['count'] for item in data[name]}
+
+
+@pytest.fixture
+def catalogue():
+    return [
+        make_listing('S1'),
+        make_listing('S2', model='320d', year=2016, price=18000, transmission='manual',
+                     description='Saloon with leather seats'),
+        make_listing('S3', make='Toyota', model='Prius', year=2019, price=16000, fuel_type='hybrid',
+                     description='Economical hybrid hatchback'),
+        make_listing('S4', make='Ford', model='Fiesta', year=2008, price=3500, fuel_type='petrol',
+                     transmission='manual', description='First car'),
+        make_listing('S5', make='Toyota', model='Corolla', status='draft'),
+    ]
+
+
+@pytest.mark.django_db
+class TestFacetMaintenance:
+    """Test that stored counts follow saves and deletes."""
+
+    def test_counts_published_listings_only(self, catalogue):
+        """Drafts are not counted."""
+        facets = stored_facets()
+        assert facet(facets, 'make') == {'BMW': 2, 'Toyota': 1, 'Ford': 1}
+        assert facet(facets, 'year') == {'pre-2010': 1, '2015-2019': 2, '2020-plus': 1}
+        assert facet(facets, 'price') == {'under-10k': 1, '10k-20k': 2, '30k-50k': 1}
+
+    def test_updates_move_counts(self, catalogue):
+        """Changing a field moves one count; publishing and deleting add and remove."""
+        ford, draft = catalogue[3], catalogue[4]
+        ford.make = 'Toyota'
+        ford.save()
+        draft.status = 'published'
+        draft.save()
+        catalogue[0].delete()
+
+        facets = stored_facets()
+        assert facet(facets, 'make') == {'Toyota': 3, 'BMW': 1}
+        assert facet(facets, 'transmission') == {'automatic': 2, 'manual': 2}
+
+    def test_unrelated_update_skips_facets(self, catalogue):
+        """Saves that touch no faceted field do not query the facet table."""
+        with CaptureQueriesContext(connection) as queries:
+            catalogue[0].save(update_fields=['mileage'])
+        assert not any('carlistingfacet' in query['sql'] for query in queries.captured_queries)
+
+    def test_rebuild_matches_incremental_counts(self, catalogue):
+        """A rebuild recounts bulk changes that bypassed signals."""
+        before = stored_facets()
+        CarListingFacet.objects.all().delete()
+        rebuild_facets()
+        assert stored_facets() == before
+
+        CarListing.objects.filter(make='Toyota').update(status='sold')
+        rebuild_facets()
+        assert 'Toyota' not in facet(stored_facets(), 'make')
+
+
+@pytest.mark.django_db
+class TestSearchEndpoint:
+    """Test /api/car-listings/search/."""
+
+    def test_results_and_facets_in_one_response(self, catalogue):
+        """An empty query returns the published catalogue with stored facets."""
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get('/api/car-listings/search/')
+        assert response.status_code == 200
+        assert response.data['count'] == 4
+        assert facet(response.data['facets'], 'make')['BMW'] == 2
+        # Unfiltered facets are one read of the stored counts
+        facet_queries = [query for query in queries.captured_queries if 'carlistingfacet' in query['sql']]
+        assert len(facet_queries) == 1
+
+    def test_text_query_matches_prefixes(self, catalogue):
+        """Words match make, model and description by prefix, all words required."""
+        response = APIClient().get('/api/car-listings/search/', {'q': 'hybr'})
+        assert [row['registration'] for row in response.data['results']] == ['S3']
+
+        response = APIClient().get('/api/car-listings/search/', {'q': 'bmw leath'})
+        assert [row['registration'] for row in response.data['results']] == ['S2']
+        assert 'search_vector' not in response.data['results'][0]
+
+    def test_facets_follow_filters(self, catalogue):
+        """Filtered searches count within the matching listings."""
+        response = APIClient().get('/api/car-listings/search/', {'transmission': 'manual'})
+        assert response.data['count'] == 2
+        assert facet(response.data['facets'], 'make') == {'BMW': 1, 'Ford': 1}
+        assert facet(response.data['facets'], 'transmission') == {'manual': 2}
+
+    def test_bucket_filters(self, catalogue):
+        """Year and price buckets filter like the facets count them."""
+        response = APIClient().get('/api/car-listings/search/', {'price_bucket': '10k-20k', 'year_bucket': '2015-2019'})
+        assert sorted(row['registration'] for row in response.data['results']) == ['S2', 'S3']
+
+    def test_drafts_are_not_searchable(self, catalogue, admin_client):
+        """Admins search the same published catalogue."""
+        response = admin_client.get('/api/car-listings/search/', {'q': 'corolla'})
+        assert response.data['count'] == 0
@@ -0,0 +1,107 @@
+"""
+Tests for negotiated response compression.
+"""
+import gzip
+import json
+
+import pytest
+import zstandard
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _middleware():
+    return CompressionMiddleware(lambda request: None)
+
+
+def _json_response(**headers):
+    response = HttpResponse(json.dumps({'items': list(range(500))}), content_type='application/json')
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+class TestNegotiateEncoding:
+    """Test Accept-Encoding negotiation."""
+
+    def test_server_preference_breaks_ties(self):
+        assert negotiate_encoding('gzip, zstd', ['br', 'zstd', 'gzip']) == 'zstd'
+
+    def test_client_quality_wins(self):
+        assert negotiate_encoding('zstd;q=0.5, gzip', ['br', 'zstd', 'gzip']) == 'gzip'
+
+    def test_refused_and_unknown(self):
+        assert negotiate_encoding('gzip;q=0', ['gzip']) is None
+        assert negotiate_encoding('identity', ['gzip']) is None
+        assert negotiate_encoding('*', ['gzip']) == 'gzip'
+
+
+class TestCompressionMiddleware:
+    """Test response compression."""
+
+    @pytest.fixture(autouse=True)
+    def _settings(self, settings):
+        settings.DEBUG = False
+        settings.COMPRESSION_ENCODINGS = ['br', 'zstd', 'gzip']
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_gzip_body(self):
+        request = self.factory.get('/api/vehicles/', HTTP_ACCEPT_ENCODING='gzip')
+        response = _middleware().process_response(request, _json_response())
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content))['items'][-1] == 499
+
+    def test_zstd_preferred(self):
+        request = self.factory.get('/api/vehicles/', HTTP_ACCEPT_ENCODING='gzip, zstd')
+        response = _middleware().process_response(request, _json_response())
+        assert response['Content-Encoding'] == 'zstd'
+        body = zstandard.ZstdDecompressor().decompress(response.content)
+        assert json.loads(body)['items'][0] == 0
+
+    def test_streaming_response_compressed_incrementally(self):
+        request = self.factory.get('/api/export/', HTTP_ACCEPT_ENCODING='gzip')
+        chunks = [b'{"row": %d}\n' % i * 20 for i in range(50)]
+        response = StreamingHttpResponse(iter(chunks), content_type='text/plain')
+        response = _middleware().process_response(request, response)
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        compressed = list(response.streaming_content)
+        assert len(compressed) > 1
+        assert gzip.decompress(b''.join(compressed)) == b''.join(chunks)
+
+    def test_compressed_body_cached_by_etag(self, monkeypatch):
+        calls = []
+        original = gzip.compress
+
+        def counting_compress(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(gzip, 'compress', counting_compress)
+        for _ in range(3):
+            request = self.factory.get('/api/faqs/', HTTP_ACCEPT_ENCODING='gzip')
+            response = _middleware().process_response(request, _json_response(ETag='"abc"'))
+            assert response['ETag'] == 'W/"abc"'
+        assert len(calls) == 1
+
+    def test_representations_cached_separately(self):
+        """JSON and HTML bodies under one URL and ETag are not mixed up."""
+        request = self.factory.get('/api/faqs/', HTTP_ACCEPT_ENCODING='gzip')
+        _middleware().process_response(request, _json_response(ETag='"abc"'))
+
+        html = HttpResponse('<html>' + 'row ' * 500 + '</html>', content_type='text/html; charset=utf-8')
+        html['ETag'] = '"abc"'
+        request = self.factory.get('/api/faqs/', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+        response = _middleware().process_response(request, html)
+        assert gzip.decompress(response.content).startswith(b'<html>')
+
+    @pytest.mark.parametrize('path', ['/admin/', '/static/app.js'])
+    def test_non_api_paths_untouched(self, path):
+        request = self.factory.get(path, HTTP_ACCEPT_ENCODING='gzip')
+        response = _middleware().process_response(request, _json_response())
+        assert not response.has_header('Content-Encoding')
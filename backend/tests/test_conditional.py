@@ -0,0 +1,96 @@
+"""
+Tests for conditional GET on public read endpoints.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from faq.models import FAQ
+
+
+@pytest.mark.django_db
+class TestConditionalGetMixin:
+    """Test ETag/Last-Modified validators on viewsets."""
+
+    def setup_method(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_returns_304_when_unchanged(self):
+        """A matching If-None-Match skips serialization entirely."""
+        FAQ.objects.create(question='Q1', answer='A1')
+        first = self.client.get('/api/faqs/')
+        assert first.status_code == 200
+        etag = first['ETag']
+        assert first['Last-Modified']
+        assert 'no-cache' in first['Cache-Control']
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get('/api/faqs/', HTTP_IF_NONE_MATCH=etag)
+        assert second.status_code == 304
+        assert second['ETag'] == etag
+        assert len(queries) == 1  # the validator aggregate only
+
+    def test_list_etag_changes_on_write(self):
+        """Edits and deletes change the validator."""
+        faq = FAQ.objects.create(question='Q1', answer='A1')
+        etag = self.client.get('/api/faqs/')['ETag']
+
+        faq.answer = 'A2'
+        faq.save()
+        assert self.client.get('/api/faqs/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        etag = self.client.get('/api/faqs/')['ETag']
+        faq.delete()
+        assert self.client.get('/api/faqs/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_list_if_modified_since_sees_deletes(self):
+        """Deleting a row does not change MAX(updated_at), so lists only revalidate by ETag."""
+        FAQ.objects.create(question='Q1', answer='A1')
+        removed = FAQ.objects.create(question='Q2', answer='A2')
+        last_modified = self.client.get('/api/faqs/')['Last-Modified']
+        removed.delete()
+
+        response = self.client.get('/api/faqs/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200
+        assert len(response.data['results'] if isinstance(response.data, dict) else response.data) == 1
+
+    def test_representations_have_their_own_etags(self):
+        """JSON and the browsable API never share a validator."""
+        faq = FAQ.objects.create(question='Q1', answer='A1')
+        for url in ('/api/faqs/', f'/api/faqs/{faq.pk}/'):
+            as_json = self.client.get(url, HTTP_ACCEPT='application/json')
+            as_html = self.client.get(url, HTTP_ACCEPT='text/html')
+            assert as_json['ETag'] != as_html['ETag']
+            assert 'Accept' in as_json['Vary']
+            assert self.client.get(url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=as_json['ETag']).status_code == 200
+
+    def test_retrieve_and_landing_page(self):
+        """Detail views and the landing page singleton support validators."""
+        faq = FAQ.objects.create(question='Q1', answer='A1')
+        etag = self.client.get(f'/api/faqs/{faq.pk}/')['ETag']
+        assert self.client.get(f'/api/faqs/{faq.pk}/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        etag = self.client.get('/api/cms/landing-config/')['ETag']
+        assert self.client.get('/api/cms/landing-config/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+class TestPublicCachedResponse:
+    """Test date-scoped validators on the active theme endpoint."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_active_theme_304(self):
+        """A matching ETag is answered with 304 and the caching headers renewed."""
+        client = APIClient()
+        first = client.get('/api/theming/active-theme/')
+        assert first.status_code == 200
+        etag = first['ETag']
+        not_modified = client.get('/api/theming/active-theme/', HTTP_IF_NONE_MATCH=etag)
+        assert not_modified.status_code == 304
+        assert 'public' in not_modified['Cache-Control']
+        assert 'max-age=' in not_modified['Cache-Control']
@@ -0,0 +1,153 @@
+"""
+Tests for conversation inbox summaries and paged transcripts.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from chatbot.models import PREVIEW_LENGTH, Conversation, ConversationMessage
+
+
+def say(conversation, content, message_type='user'):
+    return ConversationMessage.objects.create(
+        conversation=conversation, content=content, message_type=message_type,
+        is_admin_reply=message_type == 'admin',
+    )
+
+
+@pytest.fixture
+def conversation():
+    return Conversation.objects.create(session_id='inbox-1')
+
+
+@pytest.mark.django_db
+class TestSummaryMaintenance:
+    """Test that summaries follow message writes."""
+
+    def test_messages_update_summary(self, conversation):
+        """Each message moves the preview and counts in one UPDATE."""
+        say(conversation, 'Hello')
+        with CaptureQueriesContext(connection) as queries:
+            last = say(conversation, 'Is the X5\n  still   available?')
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+
+        conversation.refresh_from_db()
+        assert conversation.message_count == 2
+        assert conversation.unread_count == 2
+        assert conversation.last_message_id == last.pk
+        assert conversation.last_message_type == 'user'
+        assert conversation.last_message_preview == 'Is the X5 still available?'
+
+    def test_assistant_messages_are_not_unread(self, conversation):
+        say(conversation, 'Hello')
+        say(conversation, 'Hi, how can I help?', 'assistant')
+        conversation.refresh_from_db()
+        assert conversation.message_count == 2
+        assert conversation.unread_count == 1
+        assert conversation.last_message_type == 'assistant'
+
+    def test_admin_reply_reads_conversation(self, conversation):
+        say(conversation, 'Hello')
+        reply = say(conversation, 'An agent is here', 'admin')
+        say(conversation, 'Thanks')
+        conversation.refresh_from_db()
+        assert conversation.last_read_message_id == reply.pk
+        assert conversation.unread_count == 1
+
+    def test_long_previews_are_truncated(self, conversation):
+        say(conversation, 'word ' * 100)
+        conversation.refresh_from_db()
+        assert len(conversation.last_message_preview) == PREVIEW_LENGTH
+        assert conversation.last_message_preview.endswith('...')
+
+    def test_stale_save_keeps_summary(self, conversation):
+        """Saving an instance loaded before new messages does not roll the summary back."""
+        say(conversation, 'Hello')
+        conversation.user_name = 'Sam'
+        conversation.save()
+        conversation.refresh_from_db()
+        assert conversation.user_name == 'Sam'
+        assert conversation.message_count == 1
+
+    def test_delete_recounts(self, conversation):
+        first = say(conversation, 'Hello')
+        last = say(conversation, 'Anyone there?')
+        last.delete()
+        conversation.refresh_from_db()
+        assert conversation.message_count == 1
+        assert conversation.unread_count == 1
+        assert conversation.last_message_id == first.pk
+        assert conversation.last_message_preview == 'Hello'
+
+    def test_refresh_summary_after_bulk_insert(self, conversation):
+        """Bulk inserts skip signals; refresh_summary recounts them."""
+        ConversationMessage.objects.bulk_create(
+            ConversationMessage(conversation=conversation, content=f'Bulk {number}') for number in range(3)
+        )
+        conversation.refresh_summary()
+        conversation.refresh_from_db()
+        assert conversation.message_count == 3
+        assert conversation.last_message_preview == 'Bulk 2'
+
+    def test_deleting_conversation(self, conversation):
+        say(conversation, 'Hello')
+        conversation.delete()
+        assert not ConversationMessage.objects.exists()
+
+
+@pytest.mark.django_db
+class TestInboxEndpoints:
+    """Test the admin conversation endpoints."""
+
+    def test_messages_are_paged_newest_first(self, admin_client, conversation):
+        sent = [say(conversation, f'Message {number}') for number in range(5)]
+        url = f'/api/chatbot/conversations/{conversation.pk}/messages/'
+
+        response = admin_client.get(url, {'page_size': 2})
+        assert response.status_code == 200
+        assert [row['id'] for row in response.data['results']] == [sent[4].pk, sent[3].pk]
+        assert response.data['count'] is None
+
+        pages = [row['id'] for row in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = admin_client.get(next_url)
+            pages += [row['id'] for row in response.data['results']]
+            next_url = response.data['next']
+        assert pages == [message.pk for message in reversed(sent)]
+
+    def test_messages_stay_in_their_conversation(self, admin_client, conversation):
+        other = Conversation.objects.create(session_id='inbox-2')
+        say(other, 'Elsewhere')
+        mine = say(conversation, 'Here')
+        response = admin_client.get(f'/api/chatbot/conversations/{conversation.pk}/messages/')
+        assert [row['id'] for row in response.data['results']] == [mine.pk]
+
+    def test_detail_has_no_transcript(self, admin_client, conversation):
+        say(conversation, 'Hello')
+        response = admin_client.get(f'/api/chatbot/conversations/{conversation.pk}/')
+        assert 'messages' not in response.data
+        assert response.data['unread_count'] == 1
+
+    def test_mark_read(self, admin_client, conversation):
+        last = say(conversation, 'Hello')
+        response = admin_client.post(f'/api/chatbot/conversations/{conversation.pk}/mark_read/')
+        assert response.status_code == 200
+        conversation.refresh_from_db()
+        assert conversation.unread_count == 0
+        assert conversation.last_read_message_id == last.pk
+
+    def test_summary_fields_are_read_only(self, admin_client, conversation):
+        say(conversation, 'Hello')
+        admin_client.patch(
+            f'/api/chatbot/conversations/{conversation.pk}/',
+            {'message_count': 99, 'user_name': 'Sam'}, content_type='application/json',
+        )
+        conversation.refresh_from_db()
+        assert conversation.user_name == 'Sam'
+        assert conversation.message_count == 1
+
+    def test_messages_require_admin(self, client, conversation):
+        response = client.get(f'/api/chatbot/conversations/{conversation.pk}/messages/')
+        assert response.status_code in (401, 403)
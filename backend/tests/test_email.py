@@ -0,0 +1,46 @@
+"""
+Tests for the cached email template layer.
+"""
+from django.test import SimpleTestCase
+from django.template.loader import render_to_string
+
+from utils.email import EmailTemplateCache
+
+
+class TestEmailTemplateCache(SimpleTestCase):
+    """Test compiled email template caching."""
+
+    def setUp(self):
+        self.templates = EmailTemplateCache()
+        self.context = {'otp_code': '482913', 'site_name': 'Prestige'}
+
+    def test_render_returns_html_and_text(self):
+        """Both bodies contain the dynamic values; only HTML has markup."""
+        html_body, text_body = self.templates.render('emails/otp_email.html', self.context)
+        assert '482913' in html_body
+        assert '<div' in html_body
+        assert '482913' in text_body
+        assert '<' not in text_body
+        assert 'Prestige Team' in text_body
+
+    def test_html_matches_render_to_string(self):
+        """The HTML body is identical to an uncached render."""
+        html_body, _ = self.templates.render('emails/otp_email.html', self.context)
+        assert html_body == render_to_string('emails/otp_email.html', self.context)
+
+    def test_templates_compiled_once(self):
+        """Repeated renders reuse the same compiled template."""
+        first = self.templates.get('emails/otp_email.html')
+        self.templates.render('emails/otp_email.html', self.context)
+        assert self.templates.get('emails/otp_email.html') is first
+
+    def test_markup_filters_dropped_from_text(self):
+        """linebreaksbr output stays as plain newlines in the text body."""
+        context = {
+            'inquiry': {'name': 'Sam', 'subject': 'Hello', 'created_at': None},
+            'reply_message': 'first\nsecond',
+            'site_name': 'Prestige',
+        }
+        html_body, text_body = self.templates.render('emails/inquiry_reply.html', context)
+        assert 'first<br>second' in html_body
+        assert 'first\nsecond' in text_body
@@ -1,6 +1,9 @@
 """
 Tests for health check utilities.
 """
+import threading
+import time
+
 import pytest
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
@@ -12,7 +15,10 @@ from utils.health_checks import (
     check_celery,
     check_disk_space,
     get_health_status,
+    get_liveness_status,
     get_readiness_status,
+    HealthCheck,
+    HealthMonitor,
 )
 
 
@@ -81,4 +87,91 @@ class TestHealthChecks(TestCase):
         assert 'status' in readiness
         assert readiness['status'] in ['ready', 'not_ready']
         assert 'checks' in readiness
+    
+    def test_get_liveness_status(self):
+        """Liveness runs no checks."""
+        assert get_liveness_status()['status'] == 'alive'
+
+
+def _counting_check(status='healthy', delay=0.0):
+    calls = []
+
+    def check():
+        calls.append(time.monotonic())
+        time.sleep(delay)
+        return {'status': status}
+    return check, calls
+
+
+class TestHealthMonitor:
+    """Test the background-refreshed health snapshot."""
+
+    def test_checks_run_concurrently(self):
+        """Total refresh time is bounded by the slowest check, not the sum."""
+        slow_a, _ = _counting_check(delay=0.2)
+        slow_b, _ = _counting_check(delay=0.2)
+        monitor = HealthMonitor(lambda: [HealthCheck('a', slow_a, 1.0), HealthCheck('b', slow_b, 1.0)])
+        snapshot = monitor.run_checks()
+        assert snapshot['status'] == 'healthy'
+        assert snapshot['duration_ms'] < 350
+
+    def test_timeout_reports_unhealthy(self):
+        """A hung check fails fast and is not started again while still running."""
+        release = threading.Event()
+        monitor = HealthMonitor(lambda: [HealthCheck('hung', lambda: release.wait(5) and {'status': 'healthy'}, 0.05)])
+        try:
+            snapshot = monitor.run_checks()
+            assert snapshot['status'] == 'unhealthy'
+            assert 'Timed out' in snapshot['checks']['hung']['error']
+            assert snapshot['duration_ms'] < 500
+
+            again = monitor.run_checks()
+            assert again['checks']['hung']['error'] == 'Previous check has not finished'
+        finally:
+            release.set()
+
+    def test_exceptions_are_reported(self):
+        """A check that raises is unhealthy, not an error in the probe."""
+        def broken():
+            raise RuntimeError('boom')
+        monitor = HealthMonitor(lambda: [HealthCheck('broken', broken, 1.0)])
+        assert monitor.run_checks()['checks']['broken'] == {
+            'status': 'unhealthy', 'error': 'boom', 'duration_ms': pytest.approx(0, abs=50),
+        }
+
+    def test_snapshot_is_cached(self, settings):
+        """Probes within the cache window do not run checks."""
+        settings.HEALTH_CHECK_CACHE_SECONDS = 60
+        check, calls = _counting_check()
+        monitor = HealthMonitor(lambda: [HealthCheck('a', check, 1.0)])
+        for _ in range(20):
+            assert monitor.get_snapshot()['status'] == 'healthy'
+        assert len(calls) == 1
+
+    def test_stale_snapshot_refreshes_in_background(self, settings):
+        """A stale snapshot is served immediately while one refresh runs."""
+        settings.HEALTH_CHECK_CACHE_SECONDS = 1
+        check, calls = _counting_check(delay=0.2)
+        monitor = HealthMonitor(lambda: [HealthCheck('a', check, 1.0)])
+        monitor.refresh()
+        monitor._snapshot['timestamp'] -= 10
+
+        started = time.monotonic()
+        for _ in range(10):
+            assert monitor.get_snapshot()['age_seconds'] >= 10
+        assert time.monotonic() - started < 0.1
+
+        deadline = time.monotonic() + 2
+        while monitor.latest['timestamp'] < time.time() - 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert len(calls) == 2
+        assert monitor.get_snapshot()['age_seconds'] < 1
 
+    def test_expired_snapshot_is_unhealthy(self, settings):
+        """If refreshes stop completing the snapshot is not trusted."""
+        settings.HEALTH_CHECK_MAX_AGE = 30
+        check, _ = _counting_check()
+        monitor = HealthMonitor(lambda: [HealthCheck('a', check, 1.0)])
+        monitor.refresh()
+        monitor._snapshot['timestamp'] -= 60
+        assert monitor.get_snapshot()['status'] == 'unhealthy'
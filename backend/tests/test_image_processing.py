@@ -0,0 +1,147 @@
+"""
+Tests for single-pass image processing.
+"""
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from utils.image_processing import (
+    ImageProcessingError,
+    ImageSource,
+    ImageVariant,
+    create_thumbnail,
+    get_image_dimensions,
+    optimize_image,
+    validate_image,
+)
+
+
+def make_image(size=(1600, 1200), format='JPEG', mode='RGB', orientation=None, name='photo.jpg'):
+    buffer = BytesIO()
+    image = Image.new(mode, size, color=(200, 100, 50) if mode == 'RGB' else (200, 100, 50, 128))
+    kwargs = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        kwargs['exif'] = exif
+    image.save(buffer, format=format, **kwargs)
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+class TestImageSource:
+    """Test the single-pass entry point."""
+
+    def test_header_checks_do_not_decode(self):
+        """Validation and the pixel limit run on the header alone."""
+        with patch('PIL.ImageFile.ImageFile.load') as load:
+            source = ImageSource(make_image())
+            source.validate(max_size=(2000, 2000), allowed_formats=['JPEG'])
+            with pytest.raises(ImageProcessingError, match='pixels'):
+                ImageSource(make_image(), max_pixels=1000)
+            with pytest.raises(ImageProcessingError, match='format'):
+                source.validate(allowed_formats=['PNG'])
+        load.assert_not_called()
+
+    def test_rejected_source_is_released(self):
+        """A source failing its header checks closes the image it opened."""
+        upload = make_image()
+        with patch.object(ImageSource, 'close', autospec=True, side_effect=ImageSource.close) as close:
+            with pytest.raises(ImageProcessingError, match='pixels'):
+                ImageSource(upload, max_pixels=100)
+            with patch('PIL.Image.Image.getexif', side_effect=SyntaxError('bad EXIF')):
+                with pytest.raises(ImageProcessingError, match='bad EXIF'):
+                    ImageSource(make_image())
+        assert close.call_count == 2
+        assert not upload.closed
+
+    def test_jpeg_is_decoded_at_reduced_scale(self):
+        """JPEG sources are decoded via draft at the smallest scale covering the largest variant."""
+        source = ImageSource(make_image(size=(4000, 3000)))
+        outputs = source.render([
+            ImageVariant('medium', (768, 768)),
+            ImageVariant('thumbnail', (300, 300), crop=True),
+        ])
+        # 4000 / 4 = 1000 is the smallest DCT scale still at least 768 wide
+        assert source._decoded.size == (1000, 750)
+        assert (outputs['medium'].width, outputs['medium'].height) == (768, 576)
+        assert (outputs['thumbnail'].width, outputs['thumbnail'].height) == (300, 300)
+
+    def test_decodes_once_for_all_variants(self):
+        """Every variant is rendered from a single decode."""
+        source = ImageSource(make_image())
+        with patch('PIL.Image._getdecoder', wraps=Image._getdecoder) as decoder:
+            source.render([
+                ImageVariant('original', (2048, 2048)),
+                ImageVariant('small', (480, 4800), format='WEBP'),
+                ImageVariant('thumbnail', (300, 300), crop=True),
+            ])
+        assert decoder.call_count == 1
+
+    def test_sizes_are_byte_lengths(self):
+        """Reported sizes are the encoded byte counts."""
+        output = ImageSource(make_image()).render([ImageVariant('image', (800, 800))])['image']
+        assert output.size == len(output.content)
+        uploaded = optimize_image(make_image(), max_size=(800, 800))
+        assert uploaded.size == len(uploaded.read())
+
+    def test_exif_orientation_is_applied(self):
+        """Rotated phone photos report and render their displayed orientation."""
+        source = ImageSource(make_image(size=(1600, 1200), orientation=6))
+        assert source.size == (1200, 1600)
+        output = source.render([ImageVariant('image', (600, 600))])['image']
+        assert (output.width, output.height) == (450, 600)
+
+    def test_never_upscales(self):
+        """Variants larger than the source keep the source dimensions."""
+        output = ImageSource(make_image(size=(400, 300))).render([ImageVariant('large', (1600, 1600))])['large']
+        assert (output.width, output.height) == (400, 300)
+
+    def test_transparency_is_kept_or_flattened(self):
+        """Alpha survives in WebP and is flattened onto white for JPEG."""
+        source = ImageSource(make_image(format='PNG', mode='RGBA', name='logo.png'))
+        outputs = source.render([
+            ImageVariant('webp', (200, 200), format='WEBP'),
+            ImageVariant('jpeg', (200, 200)),
+        ])
+        assert Image.open(BytesIO(outputs['webp'].content)).mode == 'RGBA'
+        assert Image.open(BytesIO(outputs['jpeg'].content)).mode == 'RGB'
+
+
+class TestWrappers:
+    """Test the file-based helpers built on ImageSource."""
+
+    def test_optimize_image(self):
+        """Output fits the bounding box and is named after the source."""
+        result = optimize_image(make_image(), max_size=(800, 600), format='WEBP')
+        assert result.name == 'photo.webp'
+        assert Image.open(result).size == (800, 600)
+
+    def test_create_thumbnail(self):
+        """Thumbnails are center-cropped to the requested size."""
+        result = create_thumbnail(make_image(), size=(300, 300))
+        assert result.name == 'photo_thumb.jpg'
+        assert Image.open(result).size == (300, 300)
+
+    def test_validate_image(self):
+        """Validation reports limits as error messages."""
+        assert validate_image(make_image()) == (True, None)
+        is_valid, error = validate_image(make_image(), max_file_size=10)
+        assert not is_valid and 'exceeds maximum' in error
+        is_valid, error = validate_image(make_image(), max_pixels=100)
+        assert not is_valid and 'pixels' in error
+        is_valid, error = validate_image(BytesIO(b'not an image'))
+        assert not is_valid and error.startswith('Invalid image file')
+
+    def test_header_helpers_close_the_source(self):
+        """Dimension and validation checks release the file handle they open."""
+        upload = make_image(orientation=6)
+        with patch.object(ImageSource, 'close', autospec=True, side_effect=ImageSource.close) as close:
+            assert get_image_dimensions(upload) == (1200, 1600)
+            assert validate_image(upload) == (True, None)
+        assert close.call_count == 2
+        # The caller's file is still usable, e.g. to save the upload afterwards
+        assert not upload.closed
@@ -0,0 +1,282 @@
+"""
+Tests for off-request image processing.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from PIL import Image
+from rest_framework.test import APIClient
+
+from blog.models import BlogPost
+from cms.models import TeamMember
+from gallery.models import GalleryImage
+from gallery.serializers import GalleryImageSerializer
+from utils import media_pipeline
+from utils.media_pipeline import STATUS_READY, process_image, rendition_urls
+from vehicles.models import Vehicle
+
+
+def make_upload(name='photo.jpg', size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(120, 60, 30)).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_RENDITION_FORMATS = ['webp']
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestProcessImage:
+    """Test rendition generation."""
+
+    def test_renditions_are_written(self, media_root):
+        """The optimized original and renditions narrower than the source are stored."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+
+        result = process_image('gallery.GalleryImage', image.pk, 'image')
+        assert result['status'] == STATUS_READY
+
+        widths = {(item['name'], item['format']): item['width'] for item in result['items']}
+        assert widths == {
+            ('original', 'jpg'): 1200,
+            ('thumbnail', 'webp'): 300,
+            ('small', 'webp'): 480,
+            ('medium', 'webp'): 768,
+        }
+        for item in result['items']:
+            assert (media_root / item['path']).exists()
+
+        image.refresh_from_db()
+        assert image.image_renditions['source'] == image.image.name
+
+    def test_files_are_content_addressed(self, media_root):
+        """Names carry a content hash, and reprocessing reuses unchanged files."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+
+        first = process_image('gallery.GalleryImage', image.pk, 'image')
+        second = process_image('gallery.GalleryImage', image.pk, 'image')
+        paths = [item['path'] for item in first['items']]
+        assert paths == [item['path'] for item in second['items']]
+        assert all(re.search(r'\.[0-9a-f]{16}\.(jpg|webp)$', path) for path in paths)
+        for path in paths:
+            assert (media_root / path).exists()
+
+    def test_superseded_result_is_discarded(self, media_root):
+        """A result for an image that was replaced meanwhile is not stored."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+
+        render = media_pipeline._render
+
+        def render_then_replace(data):
+            items = render(data)
+            GalleryImage.objects.filter(pk=image.pk).update(image='gallery/other.jpg')
+            return items
+
+        with patch('utils.media_pipeline._render', side_effect=render_then_replace):
+            assert process_image('gallery.GalleryImage', image.pk, 'image') is None
+
+        assert not list((media_root / 'gallery' / 'renditions').iterdir())
+
+    def test_undecodable_image_is_marked_failed(self):
+        """Broken uploads record a failed status instead of raising."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(
+                title='Broken', image=SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg'),
+            )
+        result = process_image('gallery.GalleryImage', image.pk, 'image')
+        assert result['status'] == 'failed'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSaveReceiver:
+    """Test scheduling from model saves."""
+
+    def test_upload_is_queued_after_commit(self):
+        """Saving a new image queues processing once, without processing inline."""
+        with patch('utils.media_pipeline.process_image_renditions.delay') as delay:
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+        delay.assert_called_once_with('gallery.GalleryImage', image.pk, 'image')
+        assert image.image_renditions == {}
+
+    def test_unrelated_update_is_not_queued(self):
+        """Saves that leave the image alone do not reprocess it."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+        process_image('gallery.GalleryImage', image.pk, 'image')
+        image.refresh_from_db()
+
+        with patch('utils.media_pipeline.process_image_renditions.delay') as delay:
+            image.title = 'Renamed'
+            image.save()
+        delay.assert_not_called()
+
+    def test_inline_mode(self, settings):
+        """With async processing off, renditions are ready after the save commits."""
+        settings.IMAGE_PROCESSING_ASYNC = False
+        image = GalleryImage.objects.create(title='Car', image=make_upload(size=(400, 300)))
+        image.refresh_from_db()
+        assert image.image_renditions['status'] == STATUS_READY
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRenditionUrls:
+    """Test serializer output."""
+
+    def test_none_until_processed(self):
+        """Unprocessed images expose no renditions."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+        assert rendition_urls(image.image, image.image_renditions) is None
+        assert GalleryImageSerializer(image).data['image_renditions'] is None
+
+    def test_serializer_exposes_urls(self):
+        """Processed images list URLs by rendition and format."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+        process_image('gallery.GalleryImage', image.pk, 'image')
+        image.refresh_from_db()
+
+        renditions = GalleryImageSerializer(image).data['image_renditions']
+        assert [(item['format'], item['width']) for item in renditions] == [
+            ('jpg', 1200), ('webp', 300), ('webp', 480), ('webp', 768),
+        ]
+        assert renditions[1]['name'] == 'thumbnail'
+        assert renditions[2]['url'].endswith('.webp')
+        assert renditions[2]['height'] == 320
+
+    def test_blog_and_team_images_are_registered(self, settings, admin_user):
+        """Blog featured images and team photos get renditions too."""
+        settings.IMAGE_PROCESSING_ASYNC = False
+        post = BlogPost.objects.create(
+            title='News', slug='news', content='Body', author=admin_user,
+            featured_image=make_upload(size=(600, 400)),
+        )
+        member = TeamMember.objects.create(
+            name='Sam', role='Director', description='Bio', image=make_upload(size=(600, 400)),
+        )
+        post.refresh_from_db()
+        member.refresh_from_db()
+        assert post.featured_image_renditions['status'] == STATUS_READY
+        assert member.image_renditions['status'] == STATUS_READY
+
+
+@pytest.mark.django_db(transaction=True)
+class TestValidatorsFollowRenditions:
+    """Cached responses revalidate to the processed renditions."""
+
+    def assert_revalidates(self, url, label, pk):
+        client = APIClient()
+        before = client.get(url)
+        assert before.status_code == 200
+        process_image(label, pk, 'image')
+
+        after = client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        assert after.status_code == 200
+        data = after.data
+        if isinstance(data, dict) and 'results' in data:
+            data = data['results']
+        if isinstance(data, list):
+            data = data[0]
+        assert data['image_renditions']
+
+    def test_vehicle(self):
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            vehicle = Vehicle.objects.create(name='Car', type='suv', registration='MP1', image=make_upload())
+        self.assert_revalidates('/api/vehicles/', 'vehicles.Vehicle', vehicle.pk)
+
+    def test_vehicle_detail(self):
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            vehicle = Vehicle.objects.create(name='Car', type='suv', registration='MP2', image=make_upload())
+        self.assert_revalidates(f'/api/vehicles/{vehicle.pk}/', 'vehicles.Vehicle', vehicle.pk)
+
+    def test_team_member(self):
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            member = TeamMember.objects.create(name='Sam', role='Director', description='Bio', image=make_upload())
+        self.assert_revalidates('/api/cms/team-members/', 'cms.TeamMember', member.pk)
+
+    def test_team_member_detail(self):
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            member = TeamMember.objects.create(name='Sam', role='Director', description='Bio', image=make_upload())
+        self.assert_revalidates(f'/api/cms/team-members/{member.pk}/', 'cms.TeamMember', member.pk)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReprocessMediaCommand:
+    """Test batch reprocessing."""
+
+    def run(self, *args):
+        out = StringIO()
+        call_command('reprocess_media', '--model', 'gallery.GalleryImage', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_processes_then_skips_unchanged(self, settings, media_root):
+        """A second run skips images whose bytes and settings are unchanged; new settings reprocess."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            images = [
+                GalleryImage.objects.create(title=f'Car {index}', image=make_upload(name=f'car{index}.jpg'))
+                for index in range(3)
+            ]
+
+        output = self.run('--workers', '2')
+        assert 'processed 3, unchanged 0' in output
+        assert 'images/s' in output and 'saved' in output
+        first = GalleryImage.objects.get(pk=images[0].pk).image_renditions
+        assert first['status'] == STATUS_READY
+
+        assert 'processed 0, unchanged 3' in self.run('--workers', '2')
+
+        settings.IMAGE_RENDITION_QUALITY = 40
+        assert 'processed 3, unchanged 0' in self.run('--workers', '2')
+        second = GalleryImage.objects.get(pk=images[0].pk).image_renditions
+        assert second['signature'] != first['signature']
+        # Superseded rendition files are removed; nothing half-written is left behind
+        names = {path.name for path in (media_root / 'gallery' / 'renditions').iterdir()}
+        assert names == {
+            item['path'].rsplit('/', 1)[-1]
+            for image in GalleryImage.objects.all()
+            for item in image.image_renditions['items']
+        }
+
+    def test_workers_start_without_database_connections(self, media_root):
+        """Connections are closed before the pool forks, so workers never share the parent's socket."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            GalleryImage.objects.create(title='Car', image=make_upload())
+
+        events = []
+        close_all, submit = connections.close_all, ProcessPoolExecutor.submit
+
+        def record_close():
+            events.append('close')
+            close_all()
+
+        def record_submit(executor, *args, **kwargs):
+            events.append('submit')
+            return submit(executor, *args, **kwargs)
+
+        with patch.object(connections, 'close_all', record_close), \
+                patch.object(ProcessPoolExecutor, 'submit', record_submit):
+            assert 'processed 1' in self.run('--workers', '2')
+        assert events[:2] == ['close', 'submit']
+
+    def test_missing_file_is_reported(self, media_root):
+        """Rows whose file is gone are counted as failed and left untouched."""
+        with patch('utils.media_pipeline.process_image_renditions.delay'):
+            image = GalleryImage.objects.create(title='Car', image=make_upload())
+        (media_root / image.image.name).unlink()
+
+        assert 'failed 1' in self.run('--workers', '1')
+        image.refresh_from_db()
+        assert image.image_renditions == {}
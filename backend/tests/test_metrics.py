@@ -0,0 +1,110 @@
+"""
+Tests for the request metrics registry.
+"""
+import gc
+import threading
+from unittest.mock import patch
+
+import pytest
+from rest_framework.test import APIClient
+
+from utils.metrics import Histogram, MetricsRegistry, metrics_registry, render_prometheus, summarize
+from utils.throttles import SlidingAnonRateThrottle
+
+
+class TestHistogram:
+    """Test latency histogram percentiles."""
+
+    def test_percentiles(self):
+        """Percentiles are interpolated within buckets."""
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.observe(value)
+        assert histogram.count == 100
+        assert 25 <= histogram.percentile(50) <= 75
+        assert 75 <= histogram.percentile(95) <= 100
+        assert Histogram().percentile(50) is None
+
+    def test_round_trip(self):
+        """Histograms survive serialization for cross-worker merging."""
+        histogram = Histogram()
+        histogram.observe(12)
+        restored = Histogram.from_dict(histogram.to_dict())
+        restored.merge(histogram)
+        assert restored.count == 2
+        assert restored.sum == 24
+
+
+class TestMetricsRegistry:
+    """Test per-thread shards and summaries."""
+
+    def test_concurrent_observations_are_not_lost(self):
+        """Every observation from every thread is counted."""
+        registry = MetricsRegistry()
+
+        def record():
+            for _ in range(1000):
+                registry.observe('vehicle-list', 'GET', 200, 12.5)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        summary = summarize(registry.snapshot())
+        assert summary['count'] == 4000
+        assert summary['average_ms'] == 12.5
+        assert summary['routes'][0]['status'] == {'200': 4000}
+
+    def test_shards_of_finished_threads_are_retired(self):
+        """Threads that end leave their counts behind but not their shards."""
+        registry = MetricsRegistry()
+
+        def record():
+            registry.observe('vehicle-list', 'GET', 200, 10)
+
+        for _ in range(50):
+            thread = threading.Thread(target=record)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        assert len(registry._shards) == 0
+        assert summarize(registry.snapshot())['count'] == 50
+
+    def test_prometheus_output(self):
+        """Histogram buckets are cumulative and labelled."""
+        registry = MetricsRegistry()
+        registry.observe('faq-list', 'GET', 200, 8)
+        registry.observe('faq-list', 'GET', 200, 400)
+        body = render_prometheus(registry.snapshot())
+        assert 'pchm_http_requests_total{route="faq-list",method="GET",status="200"} 2' in body
+        assert 'pchm_http_request_duration_seconds_bucket{route="faq-list",method="GET",status="200",le="0.01"} 1' in body
+        assert 'le="+Inf"} 2' in body
+
+
+@pytest.mark.django_db
+def test_middleware_records_route(admin_client):
+    """API requests are recorded under their URL pattern name."""
+    metrics_registry.reset()
+    APIClient().get('/api/faqs/')
+    response = admin_client.get('/api/metrics/prometheus/')
+    assert response.status_code == 200
+    assert 'route="faq:faq-list"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_token_scrapes_are_not_throttled(settings):
+    """Scrapers with the token are not limited by the anonymous rate."""
+    settings.METRICS_TOKEN = 'scrape-token'
+    client = APIClient()
+    with patch.dict(SlidingAnonRateThrottle.THROTTLE_RATES, {'anon': '3/hour'}):
+        statuses = {
+            client.get('/api/metrics/prometheus/', HTTP_X_METRICS_TOKEN='scrape-token').status_code
+            for _ in range(10)
+        }
+        assert statuses == {200}
+        # Other anonymous requests are still limited
+        statuses = [client.get('/api/faqs/', {'page': index}).status_code for index in range(4)]
+        assert statuses[-1] == 429
@@ -0,0 +1,119 @@
+"""
+Tests for keyset pagination and cheap counts.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from analytics.models import ActivityLog, PageView
+from analytics.serializers import ActivityLogSerializer, PageViewSerializer
+from inquiries.models import Inquiry
+from inquiries.serializers import InquirySerializer
+from utils.pagination import estimate_count, serializer_only_fields
+
+
+class TestSerializerOnlyFields:
+    """Test only() field lists derived from serializers."""
+
+    def test_plain_fields_skip_unused_columns(self):
+        """Columns the serializer never reads are left out."""
+        fields = serializer_only_fields(PageViewSerializer, PageView)
+        assert 'user_agent' not in fields
+        assert {'id', 'page_path', 'viewed_at'} <= set(fields)
+
+    def test_method_fields_need_declared_columns(self):
+        """Method fields make the list unsafe unless their columns are declared."""
+        assert serializer_only_fields(ActivityLogSerializer, ActivityLog) is None
+        fields = serializer_only_fields(ActivityLogSerializer, ActivityLog, ('user', 'activity_type'))
+        assert 'user' in fields
+        assert 'object_id' not in fields
+
+    def test_all_fields_serializer_is_not_restricted(self):
+        """Restricting to every column would add nothing."""
+        assert serializer_only_fields(InquirySerializer, Inquiry) is None
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cursor navigation over admin lists."""
+
+    def setup_method(self):
+        cache.clear()
+
+    def _inquiries(self, count):
+        return [
+            Inquiry.objects.create(name=f'N{i}', email=f'n{i}@example.com', subject='S', message='M')
+            for i in range(count)
+        ]
+
+    def test_cursor_walks_every_row_once(self, admin_client):
+        """Following next links visits all rows in order; previous goes back."""
+        created = self._inquiries(5)
+        expected = [inquiry.id for inquiry in sorted(created, key=lambda i: (i.created_at, i.id), reverse=True)]
+
+        response = admin_client.get('/api/inquiries/', {'page_size': 2})
+        assert response.data['count'] == 5
+        assert response.data['count_is_estimate'] is False
+        assert response.data['previous'] is None
+
+        seen, pages = [], []
+        while True:
+            pages.append(response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                break
+            response = admin_client.get(response.data['next'])
+        assert seen == expected
+
+        back = admin_client.get(pages[1]['previous'])
+        assert [row['id'] for row in back.data['results']] == expected[:2]
+
+    def test_legacy_page_parameter(self, admin_client):
+        """Clients sending page=N still get the right rows."""
+        created = self._inquiries(3)
+        response = admin_client.get('/api/inquiries/', {'page_size': 2, 'page': 2})
+        assert [row['id'] for row in response.data['results']] == [created[0].id]
+        assert response.data['next'] is None
+        assert response.data['previous'] is not None
+
+    def test_invalid_cursor(self, admin_client):
+        """Garbage cursors are rejected."""
+        assert admin_client.get('/api/inquiries/', {'cursor': 'bm9wZQ'}).status_code == 404
+
+    def test_activity_log_query_count_is_constant(self, admin_client, admin_user):
+        """Deferred columns are never loaded row by row."""
+        for i in range(10):
+            ActivityLog.objects.create(user=admin_user, activity_type='view', description=f'd{i}')
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get('/api/analytics/dashboard/activity-log/', {'page_size': 5})
+        assert response.status_code == 200
+        assert len(response.data['results']) == 5
+        with CaptureQueriesContext(connection) as deeper:
+            admin_client.get(response.data['next'])
+        # The second page reuses the cached count
+        assert len(deeper) == len(queries) - 1
+
+
+@pytest.mark.django_db
+class TestCounts:
+    """Test approximate and cached counts."""
+
+    def test_estimate_from_statistics(self):
+        """reltuples and planner estimates are read without counting."""
+        for i in range(3):
+            PageView.objects.create(page_path='/a', session_id=str(i))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE analytics_pageview')
+        assert estimate_count(PageView.objects.all()) == 3
+        assert isinstance(estimate_count(PageView.objects.filter(page_path='/a')), int)
+
+    def test_large_estimates_are_reported(self, admin_client, settings):
+        """Above the threshold the estimate is returned and flagged."""
+        settings.PAGINATION_EXACT_COUNT_THRESHOLD = 0
+        PageView.objects.create(page_path='/a')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE analytics_pageview')
+        response = admin_client.get('/api/analytics/dashboard/page-views/')
+        assert response.data['count_is_estimate'] is True
+        assert response.data['results'][0]['page_path'] == '/a'
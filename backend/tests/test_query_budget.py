@@ -0,0 +1,131 @@
+"""
+Tests for query budgets on list endpoints.
+"""
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from rest_framework.test import APIClient
+
+from car_sales.models import CarImage, CarListing
+from chatbot.models import Conversation, ConversationMessage
+from utils.query_budget import QueryBudgetExceeded, assert_constant_queries, assert_max_queries
+from vehicles.models import Vehicle
+
+
+def jpeg(name='car.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.fixture
+def listings(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_PROCESSING_ASYNC = False
+    rows = []
+    for index in range(5):
+        listing = CarListing.objects.create(
+            make='BMW', model='X5', year=2020, mileage=1000, color='Black', registration=f'QB{index}',
+            price=30000, fuel_type='petrol', transmission='automatic', description='SUV', status='published',
+        )
+        CarImage.objects.create(car_listing=listing, image=jpeg(), is_primary=True)
+        CarImage.objects.create(car_listing=listing, image=jpeg())
+        rows.append(listing)
+    return rows
+
+
+@pytest.fixture
+def conversations():
+    rows = []
+    for index in range(5):
+        conversation = Conversation.objects.create(session_id=f'budget-{index}')
+        for number in range(index + 1):
+            ConversationMessage.objects.create(conversation=conversation, content=f'Message {number}')
+        rows.append(conversation)
+    return rows
+
+
+@pytest.mark.django_db
+class TestListBudgets:
+    """List endpoints issue the same queries whatever the page size."""
+
+    def test_car_listings(self, listings):
+        """Primary images come from the prefetched images."""
+        client = APIClient()
+        assert_constant_queries(lambda size: client.get('/api/car-listings/', {'page_size': size}))
+        response = client.get('/api/car-listings/')
+        assert all(row['primary_image'] for row in response.data['results'])
+
+    def test_car_listing_search(self, listings):
+        """The search endpoint renders rows the same way."""
+        client = APIClient()
+        assert_constant_queries(lambda size: client.get('/api/car-listings/search/', {'page_size': size}))
+
+    def test_vehicles(self):
+        """Vehicle rows are rendered from one query."""
+        for index in range(5):
+            Vehicle.objects.create(name=f'Car {index}', type='suv', registration=f'VB{index}')
+        client = APIClient()
+        assert_constant_queries(lambda size: client.get('/api/vehicles/', {'page_size': size}))
+
+    def test_conversations(self, admin_client, conversations):
+        """The list reads stored summaries and leaves out transcripts."""
+        assert_constant_queries(lambda size: admin_client.get('/api/chatbot/conversations/', {'page_size': size}))
+        response = admin_client.get('/api/chatbot/conversations/')
+        rows = {row['session_id']: row for row in response.data['results']}
+        assert rows['budget-4']['message_count'] == 5
+        assert rows['budget-4']['last_message_preview'] == 'Message 4'
+        assert 'messages' not in rows['budget-4']
+
+    def test_conversation_messages(self, admin_client, conversations):
+        """Transcript pages are read with a fixed number of queries."""
+        url = f'/api/chatbot/conversations/{conversations[4].pk}/messages/'
+        assert_constant_queries(lambda size: admin_client.get(url, {'page_size': size}))
+
+
+@pytest.mark.django_db
+class TestBudgetChecks:
+    """Test the helpers and the runtime assertion."""
+
+    def test_per_row_queries_are_reported(self, listings):
+        """The helper names the statement that runs once per row."""
+        def per_row(self, obj):
+            primary = obj.images.filter(is_primary=True).first()
+            return primary.image.url if primary else None
+
+        client = APIClient()
+        with patch('car_sales.serializers.CarListingSerializer.get_primary_image', per_row):
+            with pytest.raises(QueryBudgetExceeded, match='car_sales_carimage'):
+                assert_constant_queries(lambda size: client.get('/api/car-listings/', {'page_size': size}))
+
+    def test_max_queries(self):
+        """Blocks over their budget fail with the statements listed."""
+        with pytest.raises(QueryBudgetExceeded, match='2 queries, budget 1'):
+            with assert_max_queries(1):
+                list(Vehicle.objects.all())
+                list(Vehicle.objects.all())
+
+    def test_runtime_assertion(self, settings, listings):
+        """With enforcement on, a list request running a query per row fails."""
+        settings.QUERY_BUDGET_ENFORCE = True
+        client = APIClient()
+        assert client.get('/api/car-listings/').status_code == 200
+
+        def per_row(self, obj):
+            return obj.images.filter(is_primary=True).exists()
+
+        with patch('car_sales.serializers.CarListingSerializer.get_primary_image', per_row):
+            with pytest.raises(QueryBudgetExceeded, match='query per row'):
+                # Not the cached page above
+                client.get('/api/car-listings/', {'page_size': 5})
+
+    def test_view_budget(self, settings, admin_client, conversations):
+        """Views with a query_budget fail when they exceed it."""
+        settings.QUERY_BUDGET_ENFORCE = True
+        assert admin_client.get('/api/chatbot/conversations/').status_code == 200
+        with patch('chatbot.views.ConversationViewSet.query_budget', 0):
+            with pytest.raises(QueryBudgetExceeded, match='budget 0'):
+                admin_client.get('/api/chatbot/conversations/')
@@ -0,0 +1,107 @@
+"""
+Tests for the always-on query profiler.
+"""
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from faq.models import FAQ
+from utils.query_logging import (
+    QueryProfile,
+    fingerprint_sql,
+    query_metrics,
+    render_query_prometheus,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_query_metrics():
+    query_metrics.reset()
+    yield
+    query_metrics.reset()
+
+
+class TestFingerprint:
+    """Test SQL normalization."""
+
+    def test_literals_are_normalized(self):
+        """Queries differing only in values share a fingerprint."""
+        first = fingerprint_sql("SELECT * FROM faq WHERE id = 1 AND question = 'a'")
+        second = fingerprint_sql("SELECT * FROM faq WHERE id = 42 AND question = 'it''s'")
+        assert first == second
+        assert first[1] == 'SELECT * FROM faq WHERE id = ? AND question = ?'
+
+    def test_in_lists_collapse(self):
+        """IN lists of any length normalize to the same text."""
+        short = fingerprint_sql('SELECT * FROM faq WHERE id IN (%s, %s)')
+        long = fingerprint_sql('SELECT * FROM faq WHERE id IN (%s, %s, %s, %s)')
+        assert short == long
+        assert 'IN (...)' in short[1]
+
+    def test_repeated_detection(self):
+        """Fingerprints executed at least the threshold count are reported."""
+        profile = QueryProfile()
+        for pk in range(5):
+            profile.record(f'SELECT * FROM faq WHERE id = {pk}', 1.0)
+        profile.record('SELECT COUNT(*) FROM faq', 1.0)
+        repeated = profile.repeated(5)
+        assert len(repeated) == 1
+        assert repeated[0][2] == 5
+        assert profile.count == 6
+
+
+@pytest.mark.django_db
+class TestQueryProfilerMiddleware:
+    """Test request profiling without DEBUG."""
+
+    def test_headers(self, settings):
+        """API responses carry the query count and DB time."""
+        settings.DEBUG = False
+        response = APIClient().get('/api/faqs/')
+        assert response.status_code == 200
+        assert int(response['X-DB-Queries']) >= 1
+        assert response['Server-Timing'].startswith('db;dur=')
+
+    def test_route_metrics(self):
+        """Requests are aggregated under their URL pattern name."""
+        APIClient().get('/api/faqs/')
+        APIClient().get('/api/faqs/')
+        summary = query_metrics.summary()
+        route = next(entry for entry in summary['routes'] if entry['route'] == 'faq:faq-list')
+        assert route['requests'] == 2
+        assert route['average_queries'] >= 1
+        assert summary['fingerprints']
+
+        routes, _, _ = query_metrics.merged()
+        body = render_query_prometheus(routes)
+        assert 'pchm_db_queries_per_request_count{route="faq:faq-list",method="GET"} 2' in body
+
+    def test_slow_queries_are_sampled_with_origin(self, settings):
+        """Slow queries record the route and the code that issued them."""
+        settings.QUERY_PROFILER_SLOW_MS = 0
+        APIClient().get('/api/faqs/')
+        sample = query_metrics.summary()['slow_queries'][0]
+        assert sample['route'] == 'faq:faq-list'
+        assert sample['origin'] != 'unknown'
+
+    def test_non_api_requests_are_skipped(self):
+        """Only API paths are profiled."""
+        response = APIClient().get('/admin/login/')
+        assert 'X-DB-Queries' not in response
+
+    def test_repeated_queries_are_counted(self, settings):
+        """Requests that repeat the same SQL are flagged per route."""
+        settings.QUERY_PROFILER_REPEAT_THRESHOLD = 1
+        FAQ.objects.create(question='Q?', answer='A.', is_active=True)
+        APIClient().get('/api/faqs/')
+        route = next(
+            entry for entry in query_metrics.summary()['routes'] if entry['route'] == 'faq:faq-list'
+        )
+        assert route['repeated_query_requests'] == 1
+
+    def test_disabled(self, settings):
+        """The profiler can be switched off."""
+        settings.QUERY_PROFILER_ENABLED = False
+        response = APIClient().get('/api/faqs/')
+        assert 'X-DB-Queries' not in response
+        assert connection.execute_wrappers == []
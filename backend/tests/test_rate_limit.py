@@ -0,0 +1,89 @@
+"""
+Tests for the sliding-window rate limiter.
+"""
+import threading
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from utils.rate_limit import LocalRateLimitBackend, RateLimiter, local_backend, parse_rate
+from utils.spam_protection import check_rate_limit
+from utils.throttles import AuthRateThrottle
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    local_backend.reset()
+
+
+class TestSlidingWindow:
+    """Test counting and window sliding."""
+
+    def test_parse_rate(self):
+        assert parse_rate('10/minute') == (10, 60)
+        assert parse_rate('3/hour') == (3, 3600)
+
+    def test_limit_and_retry_after(self):
+        """Hits past the limit are denied, not counted, and report a wait."""
+        limiter = RateLimiter(3, 60)
+        results = [limiter.hit('k') for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert 0 < results[-1].retry_after <= 120
+
+    def test_previous_window_is_weighted(self):
+        """Half-way into the next window, half of the previous count still applies."""
+        backend = LocalRateLimitBackend()
+        for _ in range(4):
+            assert backend.hit('k', 4, 60, 1, now=10)[0]
+        assert backend.hit('k', 4, 60, 1, now=90)[0]  # 4 * 0.5 + 0 + 1 <= 4
+        assert backend.hit('k', 4, 60, 1, now=90)[0]  # 4 * 0.5 + 1 + 1 <= 4
+        assert not backend.hit('k', 4, 60, 1, now=90)[0]
+        assert backend.hit('k', 4, 60, 1, now=500)[0]  # both windows expired
+
+    def test_concurrent_hits_never_exceed_limit(self):
+        """The check and increment are atomic."""
+        limiter = RateLimiter(5, 60)
+        allowed = []
+        barrier = threading.Barrier(20)
+
+        def hit():
+            barrier.wait()
+            allowed.append(limiter.hit('race').allowed)
+
+        threads = [threading.Thread(target=hit) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert allowed.count(True) == 5
+
+    def test_unavailable_backend_falls_back_to_process(self):
+        """Backend errors degrade to in-process limiting instead of failing requests."""
+        class BrokenBackend:
+            def hit(self, *args):
+                raise ConnectionError('redis down')
+
+        limiter = RateLimiter(1, 60, backend=BrokenBackend())
+        assert limiter.hit('k').allowed
+        assert not limiter.hit('k').allowed
+
+
+class TestCallers:
+    """Test the spam check and DRF throttles built on the limiter."""
+
+    def test_check_rate_limit(self):
+        """Returns True once the limit is exceeded."""
+        assert [check_rate_limit('1.2.3.4', 'inquiry') for _ in range(4)] == [False, False, False, True]
+        assert check_rate_limit('5.6.7.8', 'inquiry') is False
+
+    def test_throttle_wait(self):
+        """Throttles deny past their rate and report the limiter's wait."""
+        factory = APIRequestFactory()
+        request = factory.post('/api/auth/login/', REMOTE_ADDR='9.9.9.9')
+        throttle = AuthRateThrottle()
+        throttle.num_requests, throttle.duration = 2, 60
+        assert throttle.allow_request(request, None)
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+        assert throttle.wait() > 0
@@ -0,0 +1,113 @@
+"""
+Tests for write-behind view counters.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from blog.models import BlogPost
+from car_sales.models import CarListing
+from utils.view_counter import LocalViewCounterBackend, flush_view_counts, local_backend
+
+
+@pytest.fixture(autouse=True)
+def reset_view_counts(settings):
+    settings.VIEW_COUNTER_FLUSH_SECONDS = 3600
+    local_backend.reset()
+    yield
+    local_backend.reset()
+
+
+@pytest.fixture
+def listing():
+    return CarListing.objects.create(
+        make='BMW', model='X5', year=2022, mileage=12000, color='Black', registration='VIEW1',
+        price=55000, fuel_type='petrol', transmission='automatic', description='SUV', status='published',
+    )
+
+
+def client_from(ip):
+    return APIClient(REMOTE_ADDR=ip)
+
+
+@pytest.mark.django_db
+class TestRecordView:
+    """Test buffering, dedupe and flushing."""
+
+    def test_views_are_buffered_not_written(self, listing):
+        """Detail requests do not write the row until a flush."""
+        with CaptureQueriesContext(connection) as queries:
+            response = client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+        assert response.status_code == 200
+        assert response.data['views'] == 1
+        assert not any(query['sql'].startswith('UPDATE') for query in queries.captured_queries)
+        listing.refresh_from_db()
+        assert listing.views == 0
+
+        assert flush_view_counts() == 1
+        listing.refresh_from_db()
+        assert listing.views == 1
+
+    def test_repeat_views_are_deduplicated(self, listing):
+        """One viewer counts once per window; other viewers count separately."""
+        for _ in range(3):
+            client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+        client_from('10.0.0.2').get(f'/api/car-listings/{listing.pk}/')
+        flush_view_counts()
+        listing.refresh_from_db()
+        assert listing.views == 2
+
+    def test_dedupe_can_be_disabled(self, settings, listing):
+        """With no window every view counts."""
+        settings.VIEW_COUNTER_DEDUPE_SECONDS = 0
+        for _ in range(3):
+            client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+        flush_view_counts()
+        listing.refresh_from_db()
+        assert listing.views == 3
+
+    def test_flush_aggregates_deltas(self, settings, listing, admin_user):
+        """Flushing issues one UPDATE per model and distinct delta."""
+        settings.VIEW_COUNTER_DEDUPE_SECONDS = 0
+        post = BlogPost.objects.create(title='News', slug='news', content='Body', author=admin_user, status='published')
+        for _ in range(2):
+            client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+            client_from('10.0.0.1').get(f'/api/blog-posts/{post.pk}/')
+
+        with CaptureQueriesContext(connection) as queries:
+            assert flush_view_counts() == 2
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        assert len(updates) == 2
+        post.refresh_from_db()
+        assert post.views == 2
+
+    def test_flush_interval_applies_on_request(self, settings, listing):
+        """Requests flush the buffer themselves once the interval has passed."""
+        settings.VIEW_COUNTER_FLUSH_SECONDS = 0
+        client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+        listing.refresh_from_db()
+        assert listing.views == 1
+
+    def test_failed_flush_keeps_counts(self, listing):
+        """Counts survive a database error and land on the next flush."""
+        client_from('10.0.0.1').get(f'/api/car-listings/{listing.pk}/')
+        with patch('utils.view_counter._apply', side_effect=RuntimeError('db down')):
+            assert flush_view_counts() == 0
+        assert flush_view_counts() == 1
+        listing.refresh_from_db()
+        assert listing.views == 1
+
+
+class TestLocalBackend:
+    """Test the in-process buffer directly."""
+
+    def test_claim_respects_interval(self):
+        """Claims inside the interval return nothing and keep the buffer."""
+        backend = LocalViewCounterBackend()
+        backend.record('car_sales.CarListing:views:1', None, 0)
+        assert backend.claim(3600) is None
+        assert backend.claim(0) == {'car_sales.CarListing:views:1': 1}
+        assert backend.claim(0) == {}
@@ -4,7 +4,9 @@ from django.shortcuts import redirect
 from django.utils.html import format_html
 from django.urls import reverse
 from theming.models import Event, Theme
+from theming.services.theme_resolver import rebuild_calendar
 from theming.views import theme_selector
+from utils.bulk_operations import bulk_update_fields
 
 
 @admin.register(Theme)
@@ -79,13 +81,16 @@ class EventAdmin(admin.ModelAdmin):
     actions = ['activate_events', 'deactivate_events']
     
     def activate_events(self, request, queryset):
-        queryset.update(active=True)
-        self.message_user(request, f"{queryset.count()} events activated.")
+        stats = bulk_update_fields(queryset, {'active': True})
+        # update() sends no post_save, so the theme calendar is rebuilt here
+        rebuild_calendar()
+        self.message_user(request, f"{stats.rows} events activated.")
     activate_events.short_description = "Activate selected events"
     
     def deactivate_events(self, request, queryset):
-        queryset.update(active=False)
-        self.message_user(request, f"{queryset.count()} events deactivated.")
+        stats = bulk_update_fields(queryset, {'active': False})
+        rebuild_calendar()
+        self.message_user(request, f"{stats.rows} events deactivated.")
     deactivate_events.short_description = "Deactivate selected events"
     
     def get_urls(self):
@@ -124,14 +124,17 @@ class Command(BaseCommand):
         """Test cache functionality."""
         try:
             from django.core.cache import cache
+            from theming.services.theme_resolver import theme_cache
+            from utils.cache import get_namespace_version
             today = _today_local_date()
-            cache_key = f"active_theme_event_{today.isoformat()}"
+            version = get_namespace_version(theme_cache.namespace)
+            cache_key = f"pchm:{theme_cache.namespace}:v{version}:calendar:{today.isoformat()}"
             
             # Try to get from cache
             cached = cache.get(cache_key)
             if cached is not None:
                 self.stdout.write(
-                    self.style.SUCCESS(f"  ✓ Cache working (found cached event)")
+                    self.style.SUCCESS(f"  ✓ Cache working (found cached theme calendar)")
                 )
             else:
                 # Cache might be empty, which is fine
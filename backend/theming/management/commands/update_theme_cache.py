@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
-from theming.services.theme_resolver import get_active_theme, get_active_event, _today_local_date
+from theming.services.theme_resolver import get_active_theme, get_active_event, theme_cache, _today_local_date
 
 
 class Command(BaseCommand):
@@ -21,28 +20,9 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         if options['clear']:
-            # Clear all theme-related cache keys
-            from django.core.cache.utils import make_key
-            cache_key_prefix = "active_theme"
-            today = _today_local_date()
-            
-            # Clear today's cache
-            cache_key = f"{cache_key_prefix}_event_{today.isoformat()}"
-            cache.delete(cache_key)
-            self.stdout.write(
-                self.style.SUCCESS(f"Cleared cache for {today.isoformat()}")
-            )
-            
-            # Clear future days if specified
-            if options['days'] > 0:
-                from datetime import timedelta
-                for i in range(1, options['days'] + 1):
-                    future_date = today + timedelta(days=i)
-                    future_key = f"{cache_key_prefix}_event_{future_date.isoformat()}"
-                    cache.delete(future_key)
-                self.stdout.write(
-                    self.style.SUCCESS(f"Cleared cache for next {options['days']} days")
-                )
+            # Advancing the theme cache generation drops every cached date and theme
+            theme_cache.invalidate()
+            self.stdout.write(self.style.SUCCESS("Cleared theme cache"))
 
         # Warm up today's theme
         today = _today_local_date()
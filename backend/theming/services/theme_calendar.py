@@ -0,0 +1,185 @@
+"""
+Precomputed theme calendar.
+
+Resolves which event, and so which theme, applies to each date of a window
+once instead of scanning every active event per request. The result is an
+interval index: sorted, non-overlapping date ranges, each pointing at a
+ready-to-serve theme payload, so a lookup is one binary search.
+"""
+import hashlib
+import heapq
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.themes import THEMES
+
+
+def _replace_year(day: date, year: int) -> date:
+    try:
+        return day.replace(year=year)
+    except ValueError:
+        # 29 February in a non-leap year
+        return date(year, 2, 28)
+
+
+def _occurrences(event, start: date, end: date) -> Iterator[Tuple[date, date]]:
+    """Date ranges of ``event`` that may overlap ``start``..``end``."""
+    if not event.recurring_yearly:
+        yield event.start_date, event.end_date
+        return
+    # Keep the original length so ranges crossing New Year recur correctly
+    length = event.end_date - event.start_date
+    for year in range(start.year - 1, end.year + 1):
+        first = _replace_year(event.start_date, year)
+        yield first, first + length
+
+
+def _theme_data(themes: Dict[str, Dict[str, Any]], theme_key: str) -> Dict[str, Any]:
+    # Custom database themes take precedence over predefined themes
+    return themes.get(theme_key) or THEMES.get(theme_key, THEMES['default'])
+
+
+@dataclass
+class ThemeCalendar:
+    """Active theme for every date from ``start`` to ``end``."""
+    start: date
+    end: date
+    # Interval index: parallel lists of first/last day ordinals and the winning event's pk
+    starts: List[int]
+    ends: List[int]
+    entries: List[int]
+    events: Dict[int, Any]
+    # Event pk (None for no event) -> response payload, and a digest of it for validators
+    payloads: Dict[Optional[int], Dict[str, Any]]
+    versions: Dict[Optional[int], str]
+    themes: Dict[str, Dict[str, Any]]
+
+    def _entry(self, day: date) -> Optional[int]:
+        ordinal = day.toordinal()
+        index = bisect_right(self.starts, ordinal) - 1
+        if index >= 0 and ordinal <= self.ends[index]:
+            return self.entries[index]
+        return None
+
+    def event_for(self, day: date):
+        """The event active on ``day``, or None."""
+        entry = self._entry(day)
+        return self.events[entry] if entry is not None else None
+
+    def payload_for(self, day: date) -> Dict[str, Any]:
+        """The resolved theme payload for ``day`` (shared; do not mutate)."""
+        return self.payloads[self._entry(day)]
+
+    def version_for(self, day: date) -> str:
+        """Digest of the payload for ``day``; equal payloads share it across rebuilds and processes."""
+        return self.versions[self._entry(day)]
+
+    def next_change(self, day: date) -> date:
+        """
+        First date after ``day`` whose payload differs from ``day``'s.
+
+        Returns the day after the window when nothing changes within it.
+        """
+        ordinal, last = day.toordinal(), self.end.toordinal()
+        current = self.version_for(day)
+        # Payloads only change where an interval starts or the day after one ends
+        first = max(0, bisect_right(self.starts, ordinal) - 1)
+        for index in range(first, len(self.starts)):
+            for candidate in (self.starts[index], self.ends[index] + 1):
+                if ordinal < candidate <= last and self.version_for(date.fromordinal(candidate)) != current:
+                    return date.fromordinal(candidate)
+        return self.end + timedelta(days=1)
+
+    def theme_data(self, theme_key: str) -> Dict[str, Any]:
+        return _theme_data(self.themes, theme_key)
+
+
+def build_calendar(
+    events: Iterable[Any],
+    themes: Dict[str, Dict[str, Any]],
+    start: date,
+    days: int,
+) -> ThemeCalendar:
+    """
+    Build the interval index for ``days`` dates starting at ``start``.
+
+    When events overlap, the highest priority wins, then the earliest
+    ``start_date``.
+
+    Args:
+        events: Active events
+        themes: Custom theme definitions by key (``Theme.to_dict()``)
+        start: First date covered
+        days: Number of dates covered
+
+    Returns:
+        ThemeCalendar for the window
+    """
+    end = start + timedelta(days=days - 1)
+    low, high = start.toordinal(), end.toordinal()
+    ranked = sorted(events, key=lambda event: (-event.priority, event.start_date, event.pk))
+
+    intervals = []
+    for rank, event in enumerate(ranked):
+        for first, last in _occurrences(event, start, end):
+            first_ordinal, last_ordinal = max(first.toordinal(), low), min(last.toordinal(), high)
+            if first_ordinal <= last_ordinal:
+                intervals.append((first_ordinal, last_ordinal, rank))
+    intervals.sort()
+
+    # Sweep the boundaries; the heap top is the best-ranked event covering the current day
+    boundaries = sorted({first for first, _, _ in intervals} | {last + 1 for _, last, _ in intervals})
+    starts: List[int] = []
+    ends: List[int] = []
+    entries: List[int] = []
+    heap: List[Tuple[int, int]] = []
+    position = 0
+    for index, point in enumerate(boundaries[:-1]):
+        while position < len(intervals) and intervals[position][0] == point:
+            _, last, rank = intervals[position]
+            heapq.heappush(heap, (rank, last))
+            position += 1
+        while heap and heap[0][1] < point:
+            heapq.heappop(heap)
+        if not heap:
+            continue
+        pk = ranked[heap[0][0]].pk
+        segment_end = boundaries[index + 1] - 1
+        if entries and entries[-1] == pk and ends[-1] == point - 1:
+            ends[-1] = segment_end
+        else:
+            starts.append(point)
+            ends.append(segment_end)
+            entries.append(pk)
+
+    used = set(entries)
+    events_by_pk = {event.pk: event for event in ranked if event.pk in used}
+    payloads: Dict[Optional[int], Dict[str, Any]] = {
+        None: {"theme_key": "default", "theme": _theme_data(themes, 'default'), "event": None},
+    }
+    for pk, event in events_by_pk.items():
+        payloads[pk] = {
+            "theme_key": event.theme_key,
+            "theme": _theme_data(themes, event.theme_key),
+            "event": {"name": event.name, "slug": event.slug},
+        }
+
+    versions = {
+        pk: hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        for pk, payload in payloads.items()
+    }
+
+    return ThemeCalendar(
+        start=start,
+        end=end,
+        starts=starts,
+        ends=ends,
+        entries=entries,
+        events=events_by_pk,
+        payloads=payloads,
+        versions=versions,
+        themes=themes,
+    )
@@ -1,19 +1,76 @@
 from django.utils import timezone
-from django.core.cache import cache
 from django.conf import settings
-from datetime import date
+from datetime import datetime, time, timedelta
 from config.themes import THEMES
 from theming.models import Event, Theme
+from theming.services.theme_calendar import ThemeCalendar, build_calendar
+from utils.cache import TwoTierCache
 
 CACHE_KEY_PREFIX = "active_theme"
 CACHE_TTL = 300  # 5 minutes
 
+# Precomputed theme calendars, invalidated and rebuilt by theming.signals
+theme_cache = TwoTierCache(CACHE_KEY_PREFIX, timeout=CACHE_TTL)
+
 
 def _today_local_date():
     """Get today's date in the local timezone."""
     return timezone.localtime(timezone.now()).date()
 
 
+def _calendar_days():
+    return getattr(settings, 'THEME_CALENDAR_DAYS', 60)
+
+
+def get_calendar(for_date=None) -> ThemeCalendar:
+    """
+    Get the theme calendar covering ``for_date`` (default today).
+
+    The calendar for the rolling window starting today is shared by all
+    requests; it is served from process memory and rebuilt when events or
+    themes change. Other dates use the calendar of the same length that
+    covers them, so scanning many dates builds few calendars.
+    """
+    today = _today_local_date()
+    day = for_date or today
+    days = _calendar_days()
+    anchor = today + timedelta(days=(day - today).days // days * days)
+    return theme_cache.get_or_set(f"calendar:{anchor.isoformat()}", lambda: _load_calendar(anchor, days))
+
+
+def _load_calendar(anchor, days):
+    """Build a calendar from the database (two queries)."""
+    events = list(Event.objects.filter(active=True))
+    themes = {theme.key: theme.to_dict() for theme in Theme.objects.all()}
+    return build_calendar(events, themes, anchor, days)
+
+
+def rebuild_calendar():
+    """Drop cached calendars everywhere and build today's again."""
+    theme_cache.invalidate()
+    return get_calendar()
+
+
+def get_active_theme_validity():
+    """
+    Version and remaining lifetime of today's theme payload (without preview).
+
+    The payload can only change at local midnight on a date where the calendar
+    resolves differently, or when events and themes are edited.
+
+    Returns:
+        Tuple of (theme key, payload version, seconds until the payload can next change)
+    """
+    if not getattr(settings, 'THEMING_ENABLED', True):
+        return "default", "disabled", getattr(settings, 'THEME_CACHE_MAX_AGE', 3600)
+
+    today = _today_local_date()
+    calendar = get_calendar(today)
+    change_at = timezone.make_aware(datetime.combine(calendar.next_change(today), time.min))
+    lifetime = (change_at - timezone.now()).total_seconds()
+    return calendar.payload_for(today)["theme_key"], calendar.version_for(today), lifetime
+
+
 def get_active_event(now_date=None):
     """
     Get the active event for a given date.
@@ -21,43 +78,23 @@ def get_active_event(now_date=None):
     """
     if now_date is None:
         now_date = _today_local_date()
-    
-    # Check cache first
-    cache_key = f"{CACHE_KEY_PREFIX}_event_{now_date.isoformat()}"
-    cached_event = cache.get(cache_key)
-    if cached_event is not None:
-        return cached_event
-    
-    # Query active events
-    qs = Event.objects.filter(active=True)
-    candidates = []
-    
-    for ev in qs:
-        if ev.recurring_yearly:
-            # Map this year's start/end with year replaced to now_date.year
-            start = ev.start_date.replace(year=now_date.year)
-            end = ev.end_date.replace(year=now_date.year)
-        else:
-            start, end = ev.start_date, ev.end_date
-        
-        if start <= now_date <= end:
-            candidates.append(ev)
-    
-    # Pick highest priority, then earliest start
-    if not candidates:
-        cache.set(cache_key, None, CACHE_TTL)
-        return None
-    
-    chosen = sorted(candidates, key=lambda e: (-e.priority, e.start_date))[0]
-    cache.set(cache_key, chosen, CACHE_TTL)
-    return chosen
+
+    return get_calendar(now_date).event_for(now_date)
+
+
+def get_theme_data(theme_key):
+    """
+    Get the theme definition for a key.
+    Custom database themes take precedence over predefined themes.
+    """
+    return get_calendar().theme_data(theme_key)
 
 
 def get_active_theme(request=None):
     """
     Get the active theme configuration.
     Returns a dict with theme_key, theme config, and event info.
-    
+
     Args:
         request: Optional Django request object for preview mode support
     """
@@ -68,49 +105,17 @@ def get_active_theme(request=None):
             "theme": THEMES['default'],
             "event": None
         }
-    
+
     # Check for preview theme in session (for admin preview mode)
     if request and hasattr(request, 'session'):
         preview_theme = request.session.get('preview_theme')
         if preview_theme:
-            # Try to get theme from database first, then fallback to predefined
-            theme_data = None
-            try:
-                db_theme = Theme.objects.get(key=preview_theme)
-                theme_data = db_theme.to_dict()
-            except Theme.DoesNotExist:
-                theme_data = THEMES.get(preview_theme, THEMES['default'])
-            
             return {
                 "theme_key": preview_theme,
-                "theme": theme_data,
+                "theme": get_theme_data(preview_theme),
                 "event": None,
                 "preview": True
             }
-    
-    today = _today_local_date()
-    event = get_active_event(today)
-    
-    if event:
-        theme_key = event.theme_key
-    else:
-        theme_key = "default"
-    
-    # Try to get theme from database first (custom themes), then fallback to predefined themes
-    theme_data = None
-    try:
-        db_theme = Theme.objects.get(key=theme_key)
-        theme_data = db_theme.to_dict()
-    except Theme.DoesNotExist:
-        # Fallback to predefined themes
-        theme_data = THEMES.get(theme_key, THEMES['default'])
-    
-    return {
-        "theme_key": theme_key,
-        "theme": theme_data,
-        "event": {
-            "name": event.name if event else None,
-            "slug": event.slug if event else None,
-        } if event else None
-    }
 
+    today = _today_local_date()
+    return dict(get_calendar(today).payload_for(today))
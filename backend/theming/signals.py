@@ -1,28 +1,26 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
-from theming.models import Event
+from theming.models import Event, Theme
+from theming.services.theme_resolver import rebuild_calendar, theme_cache
 
-CACHE_KEY_PREFIX = "active_theme"
+
+def _refresh_calendar():
+    # Bumping the namespace generation drops cached calendars in this process
+    # immediately and in other workers on their next poll
+    theme_cache.invalidate()
+    # Rebuild once committed; the bump then also discards any calendar another
+    # request built from pre-commit data in the meantime
+    transaction.on_commit(rebuild_calendar)
 
 
 @receiver([post_save, post_delete], sender=Event)
 def clear_theme_cache(sender, instance, **kwargs):
-    """Clear theme cache when events are saved or deleted"""
-    # Clear all theme event caches - simple approach: clear cache keys that match pattern
-    # Since we don't know all dates, we'll use a cache version pattern
-    cache_pattern = f"{CACHE_KEY_PREFIX}_event_*"
-    # Django cache doesn't support wildcard deletion easily, so we'll clear the entire cache
-    # or use a version system. For simplicity, we'll just clear relevant date caches
-    # by invalidating a version key that clients check
-    
-    # Set a version/timestamp that changes on event updates
-    cache.set(f"{CACHE_KEY_PREFIX}_version", cache.get(f"{CACHE_KEY_PREFIX}_version", 0) + 1, timeout=None)
-    
-    # Also clear today's cache immediately
-    from django.utils import timezone
-    from theming.services.theme_resolver import _today_local_date
-    today = _today_local_date()
-    cache_key = f"{CACHE_KEY_PREFIX}_event_{today.isoformat()}"
-    cache.delete(cache_key)
+    """Rebuild the theme calendar when events are saved or deleted"""
+    _refresh_calendar()
+
 
+@receiver([post_save, post_delete], sender=Theme)
+def clear_theme_definition_cache(sender, instance, **kwargs):
+    """Rebuild the theme calendar when custom themes change"""
+    _refresh_calendar()
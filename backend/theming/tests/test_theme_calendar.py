@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from theming.models import Event, Theme
+from theming.services.theme_calendar import build_calendar
+from theming.services.theme_resolver import (
+    _today_local_date,
+    get_active_event,
+    get_active_theme,
+    theme_cache,
+)
+
+
+def _event(pk, start, end, theme_key='christmas', priority=0, recurring=False):
+    return Event(
+        pk=pk, name=f'Event {pk}', slug=f'event-{pk}', start_date=start, end_date=end,
+        theme_key=theme_key, priority=priority, recurring_yearly=recurring,
+    )
+
+
+class ThemeCalendarBuildTests(TestCase):
+    def test_overlapping_events_resolve_by_priority(self):
+        """Higher priority wins where events overlap; the rest of each range is kept."""
+        low = _event(1, date(2025, 3, 1), date(2025, 3, 10), 'valentine', priority=1)
+        high = _event(2, date(2025, 3, 4), date(2025, 3, 6), 'christmas', priority=5)
+        calendar = build_calendar([low, high], {}, date(2025, 3, 1), 15)
+
+        self.assertEqual(calendar.event_for(date(2025, 3, 3)).pk, 1)
+        self.assertEqual(calendar.event_for(date(2025, 3, 5)).pk, 2)
+        self.assertEqual(calendar.event_for(date(2025, 3, 7)).pk, 1)
+        self.assertIsNone(calendar.event_for(date(2025, 3, 11)))
+        self.assertEqual(calendar.payload_for(date(2025, 3, 11))['theme_key'], 'default')
+        self.assertEqual(len(calendar.starts), 3)
+
+    def test_same_priority_earliest_start_wins(self):
+        """Ties go to the event that started first."""
+        later = _event(1, date(2025, 3, 5), date(2025, 3, 5), 'valentine', priority=5)
+        earlier = _event(2, date(2025, 3, 4), date(2025, 3, 5), 'christmas', priority=5)
+        calendar = build_calendar([later, earlier], {}, date(2025, 3, 1), 10)
+        self.assertEqual(calendar.event_for(date(2025, 3, 5)).pk, 2)
+
+    def test_recurring_event_crossing_new_year(self):
+        """Yearly events keep their length, including ranges spanning New Year."""
+        event = _event(1, date(2020, 12, 30), date(2021, 1, 2), recurring=True)
+        calendar = build_calendar([event], {}, date(2025, 12, 25), 14)
+        self.assertIsNone(calendar.event_for(date(2025, 12, 29)))
+        self.assertEqual(calendar.event_for(date(2025, 12, 30)).pk, 1)
+        self.assertEqual(calendar.event_for(date(2026, 1, 2)).pk, 1)
+        self.assertIsNone(calendar.event_for(date(2026, 1, 3)))
+
+    def test_next_change(self):
+        """The next change skips boundaries where the payload stays the same."""
+        first = _event(1, date(2025, 3, 3), date(2025, 3, 4), 'christmas', priority=1)
+        second = _event(2, date(2025, 3, 5), date(2025, 3, 6), 'valentine', priority=1)
+        calendar = build_calendar([first, second], {}, date(2025, 3, 1), 10)
+        self.assertEqual(calendar.next_change(date(2025, 3, 1)), date(2025, 3, 3))
+        self.assertEqual(calendar.next_change(date(2025, 3, 3)), date(2025, 3, 5))
+        self.assertEqual(calendar.next_change(date(2025, 3, 6)), date(2025, 3, 7))
+        self.assertEqual(calendar.next_change(date(2025, 3, 7)), date(2025, 3, 11))
+
+        same_theme = _event(3, date(2025, 3, 5), date(2025, 3, 6), 'christmas', priority=1)
+        same_theme.name, same_theme.slug = first.name, first.slug
+        calendar = build_calendar([first, same_theme], {}, date(2025, 3, 1), 10)
+        self.assertEqual(calendar.next_change(date(2025, 3, 3)), date(2025, 3, 7))
+
+    def test_custom_theme_payload(self):
+        """Custom database themes take precedence over predefined ones."""
+        event = _event(1, date(2025, 3, 1), date(2025, 3, 1), 'summer_sale')
+        calendar = build_calendar([event], {'summer_sale': {'name': 'Summer Sale'}}, date(2025, 3, 1), 1)
+        payload = calendar.payload_for(date(2025, 3, 1))
+        self.assertEqual(payload['theme'], {'name': 'Summer Sale'})
+        self.assertEqual(payload['event'], {'name': 'Event 1', 'slug': 'event-1'})
+
+
+class ThemeCalendarServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        theme_cache.clear_local()
+        self.today = _today_local_date()
+
+    def test_active_theme_api_makes_no_queries_once_built(self):
+        """Requests are served from the cached calendar, including on days without events."""
+        url = reverse('theming:active-theme')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['theme_key'], 'default')
+
+    def test_signals_rebuild_calendar(self):
+        """Saving events and themes takes effect on the next lookup."""
+        self.assertIsNone(get_active_event(self.today))
+        event = Event.objects.create(
+            name='Sale', slug='sale', start_date=self.today, end_date=self.today, theme_key='sale',
+        )
+        self.assertEqual(get_active_theme()['theme_key'], 'sale')
+
+        Theme.objects.create(key='sale', name='Sale Theme')
+        self.assertEqual(get_active_theme()['theme']['name'], 'Sale Theme')
+
+        event.delete()
+        self.assertIsNone(get_active_theme()['event'])
+
+    def test_dates_outside_window(self):
+        """Dates beyond the rolling window resolve from their own calendar."""
+        far = self.today + timedelta(days=400)
+        Event.objects.create(name='Far', slug='far', start_date=far, end_date=far, theme_key='christmas')
+        self.assertEqual(get_active_event(far).slug, 'far')
+        self.assertIsNone(get_active_event(far + timedelta(days=1)))
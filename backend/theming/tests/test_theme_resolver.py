@@ -3,7 +3,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from datetime import date, timedelta
 from theming.models import Event
-from theming.services.theme_resolver import get_active_event, get_active_theme, _today_local_date
+from theming.services.theme_resolver import get_active_event, get_active_theme, theme_cache, _today_local_date
 
 
 class ThemeResolverTests(TestCase):
@@ -14,6 +14,7 @@ class ThemeResolverTests(TestCase):
         self.yesterday = self.today - timedelta(days=1)
         # Clear cache before each test
         cache.clear()
+        theme_cache.clear_local()
 
     def test_default_when_no_event(self):
         """Test that default theme is returned when no events are active."""
@@ -133,12 +134,13 @@ class ThemeResolverTests(TestCase):
         # Deactivate event
         Event.objects.filter(slug='cached').update(active=False)
         
-        # Second call should still return cached result (cache TTL is 5 minutes)
-        # In a real scenario, we'd wait for cache to expire or clear it
-        # For testing, we'll just verify the cache key exists
-        cache_key = f"active_theme_event_{self.today.isoformat()}"
-        cached = cache.get(cache_key)
-        self.assertIsNotNone(cached)  # Cache should exist
+        # Queryset update bypasses signals, so the cached event is still served
+        self.assertIsNotNone(get_active_event(self.today))
+
+        # Saving through the model invalidates the cache
+        event = Event.objects.get(slug='cached')
+        event.save()
+        self.assertIsNone(get_active_event(self.today))
 
     def test_multiple_events_same_priority(self):
         """Test that when priority is same, earliest start_date wins."""
@@ -3,7 +3,8 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 from datetime import date, timedelta
 from theming.models import Event
-from theming.services.theme_resolver import _today_local_date
+from django.core.cache import cache
+from theming.services.theme_resolver import _today_local_date, theme_cache
 
 User = get_user_model()
 
@@ -69,6 +70,59 @@ class ThemeAPITests(TestCase):
         self.assertIn('popup', theme)
 
 
+class ActiveThemeCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        theme_cache.clear_local()
+        self.url = reverse('theming:active-theme')
+        self.today = _today_local_date()
+
+    def test_public_cache_until_next_change(self):
+        """Visitors get a shareable response, fresh until the theme can change."""
+        response = self.client.get(self.url)
+        cache_control = response['Cache-Control']
+        self.assertIn('public', cache_control)
+        max_age = int(cache_control.split('max-age=')[1].split(',')[0])
+        self.assertTrue(0 < max_age <= 3600)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+    def test_max_age_stops_at_event_start(self):
+        """An event starting tomorrow bounds max-age by the coming midnight."""
+        tomorrow = self.today + timedelta(days=1)
+        Event.objects.create(
+            name='Sale', slug='sale', start_date=tomorrow, end_date=tomorrow, theme_key='christmas',
+        )
+        with self.settings(THEME_CACHE_MAX_AGE=10 * 86400):
+            response = self.client.get(self.url)
+        max_age = int(response['Cache-Control'].split('max-age=')[1].split(',')[0])
+        self.assertLessEqual(max_age, 86400)
+
+    def test_etag_changes_with_theme(self):
+        """The ETag follows the resolved theme, so edits are picked up on revalidation."""
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Event.objects.create(
+            name='Sale', slug='sale', start_date=self.today, end_date=self.today, theme_key='christmas',
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_preview_session_bypasses_cache(self):
+        """Preview sessions always get their preview and it is never stored."""
+        etag = self.client.get(self.url)['ETag']
+        session = self.client.session
+        session['preview_theme'] = 'christmas'
+        session.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['theme_key'], 'christmas')
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertNotIn('ETag', response)
+
+
 class ThemeSelectorAdminTests(TestCase):
     def setUp(self):
         """Set up test data."""
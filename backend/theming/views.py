@@ -1,18 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
 from django.contrib import messages
+from django.utils.cache import patch_cache_control
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from drf_spectacular.utils import extend_schema
 from config.themes import THEMES
-from theming.services.theme_resolver import get_active_theme
+from theming.services.theme_resolver import get_active_theme, get_active_theme_validity
 from theming.models import Theme, Event
 from theming.serializers import (
     ThemeModelSerializer, ThemeDetailSerializer, EventModelSerializer
 )
+from utils.conditional import make_etag, public_cached_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -62,17 +65,42 @@ def _authenticate_request(request):
     return user
 
 
+def _has_preview_theme(request):
+    """Admin preview sessions must always see their preview, never a cached response"""
+    # Without a session cookie there is no preview; not touching the session
+    # keeps Vary: Cookie off responses to anonymous visitors
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return False
+    return hasattr(request, 'session') and bool(request.session.get('preview_theme'))
+
+
 @extend_schema(
     summary="Get active theme",
-    description="Returns the currently active theme based on date and events",
+    description=(
+        "Returns the currently active theme based on date and events. Responses are "
+        "publicly cacheable until the theme can next change (local midnight of the next "
+        "event boundary, capped by THEME_CACHE_MAX_AGE); preview sessions are never cached."
+    ),
     tags=["Theming"]
 )
 @api_view(['GET'])
+@authentication_classes([])  # Authentication would load the session and add Vary: Cookie
 @permission_classes([AllowAny])
 def active_theme_api(request):
     """API endpoint to get the currently active theme."""
-    theme_data = get_active_theme(request)
-    return Response(theme_data)
+    if _has_preview_theme(request):
+        response = Response(get_active_theme(request))
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+    theme_key, version, lifetime = get_active_theme_validity()
+    max_age = min(lifetime, getattr(settings, 'THEME_CACHE_MAX_AGE', 3600))
+    return public_cached_response(
+        request,
+        make_etag('active_theme', theme_key, version),
+        max_age,
+        lambda: Response(get_active_theme()),
+    )
 
 
 @staff_member_required
@@ -1,158 +1,314 @@
 """
 Bulk operations utilities for efficient batch processing.
+
+Every operation walks its rows in primary-key order (keyset chunking, no
+OFFSET), commits each chunk in its own transaction so locks are short and a
+failure only rolls back the chunk in flight, and returns ``BulkStats`` with
+row counts and throughput. Pass ``progress`` to be called with the running
+stats after every chunk.
 """
-from typing import List, TypeVar, Type, Any, Dict, Optional
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type, TypeVar
+
 from django.db import models, transaction
 from django.db.models import QuerySet
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
 
 ModelType = TypeVar('ModelType', bound=models.Model)
 
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class BulkStats:
+    """Running totals for a bulk operation."""
+    operation: str
+    rows: int = 0
+    batches: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def record(self, rows: int) -> None:
+        self.rows += rows
+        self.batches += 1
+        self.elapsed = time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'operation': self.operation,
+            'rows': self.rows,
+            'batches': self.batches,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+ProgressCallback = Callable[[BulkStats], None]
+
 
 class BulkOperationError(Exception):
     """Exception raised during bulk operations."""
-    pass
+
+    def __init__(self, message: str, stats: Optional[BulkStats] = None) -> None:
+        super().__init__(message)
+        # Chunks counted here were committed before the failure
+        self.stats = stats
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    # Lazy, so generators are consumed one batch at a time
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _run_batches(
+    operation: str,
+    batches: Iterator[Any],
+    apply: Callable[[Any], int],
+    progress: Optional[ProgressCallback],
+) -> BulkStats:
+    """Apply ``apply`` to each batch in its own transaction, recording stats."""
+    stats = BulkStats(operation)
+    for batch in batches:
+        try:
+            with transaction.atomic():
+                rows = apply(batch)
+        except Exception as exc:
+            raise BulkOperationError(
+                f"{operation} failed in batch {stats.batches + 1} after {stats.rows} rows: {exc}", stats
+            ) from exc
+        stats.record(rows)
+        if progress:
+            progress(stats)
+    logger.info(
+        "%s: %d rows in %d batches (%.1fs, %.0f rows/s)",
+        operation, stats.rows, stats.batches, stats.elapsed, stats.rows_per_second,
+    )
+    return stats
+
+
+def iter_keyset_chunks(
+    queryset: QuerySet[ModelType],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[List[ModelType]]:
+    """
+    Yield model instances from a queryset in primary-key chunks.
+
+    Each chunk is one ``WHERE pk > last ORDER BY pk LIMIT n`` query, so the
+    cost per chunk stays constant and rows changed by earlier chunks are not
+    skipped or repeated.
+
+    Args:
+        queryset: QuerySet to iterate (any ordering is replaced by pk)
+        batch_size: Rows per chunk
+
+    Yields:
+        Lists of at most ``batch_size`` instances
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:batch_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        yield chunk
+
+
+def iter_keyset_pks(
+    queryset: QuerySet[ModelType],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[List[Any]]:
+    """
+    Yield primary keys from a queryset in chunks, without loading instances.
+
+    Args:
+        queryset: QuerySet to iterate
+        batch_size: Keys per chunk
+
+    Yields:
+        Lists of at most ``batch_size`` primary keys
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:batch_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1]
+        yield chunk
 
 
 def bulk_create_optimized(
     model: Type[ModelType],
-    objects: List[ModelType],
-    batch_size: int = 100,
-    ignore_conflicts: bool = False
-) -> List[ModelType]:
+    objects: Iterable[ModelType],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    ignore_conflicts: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> BulkStats:
     """
-    Optimized bulk create with batching.
-    
+    Bulk create with one transaction per batch.
+
     Args:
         model: Django model class
-        objects: List of model instances to create
+        objects: Model instances to create (a generator is consumed batch by batch)
         batch_size: Number of objects to create per batch
-        ignore_conflicts: Whether to ignore conflicts
-    
+        ignore_conflicts: Whether to skip rows that violate unique constraints
+        progress: Optional callback receiving stats after each batch
+
     Returns:
-        List of created objects
+        Stats for the operation (``rows`` counts objects submitted)
     """
-    if not objects:
-        return []
-    
-    created_objects = []
-    
-    with transaction.atomic():
-        for i in range(0, len(objects), batch_size):
-            batch = objects[i:i + batch_size]
-            if ignore_conflicts:
-                created = model.objects.bulk_create(
-                    batch,
-                    batch_size=batch_size,
-                    ignore_conflicts=True
-                )
-            else:
-                created = model.objects.bulk_create(
-                    batch,
-                    batch_size=batch_size
-                )
-            created_objects.extend(created)
-    
-    return created_objects
+    def apply(batch):
+        model._default_manager.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        return len(batch)
+
+    return _run_batches(f"bulk_create {model._meta.label}", _chunks(objects, batch_size), apply, progress)
+
+
+def bulk_upsert(
+    model: Type[ModelType],
+    objects: Iterable[ModelType],
+    unique_fields: List[str],
+    update_fields: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> BulkStats:
+    """
+    Insert rows, updating ``update_fields`` on rows that already exist.
+
+    Uses ``INSERT ... ON CONFLICT (unique_fields) DO UPDATE``, so each batch is
+    a single statement regardless of how many rows already exist.
+
+    Args:
+        model: Django model class
+        objects: Model instances to insert or update (a generator is consumed batch by batch)
+        unique_fields: Fields of the unique constraint that identifies existing rows
+        update_fields: Fields to overwrite on conflict
+        batch_size: Number of objects per statement
+        progress: Optional callback receiving stats after each batch
+
+    Returns:
+        Stats for the operation
+    """
+    def apply(batch):
+        model._default_manager.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        return len(batch)
+
+    return _run_batches(f"bulk_upsert {model._meta.label}", _chunks(objects, batch_size), apply, progress)
 
 
 def bulk_update_optimized(
     objects: List[ModelType],
     fields: List[str],
-    batch_size: int = 100
-) -> int:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> BulkStats:
     """
-    Optimized bulk update with batching.
-    
+    Save ``fields`` of already-modified instances in batches.
+
     Args:
         objects: List of model instances to update
         fields: List of field names to update
         batch_size: Number of objects to update per batch
-    
+        progress: Optional callback receiving stats after each batch
+
     Returns:
-        Number of updated objects
+        Stats for the operation
     """
     if not objects:
-        return 0
-    
-    updated_count = 0
-    
-    with transaction.atomic():
-        for i in range(0, len(objects), batch_size):
-            batch = objects[i:i + batch_size]
-            updated = models.Model.objects.bulk_update(
-                batch,
-                fields,
-                batch_size=batch_size
-            )
-            updated_count += len(batch)
-    
-    return updated_count
+        return BulkStats('bulk_update')
+    model = type(objects[0])
+
+    def apply(batch):
+        return model._default_manager.bulk_update(batch, fields)
+
+    return _run_batches(f"bulk_update {model._meta.label}", _chunks(objects, batch_size), apply, progress)
 
 
 def bulk_delete_optimized(
     queryset: QuerySet[ModelType],
-    batch_size: int = 100
-) -> int:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> BulkStats:
     """
-    Optimized bulk delete with batching.
-    
+    Delete a queryset in primary-key chunks, one transaction per chunk.
+
+    Cascades and delete signals run per chunk, as with ``QuerySet.delete()``.
+
     Args:
         queryset: QuerySet to delete
         batch_size: Number of objects to delete per batch
-    
+        progress: Optional callback receiving stats after each batch
+
     Returns:
-        Number of deleted objects
+        Stats for the operation (``rows`` counts rows of the queryset's model only)
     """
-    count = queryset.count()
-    if count == 0:
-        return 0
-    
-    deleted_count = 0
-    
-    with transaction.atomic():
-        while True:
-            batch_ids = list(queryset.values_list('pk', flat=True)[:batch_size])
-            if not batch_ids:
-                break
-            
-            deleted, _ = queryset.filter(pk__in=batch_ids).delete()
-            deleted_count += deleted
-    
-    return deleted_count
+    model = queryset.model
+    label = model._meta.label
+
+    def apply(pks):
+        _, per_model = model._default_manager.filter(pk__in=pks).delete()
+        return per_model.get(label, 0)
+
+    return _run_batches(f"bulk_delete {label}", iter_keyset_pks(queryset, batch_size), apply, progress)
 
 
 def bulk_update_fields(
     queryset: QuerySet[ModelType],
     updates: Dict[str, Any],
-    batch_size: int = 100
-) -> int:
+    batch_size: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> BulkStats:
     """
-    Bulk update fields for a queryset.
-    
+    Set the same values on every row of a queryset with ``UPDATE``.
+
+    Without ``batch_size`` this is a single ``queryset.update()``. With it,
+    rows are updated in primary-key chunks, each in its own transaction, to
+    keep row locks short on large tables. Values may be expressions such as
+    ``F('count') + 1``. ``auto_now`` fields not in ``updates`` are set to now,
+    as ``save()`` would; otherwise, like ``update()``, no ``save()`` or signals run.
+
     Args:
         queryset: QuerySet to update
         updates: Dictionary of field: value pairs
-        batch_size: Number of objects to update per batch
-    
+        batch_size: Rows per chunk, or None for one statement
+        progress: Optional callback receiving stats after each batch
+
     Returns:
-        Number of updated objects
+        Stats for the operation
     """
-    count = queryset.count()
-    if count == 0:
-        return 0
-    
-    updated_count = 0
-    
-    with transaction.atomic():
-        for i in range(0, count, batch_size):
-            batch = queryset[i:i + batch_size]
-            for obj in batch:
-                for field, value in updates.items():
-                    setattr(obj, field, value)
-            
-            model = queryset.model
-            model.objects.bulk_update(batch, list(updates.keys()), batch_size=batch_size)
-            updated_count += len(batch)
-    
-    return updated_count
+    model = queryset.model
+    operation = f"bulk_update_fields {model._meta.label}"
+    now = timezone.now()
+    updates = {
+        **{f.name: now for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)},
+        **updates,
+    }
+    if batch_size is None:
+        return _run_batches(operation, iter([queryset]), lambda qs: qs.update(**updates), progress)
+
+    def apply(pks):
+        return model._default_manager.filter(pk__in=pks).update(**updates)
 
+    return _run_batches(operation, iter_keyset_pks(queryset, batch_size), apply, progress)
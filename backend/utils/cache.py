@@ -1,13 +1,24 @@
 """
 Redis caching utilities for performance optimization.
 """
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Dict, Optional, TypeVar
+import datetime
+import decimal
 import json
 import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
 from functools import wraps
 
 from django.core.cache import cache
 from django.conf import settings
+from django.db.models import Model
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
@@ -17,42 +28,165 @@ CACHE_TIMEOUT_MEDIUM = 60 * 30  # 30 minutes
 CACHE_TIMEOUT_LONG = 60 * 60 * 24  # 24 hours
 
 
+def _canonicalize(value: Any) -> Any:
+    """
+    Convert a value into a JSON-serializable form that is identical across processes.
+
+    Dict keys and sets are sorted, model instances are reduced to their label and
+    primary key, and dates/decimals/UUIDs are rendered as strings.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _canonicalize(value[key]) for key in sorted(value, key=str)}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonicalize(item) for item in value), key=repr)
+    if isinstance(value, Model):
+        return f"{value._meta.label_lower}:{value.pk}"
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, 'lists'):
+        # QueryDict / MultiValueDict
+        return {key: sorted(values) for key, values in sorted(value.lists())}
+    return repr(value)
+
+
 def get_cache_key(prefix: str, *args, **kwargs) -> str:
     """
-    Generate a cache key from prefix and arguments.
-    
+    Generate a deterministic cache key from prefix and arguments.
+
+    Arguments are canonicalized and hashed with SHA-256, so the same call
+    produces the same key in every worker and across restarts.
+
     Args:
         prefix: Cache key prefix
         *args: Positional arguments
         **kwargs: Keyword arguments
-    
+
     Returns:
         Cache key string
     """
-    # Create a hash of arguments
-    key_parts = [prefix]
-    if args:
-        key_parts.append(str(hash(str(args))))
-    if kwargs:
-        # Sort kwargs for consistent keys
-        sorted_kwargs = sorted(kwargs.items())
-        key_parts.append(str(hash(str(sorted_kwargs))))
-    
-    key_string = ':'.join(key_parts)
-    # Create hash for long keys
-    if len(key_string) > 200:
-        key_string = hashlib.md5(key_string.encode()).hexdigest()
-    
-    return f"pchm:{prefix}:{key_string}"
+    if not args and not kwargs:
+        return f"pchm:{prefix}"
+    payload = json.dumps(
+        {'args': _canonicalize(args), 'kwargs': _canonicalize(kwargs)},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+    return f"pchm:{prefix}:{digest}"
+
+
+def _namespace_version_key(namespace: str) -> str:
+    return f"pchm:ns_version:{namespace}"
+
+
+def _new_generation() -> int:
+    # Seeded from the clock so a lost/evicted counter never restarts at a
+    # generation whose entries may still be cached
+    return time.time_ns()
+
+
+def get_namespace_version(namespace: str) -> int:
+    """
+    Return the current generation of a cache namespace.
+
+    Args:
+        namespace: Namespace name (e.g. 'vehicles')
+
+    Returns:
+        Generation number embedded in the namespace's keys
+    """
+    key = _namespace_version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_generation(), None)
+        version = cache.get(key) or _new_generation()
+    return version
+
+
+def bump_namespace(namespace: str) -> None:
+    """
+    Invalidate every entry in a namespace by advancing its generation.
+
+    Works in O(1) on any cache backend; stale entries simply stop being
+    addressed and expire with their own timeout.
 
+    Args:
+        namespace: Namespace name
+    """
+    key = _namespace_version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing (never read or evicted)
+        cache.set(key, _new_generation(), None)
 
-def cache_result(timeout: int = CACHE_TIMEOUT_MEDIUM, key_prefix: Optional[str] = None):
+
+def get_versioned_cache_key(namespace: str, prefix: str, *args, **kwargs) -> str:
+    """
+    Generate a cache key scoped to the current generation of ``namespace``.
+
+    Args:
+        namespace: Invalidation namespace
+        prefix: Key prefix within the namespace
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        Cache key string
+    """
+    version = get_namespace_version(namespace)
+    return get_cache_key(f"{namespace}:v{version}:{prefix}", *args, **kwargs)
+
+
+class CacheStats:
+    """Per-process cache hit/miss counters, grouped by namespace."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def hit(self, namespace: str) -> None:
+        with self._lock:
+            self._counts[namespace]['hits'] += 1
+
+    def miss(self, namespace: str) -> None:
+        with self._lock:
+            self._counts[namespace]['misses'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return counters with hit ratio per namespace."""
+        with self._lock:
+            counts = {namespace: dict(values) for namespace, values in self._counts.items()}
+        for values in counts.values():
+            lookups = values['hits'] + values['misses']
+            values['hit_ratio'] = round(values['hits'] / lookups, 4) if lookups else None
+        return counts
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+cache_stats = CacheStats()
+
+# Distinguishes a cached ``None`` from a cache miss
+_MISSING = object()
+
+
+def cache_result(timeout: int = CACHE_TIMEOUT_MEDIUM, key_prefix: Optional[str] = None, namespace: Optional[str] = None):
     """
     Decorator to cache function results.
     
     Args:
         timeout: Cache timeout in seconds
         key_prefix: Optional custom key prefix
+        namespace: Optional invalidation namespace; results are dropped when it is bumped
     
     Usage:
         @cache_result(timeout=300, key_prefix='vehicles')
@@ -64,12 +198,17 @@ def cache_result(timeout: int = CACHE_TIMEOUT_MEDIUM, key_prefix: Optional[str]
         def wrapper(*args, **kwargs):
             # Generate cache key
             prefix = key_prefix or f"{func.__module__}.{func.__name__}"
-            cache_key = get_cache_key(prefix, *args, **kwargs)
+            if namespace:
+                cache_key = get_versioned_cache_key(namespace, prefix, *args, **kwargs)
+            else:
+                cache_key = get_cache_key(prefix, *args, **kwargs)
             
             # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
+            cached_result = cache.get(cache_key, _MISSING)
+            if cached_result is not _MISSING:
+                cache_stats.hit(prefix)
                 return cached_result
+            cache_stats.miss(prefix)
             
             # Execute function
             result = func(*args, **kwargs)
@@ -87,22 +226,21 @@ def invalidate_cache_pattern(pattern: str) -> int:
     """
     Invalidate all cache keys matching a pattern.
     
+    Only supported by backends with ``delete_pattern`` (django-redis). Other
+    backends are left untouched; use ``bump_namespace`` for invalidation that
+    works everywhere.
+    
     Args:
         pattern: Cache key pattern (e.g., 'pchm:vehicles:*')
     
     Returns:
         Number of keys deleted
     """
-    # Note: This requires Redis and may not work with all cache backends
-    # For production, consider using django-redis with pattern deletion
     try:
-        from django.core.cache import cache
         if hasattr(cache, 'delete_pattern'):
             return cache.delete_pattern(pattern)
-        else:
-            # Fallback: clear all cache (not ideal)
-            cache.clear()
-            return -1
+        logger.debug('Cache backend has no delete_pattern; skipping %s', pattern)
+        return 0
     except Exception:
         return 0
 
@@ -124,9 +262,11 @@ def cache_queryset(queryset, timeout: int = CACHE_TIMEOUT_MEDIUM, key_prefix: st
     cache_key = get_cache_key(key_prefix, sql=sql)
     
     # Try to get from cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
+    cached_result = cache.get(cache_key, _MISSING)
+    if cached_result is not _MISSING:
+        cache_stats.hit(key_prefix)
         return cached_result
+    cache_stats.miss(key_prefix)
     
     # Execute queryset
     result = list(queryset)
@@ -137,6 +277,205 @@ def cache_queryset(queryset, timeout: int = CACHE_TIMEOUT_MEDIUM, key_prefix: st
     return result
 
 
+class TwoTierCache:
+    """
+    Per-process LRU in front of the shared cache for small, hot, rarely changing values.
+
+    Reads are served from process memory for up to ``local_ttl`` seconds. Entries
+    are tied to the namespace generation (see ``bump_namespace``); each process
+    polls that generation at most every ``poll_interval`` seconds and drops its
+    local entries when another process has invalidated the namespace. On a miss
+    only one caller per key recomputes the value: threads in the same process
+    wait on a per-key lock and other processes wait briefly on a shared lock key.
+
+    Usage:
+        settings_cache = TwoTierCache('chatbot_settings')
+        value = settings_cache.get_or_set('singleton', load_settings)
+        settings_cache.invalidate()
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        timeout: int = CACHE_TIMEOUT_MEDIUM,
+        local_ttl: float = 5.0,
+        maxsize: int = 256,
+        poll_interval: float = 1.0,
+        lock_timeout: int = 10,
+    ) -> None:
+        self.namespace = namespace
+        self.timeout = timeout
+        self.local_ttl = local_ttl
+        self.maxsize = maxsize
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self._local: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+
+    def _current_generation(self) -> int:
+        now = time.monotonic()
+        if self._generation is None or now - self._checked_at >= self.poll_interval:
+            generation = get_namespace_version(self.namespace)
+            with self._lock:
+                if generation != self._generation:
+                    self._local.clear()
+                    self._generation = generation
+                self._checked_at = now
+        return self._generation
+
+    def _get_local(self, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                if len(self._key_locks) >= self.maxsize:
+                    self._key_locks = {k: l for k, l in self._key_locks.items() if l.locked()}
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _shared_key(self, generation: int, key: str) -> str:
+        return f"pchm:{self.namespace}:v{generation}:{key}"
+
+    def get_or_set(self, key: str, compute: Callable[[], T]) -> T:
+        """
+        Return the value for ``key``, computing and storing it on a miss.
+
+        Args:
+            key: Key within the namespace
+            compute: Zero-argument callable producing the value (``None`` is cached too)
+
+        Returns:
+            Cached or freshly computed value
+        """
+        generation = self._current_generation()
+        value = self._get_local(key)
+        if value is not _MISSING:
+            cache_stats.hit(f"{self.namespace}:local")
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have filled it while we waited
+            value = self._get_local(key)
+            if value is not _MISSING:
+                cache_stats.hit(f"{self.namespace}:local")
+                return value
+
+            shared_key = self._shared_key(generation, key)
+            value = cache.get(shared_key, _MISSING)
+            if value is not _MISSING:
+                cache_stats.hit(self.namespace)
+                self._set_local(key, value)
+                return value
+            cache_stats.miss(self.namespace)
+
+            lock_key = f"{shared_key}:lock"
+            acquired = cache.add(lock_key, 1, self.lock_timeout)
+            if not acquired:
+                # Another process is recomputing; give it a moment before doing it ourselves
+                value = self._wait_for(shared_key)
+                if value is not _MISSING:
+                    self._set_local(key, value)
+                    return value
+            try:
+                value = compute()
+                cache.set(shared_key, value, self.timeout)
+            finally:
+                # Only our own lock: the holder may still be computing for other waiters
+                if acquired:
+                    cache.delete(lock_key)
+            self._set_local(key, value)
+            return value
+
+    def _wait_for(self, shared_key: str, attempts: int = 10, delay: float = 0.05) -> Any:
+        for _ in range(attempts):
+            time.sleep(delay)
+            value = cache.get(shared_key, _MISSING)
+            if value is not _MISSING:
+                return value
+        return _MISSING
+
+    def invalidate(self) -> None:
+        """Drop the namespace in this process and, via its generation, in every other one."""
+        bump_namespace(self.namespace)
+        with self._lock:
+            self._local.clear()
+            self._generation = None
+
+    def clear_local(self) -> None:
+        """Drop this process's local entries only."""
+        with self._lock:
+            self._local.clear()
+            self._generation = None
+
+
+class CachedListMixin:
+    """
+    Cache public ``list`` responses of a viewset.
+
+    Only anonymous GET requests are served from cache; authenticated (admin)
+    requests always hit the database because they see unpublished rows. The key
+    covers the absolute path and every query parameter, so filters, search, ordering and
+    pagination are cached separately.
+
+    Usage:
+        class VehicleViewSet(CachedListMixin, viewsets.ModelViewSet):
+            cache_namespace = 'vehicles'
+    """
+
+    cache_namespace: Optional[str] = None
+    cache_timeout: int = CACHE_TIMEOUT_SHORT
+
+    def get_list_cache_key(self, request) -> str:
+        # Host is part of the key because serializers build absolute media URLs
+        return get_versioned_cache_key(
+            self.cache_namespace,
+            'list',
+            request.build_absolute_uri(request.path),
+            request.query_params,
+        )
+
+    def list(self, request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        if not self.cache_namespace or (user is not None and user.is_authenticated):
+            return super().list(request, *args, **kwargs)
+
+        cache_key = self.get_list_cache_key(request)
+        data = cache.get(cache_key, _MISSING)
+        if data is not _MISSING:
+            cache_stats.hit(self.cache_namespace)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        cache_stats.miss(self.cache_namespace)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
 class CacheManager:
     """Manager for cache operations."""
     
@@ -170,22 +509,23 @@ class CacheManager:
         """Invalidate vehicle-related cache."""
         if vehicle_id:
             cache.delete(f"pchm:vehicles:{vehicle_id}")
-        cache.delete("pchm:vehicles:list")
-        invalidate_cache_pattern("pchm:vehicles:*")
+        bump_namespace('vehicles')
     
     @staticmethod
     def invalidate_blog_cache(blog_id: Optional[int] = None) -> None:
         """Invalidate blog-related cache."""
         if blog_id:
             cache.delete(f"pchm:blog:{blog_id}")
-        cache.delete("pchm:blog:list")
-        invalidate_cache_pattern("pchm:blog:*")
+        bump_namespace('blog')
     
     @staticmethod
     def invalidate_car_sales_cache(listing_id: Optional[int] = None) -> None:
         """Invalidate car sales cache."""
         if listing_id:
             cache.delete(f"pchm:car_sales:{listing_id}")
-        cache.delete("pchm:car_sales:list")
-        invalidate_cache_pattern("pchm:car_sales:*")
+        bump_namespace('car_sales')
 
+    @staticmethod
+    def invalidate_namespace(namespace: str) -> None:
+        """Invalidate every cached entry under a namespace."""
+        bump_namespace(namespace)
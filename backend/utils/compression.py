@@ -2,76 +2,276 @@
 Response compression middleware for API performance.
 """
 import gzip
-from io import BytesIO
-from typing import Callable
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from utils.cache import CACHE_TIMEOUT_SHORT, cache_stats, get_cache_key
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+DEFAULT_ENCODINGS = ['br', 'zstd', 'gzip']
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        # wbits=31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Encoding -> (one-shot compressor, streaming compressor class); only installed codecs are listed
+CODECS: Dict[str, Tuple[Callable[[bytes, int], bytes], type]] = {'gzip': (_compress_gzip, _GzipStream)}
+if brotli is not None:
+    CODECS['br'] = (_compress_brotli, _BrotliStream)
+if zstandard is not None:
+    CODECS['zstd'] = (_compress_zstd, _ZstdStream)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {coding: q-value}.
+
+    Args:
+        header: Raw Accept-Encoding header value
+
+    Returns:
+        Mapping of lower-cased content codings to their quality values
+    """
+    accepted: Dict[str, float] = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header: str, preferred: Iterable[str]) -> Optional[str]:
+    """
+    Pick the content coding to use for a response.
+
+    The client's highest q-value wins; ties go to the first coding in ``preferred``.
 
+    Args:
+        header: Raw Accept-Encoding header value
+        preferred: Server preference order of codings
 
-class GZipCompressionMiddleware(MiddlewareMixin):
+    Returns:
+        Chosen coding, or None if the client accepts none that are available
     """
-    Middleware to compress API responses with gzip.
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in preferred:
+        if coding not in CODECS:
+            continue
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
     """
-    
+    Middleware to compress API responses with the best encoding the client accepts.
+
+    Supports Brotli and zstd when their packages are installed, falling back to
+    gzip. Streaming responses are compressed chunk by chunk. Compressed bodies of
+    cacheable responses that carry an ETag are cached, so repeated hits on the
+    same representation are not recompressed.
+    """
+
     # Content types that should be compressed
     COMPRESSIBLE_CONTENT_TYPES = [
         'application/json',
         'application/javascript',
         'text/css',
+        'text/event-stream',
         'text/html',
         'text/javascript',
         'text/plain',
         'text/xml',
     ]
-    
+
     # Minimum response size to compress (bytes)
     MIN_COMPRESS_SIZE = 200
-    
+
+    def get_encodings(self) -> List[str]:
+        return getattr(settings, 'COMPRESSION_ENCODINGS', DEFAULT_ENCODINGS)
+
+    def get_level(self, encoding: str) -> int:
+        levels = getattr(settings, 'COMPRESSION_LEVELS', {})
+        return levels.get(encoding, DEFAULT_LEVELS[encoding])
+
     def process_response(self, request, response):
         """Compress response if applicable."""
         # Skip compression in development if disabled
         if settings.DEBUG and not getattr(settings, 'ENABLE_COMPRESSION', False):
             return response
-        
+
         # Only compress API responses
         if not request.path.startswith('/api/'):
             return response
-        
-        # Check if client accepts gzip
-        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
-        if 'gzip' not in accept_encoding:
+
+        # Check if already compressed
+        if response.get('Content-Encoding'):
             return response
-        
+
         # Check content type
         content_type = response.get('Content-Type', '')
         if not any(ct in content_type for ct in self.COMPRESSIBLE_CONTENT_TYPES):
             return response
-        
-        # Check response size
-        content = response.content
-        if len(content) < self.MIN_COMPRESS_SIZE:
-            return response
-        
-        # Check if already compressed
-        if response.get('Content-Encoding'):
+
+        # Responses differ by Accept-Encoding whenever compression is possible
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.get_encodings())
+        if encoding is None:
             return response
-        
-        # Compress content
+        level = self.get_level(encoding)
+
         try:
-            compressed_content = gzip.compress(content)
-            
-            # Only use compression if it actually reduces size
-            if len(compressed_content) < len(content):
-                response.content = compressed_content
-                response['Content-Encoding'] = 'gzip'
-                response['Content-Length'] = str(len(compressed_content))
-                # Remove Vary header if present, add our own
-                if 'Vary' not in response:
-                    response['Vary'] = 'Accept-Encoding'
+            if response.streaming:
+                self._compress_streaming(response, encoding, level)
+            else:
+                if len(response.content) < self.MIN_COMPRESS_SIZE:
+                    return response
+                compressed = self._compress_body(request, response, encoding, level)
+                # Only use compression if it actually reduces size
+                if compressed is None or len(compressed) >= len(response.content):
+                    return response
+                response.content = compressed
+                response['Content-Length'] = str(len(compressed))
         except Exception:
             # If compression fails, return original response
-            pass
-        
+            return response
+
+        # The compressed representation is not byte-identical to the original
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
         return response
 
+    def _is_cacheable(self, response) -> bool:
+        if response.status_code != 200 or not response.has_header('ETag'):
+            return False
+        cache_control = response.get('Cache-Control', '').lower()
+        return 'no-store' not in cache_control and 'private' not in cache_control
+
+    def _compress_body(self, request, response, encoding: str, level: int) -> Optional[bytes]:
+        compress = CODECS[encoding][0]
+        if not self._is_cacheable(response):
+            return compress(response.content, level)
+
+        cache_timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', CACHE_TIMEOUT_SHORT)
+        # The same URL and ETag can carry several representations (JSON, browsable API HTML)
+        cache_key = get_cache_key(
+            'compressed', request.path, response['ETag'], response.get('Content-Type', ''), encoding, level
+        )
+        compressed = cache.get(cache_key)
+        if compressed is not None:
+            cache_stats.hit('compressed')
+            return compressed
+        cache_stats.miss('compressed')
+        compressed = compress(response.content, level)
+        cache.set(cache_key, compressed, cache_timeout)
+        return compressed
+
+    def _compress_streaming(self, response, encoding: str, level: int) -> None:
+        stream_class = CODECS[encoding][1]
+
+        if response.is_async:
+            original = response.streaming_content
+
+            async def compressed_content():
+                stream = stream_class(level)
+                async for chunk in original:
+                    data = stream.compress(chunk)
+                    if data:
+                        yield data
+                yield stream.finish()
+
+            response.streaming_content = compressed_content()
+        else:
+            original = response.streaming_content
+
+            def compressed_content():
+                stream = stream_class(level)
+                for chunk in original:
+                    data = stream.compress(chunk)
+                    if data:
+                        yield data
+                yield stream.finish()
+
+            response.streaming_content = compressed_content()
+
+        # Length of the compressed stream is unknown up front
+        response.headers.pop('Content-Length', None)
+
+
+# Backwards-compatible name used in older settings
+GZipCompressionMiddleware = CompressionMiddleware
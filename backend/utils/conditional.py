@@ -0,0 +1,156 @@
+"""
+Conditional GET (ETag / Last-Modified) support for read endpoints.
+"""
+import hashlib
+from typing import Any, Callable, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def _request_scope(request) -> str:
+    # Anonymous and authenticated users can see different rows
+    user = getattr(request, 'user', None)
+    return 'auth' if user is not None and user.is_authenticated else 'anon'
+
+
+def _representation(request) -> str:
+    # DRF renders JSON and the browsable API from one URL; each needs its own validator
+    return getattr(request, 'accepted_media_type', '') or ''
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a quoted ETag from validator parts.
+
+    Args:
+        *parts: Values identifying the representation
+
+    Returns:
+        Quoted strong ETag
+    """
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+    return quote_etag(digest)
+
+
+def _finalize(response, etag: Optional[str], last_modified=None):
+    """Attach validators and require revalidation so clients send them back."""
+    if 200 <= response.status_code < 300:
+        if etag and not response.has_header('ETag'):
+            response['ETag'] = etag
+        if last_modified is not None and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        if not response.has_header('Cache-Control'):
+            patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _not_modified(request, etag: Optional[str], last_modified=None):
+    """Return a 304/412 response if the request's preconditions say so, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None and response.status_code == 304:
+        if etag:
+            response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``list``/``retrieve`` with 304 Not Modified when the client's validators still match.
+
+    Validators are computed without serializing anything:
+
+    * list: one aggregate query over the filtered queryset
+      (``MAX(<timestamp field>)`` and ``COUNT(*)``) combined with the query string;
+      If-Modified-Since alone never yields 304, since deletes leave the maximum as it was
+    * retrieve: the object's timestamp field
+
+    Both include the negotiated media type, and responses vary on ``Accept``.
+
+    Set ``conditional_timestamp_field`` to the model's auto-now field.
+
+    Usage:
+        class FAQViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+            conditional_timestamp_field = 'updated_at'
+    """
+
+    conditional_timestamp_field = 'updated_at'
+
+    def get_list_validators(self, request) -> Tuple[str, Any]:
+        field = self.conditional_timestamp_field
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        stats = queryset.aggregate(last_modified=Max(field), count=Count('pk'))
+        last_modified = stats['last_modified']
+        etag = make_etag(
+            self.__class__.__name__, _request_scope(request), _representation(request), request.get_full_path(),
+            stats['count'], last_modified.isoformat() if last_modified else '',
+        )
+        return etag, last_modified
+
+    def get_object_validators(self, request, instance) -> Tuple[str, Any]:
+        last_modified = getattr(instance, self.conditional_timestamp_field)
+        etag = make_etag(
+            self.__class__.__name__, _request_scope(request), _representation(request), request.get_full_path(),
+            instance.pk, last_modified.isoformat() if last_modified else '',
+        )
+        return etag, last_modified
+
+    def conditional_response(self, request, etag: str, last_modified, render: Callable[[], Any],
+                             compare_last_modified: bool = True):
+        """
+        Return 304 if the client's validators match, otherwise ``render()`` with validators attached.
+
+        With ``compare_last_modified`` off, ``Last-Modified`` is still sent but
+        only the ETag can produce a 304.
+        """
+        not_modified = _not_modified(request, etag, last_modified if compare_last_modified else None)
+        if not_modified is None:
+            response = _finalize(render(), etag, last_modified)
+        else:
+            response = not_modified
+        # Validators depend on the negotiated renderer
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators(request)
+        # MAX(updated_at) does not move when a row is deleted; the ETag includes the count
+        return self.conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            compare_last_modified=False,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_object_validators(request, self.get_object())
+        return self.conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+def public_cached_response(request, etag: str, max_age: int, render: Callable[[], Any]):
+    """
+    Serve a response that browsers and CDNs may store for ``max_age`` seconds.
+
+    Answers 304 Not Modified when If-None-Match matches ``etag`` without
+    calling ``render``. The 304 carries the same ``Cache-Control`` so shared
+    caches renew their copy.
+
+    Args:
+        request: Incoming request
+        etag: Quoted ETag of the representation (see ``make_etag``)
+        max_age: Seconds the response stays fresh
+        render: Zero-argument callable producing the full response
+
+    Returns:
+        304/412 response or the rendered response with validators and caching headers
+    """
+    response = _not_modified(request, etag)
+    if response is None:
+        response = render()
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=max(0, int(max_age)))
+    return response
@@ -1,18 +1,93 @@
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import html
+import re
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
 
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.template import TemplateSyntaxError, engines
+from django.template.loader import get_template
 from django.utils.html import strip_tags
 
+# Filters that emit markup; dropped from the plain-text twin so newlines survive as-is.
+_HTML_FILTERS_RE = re.compile(r"\|\s*(?:linebreaksbr|linebreaks|urlize|safe)\b")
+_BR_TAG_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+class _CompiledEmailTemplate:
+    """An HTML email template plus a precompiled plain-text twin."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.html_template = get_template(name)
+        self.text_template = self._compile_text_template()
+
+    def _compile_text_template(self):
+        """
+        Strip markup from the template *source* once, so each send only has to
+        render the dynamic parts. Templates using inheritance/includes fall back
+        to stripping the rendered HTML.
+        """
+        source = getattr(getattr(self.html_template, "template", None), "source", None)
+        if not source or "{% extends" in source or "{% include" in source:
+            return None
+
+        text_source = html.unescape(strip_tags(_BR_TAG_RE.sub("\n", source)))
+        text_source = _HTML_FILTERS_RE.sub("", text_source)
+        lines = [line.strip() for line in text_source.splitlines()]
+        text_source = _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+        try:
+            return engines["django"].from_string(
+                "{% autoescape off %}" + text_source + "{% endautoescape %}"
+            )
+        except TemplateSyntaxError:
+            return None
+
+    def render(self, context: dict) -> Tuple[str, str]:
+        html_body = self.html_template.render(context)
+        if self.text_template is None:
+            return html_body, strip_tags(html_body)
+        return html_body, self.text_template.render(context)
+
+
+class EmailTemplateCache:
+    """Process-wide cache of compiled email templates keyed by template name."""
+
+    def __init__(self) -> None:
+        self._templates: Dict[str, _CompiledEmailTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> _CompiledEmailTemplate:
+        compiled = self._templates.get(name)
+        if compiled is None:
+            with self._lock:
+                compiled = self._templates.get(name)
+                if compiled is None:
+                    compiled = _CompiledEmailTemplate(name)
+                    self._templates[name] = compiled
+        return compiled
+
+    def render(self, name: str, context: dict) -> Tuple[str, str]:
+        """Return ``(html_body, text_body)`` for the given template."""
+        return self.get(name).render(context)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+email_templates = EmailTemplateCache()
+
 
 class EmailService:
     """Utility wrapper around Django's email utilities for common project messages."""
 
-    def __init__(self) -> None:
+    def __init__(self, templates: Optional[EmailTemplateCache] = None) -> None:
         self.from_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
+        self.templates = templates or email_templates
 
     def _send(
         self,
@@ -23,8 +98,7 @@ class EmailService:
         recipients: Sequence[str],
         fail_silently: bool = False,
     ) -> None:
-        html_body = render_to_string(template, context)
-        text_body = strip_tags(html_body)
+        html_body, text_body = self.templates.render(template, context)
 
         message = EmailMultiAlternatives(
             subject=subject,
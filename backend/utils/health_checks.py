@@ -1,11 +1,27 @@
 """
 Health check utilities for monitoring system status.
+
+Component checks never run on the request path. ``health_monitor`` keeps the
+latest snapshot of all checks in process memory; probes read it in O(1) and,
+when it is older than ``HEALTH_CHECK_CACHE_SECONDS``, trigger a single
+background refresh. A refresh runs every check concurrently, each bounded by
+its own timeout, so a hung dependency is reported as unhealthy instead of
+stalling the worker answering the probe.
 """
-from typing import Dict, Any, Optional
-from django.db import connection
-from django.core.cache import cache
-from django.conf import settings
+import logging
+import shutil
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from celery import current_app
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
 
 
 def check_database() -> Dict[str, Any]:
@@ -77,8 +93,8 @@ def check_celery() -> Dict[str, Any]:
         Dictionary with status
     """
     try:
-        from celery import current_app
-        inspect = current_app.control.inspect()
+        # Broadcast waits the full timeout when no worker answers, so keep it short
+        inspect = current_app.control.inspect(timeout=getattr(settings, 'HEALTH_CHECK_CELERY_TIMEOUT', 1.0))
         active_workers = inspect.active()
         
         if active_workers:
@@ -106,7 +122,6 @@ def check_disk_space() -> Dict[str, Any]:
         Dictionary with status and disk info
     """
     try:
-        import shutil
         total, used, free = shutil.disk_usage('/')
         
         free_gb = free / (1024 ** 3)
@@ -132,37 +147,215 @@ def check_disk_space() -> Dict[str, Any]:
         }
 
 
+def _overall_status(checks: Dict[str, Dict[str, Any]]) -> str:
+    statuses = [check.get('status') for check in checks.values()]
+    if 'unhealthy' in statuses or 'critical' in statuses:
+        return 'unhealthy'
+    if 'degraded' in statuses or 'warning' in statuses:
+        return 'degraded'
+    return 'healthy'
+
+
+@dataclass(frozen=True)
+class HealthCheck:
+    """A component check run by ``HealthMonitor``."""
+    name: str
+    func: Callable[[], Dict[str, Any]]
+    timeout: float
+    # Readiness requires critical checks to be healthy
+    critical: bool = False
+
+
+class HealthMonitor:
+    """
+    Background-refreshed snapshot of component health.
+
+    Usage:
+        monitor = HealthMonitor(lambda: [HealthCheck('database', check_database, timeout=2.0, critical=True)])
+        snapshot = monitor.get_snapshot()
+        snapshot['status'], snapshot['checks']['database']
+    """
+
+    def __init__(self, checks_factory: Callable[[], List[HealthCheck]]) -> None:
+        # Called on first refresh so settings are read at runtime, not import time
+        self._checks_factory = checks_factory
+        self._checks: Optional[List[HealthCheck]] = None
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._refreshing = False
+        # Checks still running from an earlier refresh are not started again
+        self._in_flight: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def checks(self) -> List[HealthCheck]:
+        if self._checks is None:
+            self._checks = list(self._checks_factory())
+        return self._checks
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The current snapshot, or None before the first refresh."""
+        return self._snapshot
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Room for one hung run of every check plus a fresh one
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(2, len(self.checks) * 2), thread_name_prefix='health-check'
+            )
+        return self._executor
+
+    @staticmethod
+    def _run(check: HealthCheck) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = check.func()
+        except Exception as e:
+            result = {'status': 'unhealthy', 'error': str(e)}
+        finally:
+            # Connections opened by pool threads would otherwise stay open until the thread exits
+            connections.close_all()
+        result.setdefault('duration_ms', round((time.perf_counter() - start) * 1000, 2))
+        return result
+
+    def run_checks(self) -> Dict[str, Any]:
+        """
+        Run every check concurrently and build a snapshot.
+
+        Returns:
+            Dictionary with overall status, timestamp and per-check results
+        """
+        executor = self._get_executor()
+        checks = self.checks
+        started = time.monotonic()
+        futures: Dict[str, Future] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        for check in checks:
+            previous = self._in_flight.get(check.name)
+            if previous is not None and not previous.done():
+                results[check.name] = {'status': 'unhealthy', 'error': 'Previous check has not finished'}
+                continue
+            futures[check.name] = self._in_flight[check.name] = executor.submit(self._run, check)
+
+        for check in checks:
+            future = futures.get(check.name)
+            if future is None:
+                continue
+            remaining = check.timeout - (time.monotonic() - started)
+            done, _ = wait([future], timeout=max(0.0, remaining))
+            if done:
+                results[check.name] = future.result()
+            else:
+                results[check.name] = {'status': 'unhealthy', 'error': f'Timed out after {check.timeout}s'}
+
+        ordered = {check.name: results[check.name] for check in checks}
+        return {
+            'status': _overall_status(ordered),
+            'timestamp': time.time(),
+            'duration_ms': round((time.monotonic() - started) * 1000, 2),
+            'checks': ordered,
+            'critical': [check.name for check in checks if check.critical],
+        }
+
+    def refresh(self) -> Dict[str, Any]:
+        """Run the checks now and store the result as the current snapshot."""
+        try:
+            snapshot = self.run_checks()
+            self._snapshot = snapshot
+            return snapshot
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        try:
+            threading.Thread(target=self._safe_refresh, name='health-refresh', daemon=True).start()
+        except Exception:
+            with self._lock:
+                self._refreshing = False
+            raise
+
+    def _safe_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception('Health snapshot refresh failed')
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Return the latest snapshot without running checks on the caller's thread.
+
+        Only the very first call of a process waits for a refresh (bounded by
+        the check timeouts). A snapshot older than ``HEALTH_CHECK_MAX_AGE``
+        means refreshes are not completing and is reported as unhealthy.
+
+        Returns:
+            Snapshot dictionary with an added ``age_seconds``
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                first = not self._refreshing
+                self._refreshing = True
+            if first:
+                snapshot = self.refresh()
+            else:
+                # Another thread is producing the first snapshot; don't stack up behind it
+                return {
+                    'status': 'unhealthy',
+                    'timestamp': time.time(),
+                    'age_seconds': 0.0,
+                    'checks': {},
+                    'critical': [],
+                    'message': 'Health checks are starting',
+                }
+
+        age = time.time() - snapshot['timestamp']
+        if age > getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5):
+            self._refresh_in_background()
+        snapshot = {**snapshot, 'age_seconds': round(age, 2)}
+        if age > getattr(settings, 'HEALTH_CHECK_MAX_AGE', 60):
+            snapshot['status'] = 'unhealthy'
+            snapshot['message'] = 'Health snapshot is stale'
+        return snapshot
+
+
+def _default_checks() -> List[HealthCheck]:
+    timeout = getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2.0)
+    checks = [
+        HealthCheck('database', check_database, timeout, critical=True),
+        HealthCheck('cache', check_cache, timeout),
+        HealthCheck('disk_space', check_disk_space, timeout),
+    ]
+    # Optional: Check Celery if configured
+    if getattr(settings, 'CELERY_BROKER_URL', None):
+        celery_timeout = getattr(settings, 'HEALTH_CHECK_CELERY_TIMEOUT', 1.0)
+        checks.append(HealthCheck('celery', check_celery, max(timeout, celery_timeout + 0.5)))
+    return checks
+
+
+health_monitor = HealthMonitor(_default_checks)
+
+
 def get_health_status() -> Dict[str, Any]:
     """
     Get overall health status of the system.
     
     Returns:
-        Dictionary with health status of all components
+        Dictionary with health status of all components (from the cached snapshot)
     """
-    checks = {
-        'database': check_database(),
-        'cache': check_cache(),
-        'disk_space': check_disk_space(),
-    }
-    
-    # Optional: Check Celery if configured
-    if hasattr(settings, 'CELERY_BROKER_URL') and settings.CELERY_BROKER_URL:
-        checks['celery'] = check_celery()
-    
-    # Determine overall status
-    statuses = [check.get('status') for check in checks.values()]
-    
-    if 'unhealthy' in statuses or 'critical' in statuses:
-        overall_status = 'unhealthy'
-    elif 'degraded' in statuses or 'warning' in statuses:
-        overall_status = 'degraded'
-    else:
-        overall_status = 'healthy'
-    
+    snapshot = health_monitor.get_snapshot()
     return {
-        'status': overall_status,
-        'timestamp': time.time(),
-        'checks': checks,
+        'status': snapshot['status'],
+        'timestamp': snapshot['timestamp'],
+        'age_seconds': snapshot['age_seconds'],
+        'checks': snapshot['checks'],
+        **({'message': snapshot['message']} if 'message' in snapshot else {}),
     }
 
 
@@ -171,25 +364,35 @@ def get_readiness_status() -> Dict[str, Any]:
     Get readiness status (can the service accept traffic?).
     
     Returns:
-        Dictionary with readiness status
+        Dictionary with readiness status (from the cached snapshot)
     """
-    checks = {
-        'database': check_database(),
-        'cache': check_cache(),
-    }
-    
-    # Service is ready if critical components are healthy
-    critical_checks = ['database']
-    critical_statuses = [checks[check].get('status') for check in critical_checks]
+    snapshot = health_monitor.get_snapshot()
+    checks = snapshot['checks']
     
-    if all(status == 'healthy' for status in critical_statuses):
-        return {
-            'status': 'ready',
-            'checks': checks,
-        }
-    else:
-        return {
-            'status': 'not_ready',
-            'checks': checks,
-        }
+    # Service is ready if critical components are healthy and the snapshot is fresh
+    ready = (
+        bool(snapshot['critical'])
+        and 'message' not in snapshot
+        and all(checks.get(name, {}).get('status') == 'healthy' for name in snapshot['critical'])
+    )
+    return {
+        'status': 'ready' if ready else 'not_ready',
+        'age_seconds': snapshot['age_seconds'],
+        'checks': {name: checks[name] for name in ('database', 'cache') if name in checks},
+    }
 
+
+def get_liveness_status() -> Dict[str, Any]:
+    """
+    Get liveness status (is the process able to serve requests?).
+
+    Runs no checks; reports how old the health snapshot is, if there is one.
+
+    Returns:
+        Dictionary with liveness status
+    """
+    snapshot = health_monitor.latest
+    return {
+        'status': 'alive',
+        'health_age_seconds': round(time.time() - snapshot['timestamp'], 2) if snapshot else None,
+    }
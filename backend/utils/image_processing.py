@@ -1,13 +1,306 @@
 """
 Image processing utilities for optimization and thumbnail generation.
+
+``ImageSource`` is the single-pass entry point: it reads the header once,
+enforces format, dimension, pixel-count and byte-size limits before any
+pixel data is decoded, then decodes once (letting libjpeg downscale in the
+DCT domain via ``Image.draft`` for JPEG sources) and renders every requested
+variant from that one decoded image.
 """
 import os
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Optional, Tuple
-from PIL import Image
+from typing import Dict, Iterable, Optional, Tuple
+from PIL import Image, ImageOps
+from django.conf import settings
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.core.files.base import ContentFile
-import sys
+
+# Output format -> file extension
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'AVIF': '.avif'}
+
+DEFAULT_ALLOWED_FORMATS = ['JPEG', 'PNG', 'WEBP', 'GIF']
+
+# Pillow's own decompression-bomb warning threshold
+DEFAULT_MAX_PIXELS = 89_478_485
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+_EXIF_ORIENTATION = 0x0112
+
+
+class ImageProcessingError(ValueError):
+    """Raised when an image is rejected or cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """An output rendered from an ``ImageSource``."""
+    name: str
+    # Bounding box (width, height); never upscaled
+    size: Tuple[int, int]
+    format: str = 'JPEG'
+    quality: int = 85
+    # Scale and center-crop to exactly ``size`` instead of fitting inside it
+    crop: bool = False
+
+
+@dataclass
+class ProcessedImage:
+    """An encoded variant."""
+    name: str
+    format: str
+    width: int
+    height: int
+    content: bytes
+
+    @property
+    def size(self) -> int:
+        """Encoded length in bytes."""
+        return len(self.content)
+
+    @property
+    def extension(self) -> str:
+        return EXTENSIONS[self.format]
+
+    @property
+    def content_type(self) -> str:
+        return f'image/{self.format.lower()}'
+
+    def to_file(self, base_name: str) -> InMemoryUploadedFile:
+        """Wrap the bytes as an uploaded file named ``<base_name><extension>``."""
+        return InMemoryUploadedFile(
+            BytesIO(self.content),
+            'ImageField',
+            f"{base_name}{self.extension}",
+            self.content_type,
+            self.size,
+            None
+        )
+
+
+def _save_image(img: Image.Image, output: BytesIO, format: str, quality: int) -> str:
+    """
+    Encode ``img`` into ``output``.
+
+    Returns:
+        Format actually written (WebP/AVIF fall back to JPEG if unsupported)
+    """
+    if format == 'WEBP':
+        try:
+            img.save(output, format='WEBP', quality=quality, method=6)
+            return 'WEBP'
+        except Exception:
+            output.seek(0)
+            output.truncate()
+    elif format == 'AVIF':
+        try:
+            img.save(output, format='AVIF', quality=quality)
+            return 'AVIF'
+        except Exception:
+            output.seek(0)
+            output.truncate()
+    elif format == 'PNG':
+        img.save(output, format='PNG', optimize=True)
+        return 'PNG'
+    if img.mode != 'RGB':
+        img = _flatten(img)
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    return 'JPEG'
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """Composite transparency onto white, for formats without alpha."""
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+    return background
+
+
+def _fit(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Dimensions of ``size`` scaled down to fit ``box`` (never up)."""
+    scale = min(box[0] / size[0], box[1] / size[1], 1)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def _cover(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Dimensions of ``size`` scaled down until it just covers ``box``."""
+    scale = min(max(box[0] / size[0], box[1] / size[1]), 1)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def _file_size(image_file) -> int:
+    image_file.seek(0, os.SEEK_END)
+    size = image_file.tell()
+    image_file.seek(0)
+    return size
+
+
+class ImageSource:
+    """
+    An uploaded image opened for single-pass processing.
+
+    Opening reads only the header. ``render`` decodes the pixels once, at the
+    lowest resolution that still serves the largest requested variant, and
+    encodes every variant from that decoded image.
+    """
+
+    def __init__(self, image_file, max_pixels: Optional[int] = None):
+        """
+        Args:
+            image_file: Django uploaded file or any binary file object
+            max_pixels: Pixel-count limit checked before decoding
+                (default: ``IMAGE_MAX_PIXELS`` setting)
+
+        Raises:
+            ImageProcessingError: If the file is not a readable image or exceeds ``max_pixels``
+        """
+        if max_pixels is None:
+            max_pixels = getattr(settings, 'IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS)
+        self.file_size = _file_size(image_file)
+        try:
+            self._image = Image.open(image_file)
+        except Exception as e:
+            # Includes DecompressionBombError for absurd headers
+            raise ImageProcessingError(f"Invalid image file: {str(e)}") from e
+
+        self._decoded: Optional[Image.Image] = None
+        self.format = self._image.format
+        width, height = self._image.size
+        # Header checks; a rejected source is released here as no caller holds it yet
+        try:
+            if width * height > max_pixels:
+                raise ImageProcessingError(
+                    f"Image has {width * height} pixels ({width}x{height}), exceeding the limit of {max_pixels}"
+                )
+            self._orientation = self._image.getexif().get(_EXIF_ORIENTATION, 1)
+        except ImageProcessingError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise ImageProcessingError(f"Invalid image file: {str(e)}") from e
+        # Dimensions as displayed, after EXIF rotation
+        self.size = (height, width) if self._orientation in _TRANSPOSED_ORIENTATIONS else (width, height)
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def validate(
+        self,
+        max_size: Optional[Tuple[int, int]] = None,
+        max_file_size: Optional[int] = None,
+        allowed_formats: Optional[list] = None
+    ) -> None:
+        """
+        Check the header against upload limits without decoding.
+
+        Raises:
+            ImageProcessingError: With a user-facing message for the first failed check
+        """
+        if allowed_formats is None:
+            allowed_formats = DEFAULT_ALLOWED_FORMATS
+        if self.format not in allowed_formats:
+            raise ImageProcessingError(
+                f"Image format {self.format} not allowed. Allowed formats: {', '.join(allowed_formats)}"
+            )
+        if max_size:
+            width, height = self.size
+            if width > max_size[0] or height > max_size[1]:
+                raise ImageProcessingError(
+                    f"Image dimensions ({width}x{height}) exceed maximum ({max_size[0]}x{max_size[1]})"
+                )
+        if max_file_size and self.file_size > max_file_size:
+            raise ImageProcessingError(
+                f"Image size ({self.file_size} bytes) exceeds maximum ({max_file_size} bytes)"
+            )
+
+    def _decode(self, variants: Iterable[ImageVariant]) -> Image.Image:
+        if self._decoded is not None:
+            return self._decoded
+
+        # Smallest displayed size from which every variant can still be rendered at full quality
+        needed = (1, 1)
+        for variant in variants:
+            target = _cover(self.size, variant.size) if variant.crop else _fit(self.size, variant.size)
+            needed = (max(needed[0], target[0]), max(needed[1], target[1]))
+        stored = (needed[1], needed[0]) if self._orientation in _TRANSPOSED_ORIENTATIONS else needed
+
+        img = self._image
+        try:
+            # JPEG only: decode at 1/2, 1/4 or 1/8 scale, never below ``needed``
+            img.draft(img.mode, stored)
+            img.load()
+        except Exception as e:
+            raise ImageProcessingError(f"Invalid image file: {str(e)}") from e
+
+        ImageOps.exif_transpose(img, in_place=True)
+        if img.mode in ('LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+        elif img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB')
+
+        # Other formats (and any scale left after draft): cheap integer box reduction
+        factor = min(img.width // needed[0], img.height // needed[1])
+        if factor >= 2:
+            img = img.reduce(factor)
+        self._decoded = img
+        return img
+
+    def render(self, variants: Iterable[ImageVariant]) -> Dict[str, ProcessedImage]:
+        """
+        Decode once and encode every variant.
+
+        Pass all variants in one call: the decode resolution is chosen for the
+        largest of them.
+
+        Args:
+            variants: Outputs to produce
+
+        Returns:
+            Encoded variants by name
+
+        Raises:
+            ImageProcessingError: If the pixel data cannot be decoded
+        """
+        variants = list(variants)
+        base = self._decode(variants)
+
+        results = {}
+        for variant in variants:
+            if variant.crop:
+                img = ImageOps.fit(base, _fit(variant.size, base.size), Image.Resampling.LANCZOS)
+            else:
+                target = _fit(base.size, variant.size)
+                img = base if target == base.size else base.resize(
+                    target, Image.Resampling.LANCZOS, reducing_gap=3.0
+                )
+            output = BytesIO()
+            format = _save_image(img, output, variant.format, variant.quality)
+            results[variant.name] = ProcessedImage(
+                name=variant.name,
+                format=format,
+                width=img.width,
+                height=img.height,
+                content=output.getvalue(),
+            )
+        return results
+
+    def close(self) -> None:
+        """Release the decoder; the caller's file stays open for it to reuse or close."""
+        # Detaches the file as PIL's own context manager does, without closing it
+        self._image.__exit__(None, None, None)
+        Image.Image.close(self._image)
+        self._decoded = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 def optimize_image(
@@ -18,183 +311,83 @@ def optimize_image(
 ) -> InMemoryUploadedFile:
     """
     Optimize an image by resizing and compressing.
-    
+
     Args:
         image_file: Django uploaded file
         max_size: Maximum dimensions (width, height)
         quality: JPEG quality (1-100)
-        format: Output format ('JPEG', 'PNG', 'WEBP')
-    
+        format: Output format ('JPEG', 'PNG', 'WEBP', 'AVIF')
+
     Returns:
         Optimized InMemoryUploadedFile
     """
-    # Open image
-    img = Image.open(image_file)
-    
-    # Convert RGBA to RGB for JPEG
-    if format == 'JPEG' and img.mode in ('RGBA', 'LA', 'P'):
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        if img.mode == 'P':
-            img = img.convert('RGBA')
-        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-        img = background
-    elif img.mode != 'RGB':
-        img = img.convert('RGB')
-    
-    # Resize if needed (maintain aspect ratio)
-    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-    
-    # Save to memory
-    output = BytesIO()
-    
-    # Use WebP if format is WEBP and PIL supports it
-    if format == 'WEBP':
-        try:
-            img.save(output, format='WEBP', quality=quality, method=6)
-        except Exception:
-            # Fallback to JPEG if WebP not supported
-            img.save(output, format='JPEG', quality=quality)
-            format = 'JPEG'
-    elif format == 'PNG':
-        img.save(output, format='PNG', optimize=True)
-    else:
-        img.save(output, format='JPEG', quality=quality, optimize=True)
-    
-    output.seek(0)
-    
-    # Create InMemoryUploadedFile
-    file_name = os.path.splitext(image_file.name)[0]
-    file_extension = '.webp' if format == 'WEBP' else ('.png' if format == 'PNG' else '.jpg')
-    
-    return InMemoryUploadedFile(
-        output,
-        'ImageField',
-        f"{file_name}{file_extension}",
-        f'image/{format.lower()}',
-        sys.getsizeof(output),
-        None
-    )
+    with ImageSource(image_file) as source:
+        result = source.render([ImageVariant('image', max_size, format, quality)])['image']
+    return result.to_file(os.path.splitext(image_file.name)[0])
 
 
 def create_thumbnail(
     image_file,
     size: Tuple[int, int] = (300, 300),
-    quality: int = 75
+    quality: int = 75,
+    format: str = 'JPEG'
 ) -> InMemoryUploadedFile:
     """
-    Create a thumbnail from an image.
-    
+    Create a center-cropped thumbnail from an image.
+
     Args:
         image_file: Django uploaded file
         size: Thumbnail size (width, height)
         quality: JPEG quality (1-100)
-    
+        format: Output format ('JPEG', 'WEBP', 'AVIF')
+
     Returns:
         Thumbnail as InMemoryUploadedFile
     """
-    # Open image
-    img = Image.open(image_file)
-    
-    # Convert RGBA to RGB for JPEG
-    if img.mode in ('RGBA', 'LA', 'P'):
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        if img.mode == 'P':
-            img = img.convert('RGBA')
-        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-        img = background
-    elif img.mode != 'RGB':
-        img = img.convert('RGB')
-    
-    # Create thumbnail (maintains aspect ratio, crops to fit)
-    img.thumbnail(size, Image.Resampling.LANCZOS)
-    
-    # Create a square thumbnail by cropping
-    width, height = img.size
-    if width != height:
-        # Crop to square from center
-        size_min = min(width, height)
-        left = (width - size_min) // 2
-        top = (height - size_min) // 2
-        img = img.crop((left, top, left + size_min, top + size_min))
-        img = img.resize(size, Image.Resampling.LANCZOS)
-    
-    # Save to memory
-    output = BytesIO()
-    img.save(output, format='JPEG', quality=quality, optimize=True)
-    output.seek(0)
-    
-    # Create InMemoryUploadedFile
-    file_name = os.path.splitext(image_file.name)[0]
-    
-    return InMemoryUploadedFile(
-        output,
-        'ImageField',
-        f"{file_name}_thumb.jpg",
-        'image/jpeg',
-        sys.getsizeof(output),
-        None
-    )
+    with ImageSource(image_file) as source:
+        result = source.render([ImageVariant('thumbnail', size, format, quality, crop=True)])['thumbnail']
+    return result.to_file(f"{os.path.splitext(image_file.name)[0]}_thumb")
 
 
 def get_image_dimensions(image_file) -> Tuple[int, int]:
     """
-    Get image dimensions.
-    
+    Get image dimensions as displayed (after EXIF rotation), without decoding.
+
     Args:
         image_file: Django uploaded file
-    
+
     Returns:
         Tuple of (width, height)
     """
-    img = Image.open(image_file)
-    return img.size
+    with ImageSource(image_file, max_pixels=float('inf')) as source:
+        return source.size
 
 
 def validate_image(
     image_file,
     max_size: Optional[Tuple[int, int]] = None,
     max_file_size: Optional[int] = None,
-    allowed_formats: Optional[list] = None
+    allowed_formats: Optional[list] = None,
+    max_pixels: Optional[int] = None
 ) -> Tuple[bool, Optional[str]]:
     """
-    Validate an image file.
-    
+    Validate an image file from its header, without decoding it.
+
     Args:
         image_file: Django uploaded file
         max_size: Maximum dimensions (width, height)
         max_file_size: Maximum file size in bytes
         allowed_formats: List of allowed formats (e.g., ['JPEG', 'PNG'])
-    
+        max_pixels: Maximum pixel count (default: ``IMAGE_MAX_PIXELS`` setting)
+
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if allowed_formats is None:
-        allowed_formats = ['JPEG', 'PNG', 'WEBP', 'GIF']
-    
     try:
-        img = Image.open(image_file)
-        format = img.format
-        
-        # Check format
-        if format not in allowed_formats:
-            return False, f"Image format {format} not allowed. Allowed formats: {', '.join(allowed_formats)}"
-        
-        # Check dimensions
-        if max_size:
-            width, height = img.size
-            if width > max_size[0] or height > max_size[1]:
-                return False, f"Image dimensions ({width}x{height}) exceed maximum ({max_size[0]}x{max_size[1]})"
-        
-        # Check file size
-        if max_file_size:
-            image_file.seek(0, os.SEEK_END)
-            file_size = image_file.tell()
-            image_file.seek(0)
-            if file_size > max_file_size:
-                return False, f"Image size ({file_size} bytes) exceeds maximum ({max_file_size} bytes)"
-        
-        return True, None
-    
-    except Exception as e:
-        return False, f"Invalid image file: {str(e)}"
-
+        with ImageSource(image_file, max_pixels=max_pixels) as source:
+            source.validate(max_size, max_file_size, allowed_formats)
+    except ImageProcessingError as e:
+        return False, str(e)
+    finally:
+        image_file.seek(0)
+    return True, None
@@ -0,0 +1,373 @@
+"""
+Off-request processing of uploaded images.
+
+Uploads are stored as received. Once the row is committed, a Celery task
+writes an optimized full-size copy and fixed-width renditions in each
+configured format next to the upload, and records them in the row's
+``<field>_renditions`` JSON field. Serializers read that field, so exposing
+rendition URLs costs no extra queries or storage calls.
+
+Rendition files are named after a hash of their content, so a URL never
+changes meaning and ``renditions/`` can be served with an immutable,
+far-future ``Cache-Control``.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from io import BytesIO
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from PIL import features
+
+from utils.image_processing import ImageSource, ImageVariant
+
+logger = logging.getLogger(__name__)
+
+# Model label -> image field processed by the pipeline
+MEDIA_IMAGE_FIELDS = {
+    'gallery.GalleryImage': 'image',
+    'car_sales.CarImage': 'image',
+    'vehicles.Vehicle': 'image',
+    'blog.BlogPost': 'featured_image',
+    'cms.TeamMember': 'image',
+}
+
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    """A rendition produced for every processed image."""
+    name: str
+    width: int
+    # Square center crop instead of a width-bounded resize
+    crop: bool = False
+
+
+RENDITION_SPECS = (
+    RenditionSpec('thumbnail', 300, crop=True),
+    RenditionSpec('small', 480),
+    RenditionSpec('medium', 768),
+    RenditionSpec('large', 1200),
+    RenditionSpec('xlarge', 1600),
+)
+
+# Optimized full-size copy, in JPEG so every client can display it
+ORIGINAL_MAX_SIZE = (2048, 2048)
+
+# Format name -> PIL feature that must be available to encode it
+_FORMAT_FEATURES = {'WEBP': 'webp', 'AVIF': 'avif'}
+
+
+def renditions_field(field_name: str) -> str:
+    return f"{field_name}_renditions"
+
+
+def get_rendition_formats() -> List[str]:
+    """Configured rendition formats this Pillow build can encode."""
+    formats = []
+    for name in getattr(settings, 'IMAGE_RENDITION_FORMATS', ['webp', 'avif']):
+        name = name.strip().upper()
+        feature = _FORMAT_FEATURES.get(name)
+        if feature and features.check(feature):
+            formats.append(name)
+    return formats or ['JPEG']
+
+
+def needs_processing(instance, field_name: str) -> bool:
+    """Whether the image currently on ``instance`` has not been processed (no query or storage access)."""
+    image = getattr(instance, field_name)
+    data = getattr(instance, renditions_field(field_name)) or {}
+    return bool(image) and data.get('source') != image.name
+
+
+def _render(data: bytes) -> List[Dict[str, Any]]:
+    """Encode the optimized original and every rendition from one decode; returns items with their bytes."""
+    quality = getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+    with ImageSource(BytesIO(data)) as source:
+        # Variant key -> rendition name
+        variants = {'original': ImageVariant('original', ORIGINAL_MAX_SIZE, 'JPEG', 85)}
+        names = {'original': 'original'}
+        for spec in RENDITION_SPECS:
+            if not spec.crop and spec.width >= source.width:
+                # Larger renditions would only repeat the source at a bigger byte size
+                continue
+            size = (spec.width, spec.width) if spec.crop else (spec.width, spec.width * 10)
+            for format in get_rendition_formats():
+                key = f'{spec.name}-{format}'
+                variants[key] = ImageVariant(key, size, format, quality, crop=spec.crop)
+                names[key] = spec.name
+        outputs = source.render(variants.values())
+
+    items = []
+    for key, output in outputs.items():
+        items.append({
+            'name': names[key],
+            'format': output.extension.lstrip('.'),
+            'width': output.width,
+            'height': output.height,
+            'size': output.size,
+            'content': output.content,
+        })
+    return items
+
+
+def _rendition_path(source_name: str, name: str, extension: str, content: bytes) -> str:
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    return os.path.join(directory, 'renditions', f"{stem}_{name}.{digest}.{extension}")
+
+
+def _save_file(storage, path: str, content: bytes) -> str:
+    # Content-addressed: an existing file at this path already holds these bytes
+    if storage.exists(path):
+        return path
+    try:
+        full_path = storage.path(path)
+    except NotImplementedError:
+        # Remote storages publish an object only once it is fully uploaded
+        return storage.save(path, ContentFile(content))
+
+    # Local files: write aside and rename, so readers never see a partial file
+    directory = os.path.dirname(full_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(temp_path, storage.file_permissions_mode or 0o644)
+        os.replace(temp_path, full_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
+
+
+def _delete_files(storage, items: List[Dict[str, Any]], keep=()) -> None:
+    for item in items:
+        if item.get('path') in keep:
+            continue
+        try:
+            storage.delete(item['path'])
+        except Exception:
+            logger.warning("Could not delete rendition %s", item.get('path'), exc_info=True)
+
+
+def processing_signature() -> str:
+    """Digest of every setting that shapes the output; results made under other settings are stale."""
+    parts = [
+        [(spec.name, spec.width, spec.crop) for spec in RENDITION_SPECS],
+        ORIGINAL_MAX_SIZE,
+        get_rendition_formats(),
+        getattr(settings, 'IMAGE_RENDITION_QUALITY', 80),
+    ]
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def is_current(data: Optional[Dict[str, Any]], source_name: str, source_hash: str, signature: str) -> bool:
+    """Whether ``data`` already holds the result for these source bytes under these settings."""
+    return bool(data) and (
+        data.get('source') == source_name
+        and data.get('source_hash') == source_hash
+        and data.get('signature') == signature
+        and data.get('status') in (STATUS_READY, STATUS_FAILED)
+    )
+
+
+def render_renditions(data: bytes, source_name: str, storage, signature: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Render one source and write its files (no database access).
+
+    Args:
+        data: Source image bytes
+        source_name: Storage name of the source
+        storage: Storage the renditions are written to
+        signature: ``processing_signature()``, if already computed
+
+    Returns:
+        Renditions data for the ``<field>_renditions`` field; status failed
+        if the image cannot be decoded
+    """
+    result = {
+        'source': source_name,
+        'source_hash': hashlib.sha256(data).hexdigest(),
+        'source_size': len(data),
+        'signature': signature or processing_signature(),
+        'processed_at': timezone.now().isoformat(),
+    }
+    try:
+        items = _render(data)
+    except Exception as exc:
+        logger.warning("Could not decode image %s", source_name, exc_info=True)
+        return {**result, 'status': STATUS_FAILED, 'error': str(exc), 'items': []}
+
+    for item in items:
+        content = item.pop('content')
+        path = _rendition_path(source_name, item['name'], item['format'], content)
+        item['path'] = _save_file(storage, path, content)
+    return {**result, 'status': STATUS_READY, 'items': items}
+
+
+def store_renditions(model, pk: Any, field_name: str, result: Dict[str, Any], previous: Dict[str, Any], storage) -> bool:
+    """
+    Record ``result`` if the row still holds the same source, then remove files it supersedes.
+
+    The conditional ``UPDATE`` sends no save signals. It does bump the row's
+    ``auto_now`` timestamps (e.g. ``updated_at``) so that ETag and
+    Last-Modified validators built from them change with the renditions.
+
+    Returns:
+        False (and the new files are removed) if the image was replaced meanwhile
+    """
+    values = {renditions_field(field_name): result}
+    now = timezone.now()
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            values[field.name] = now
+    updated = model._default_manager.filter(pk=pk, **{field_name: result['source']}).update(**values)
+    previous_items = (previous or {}).get('items') or []
+    paths = {item['path'] for item in result['items']}
+    if not updated:
+        # A newer upload replaced this one while we worked; its own task will run
+        _delete_files(storage, result['items'], keep={item.get('path') for item in previous_items})
+        return False
+    _delete_files(storage, previous_items, keep=paths)
+    return True
+
+
+def process_image(label: str, pk: Any, field_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Produce the optimized original and renditions for one row's image.
+
+    Args:
+        label: Model label, e.g. 'gallery.GalleryImage'
+        pk: Primary key of the row
+        field_name: Image field to process
+
+    Returns:
+        The stored renditions data, or None if the row or image is gone or
+        was replaced while processing
+    """
+    from config.signals import invalidate_model_cache
+
+    model = apps.get_model(label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None or not getattr(instance, field_name):
+        return None
+
+    image = getattr(instance, field_name)
+    previous = getattr(instance, renditions_field(field_name)) or {}
+    with image.open('rb') as source:
+        data = source.read()
+
+    signature = processing_signature()
+    if is_current(previous, image.name, hashlib.sha256(data).hexdigest(), signature):
+        return previous
+
+    result = render_renditions(data, image.name, image.storage, signature)
+    if not store_renditions(model, pk, field_name, result, previous, image.storage):
+        return None
+    invalidate_model_cache(model)
+    return result
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_image_renditions(self, label: str, pk: Any, field_name: str) -> Optional[Dict[str, Any]]:
+    """Celery entry point for ``process_image``."""
+    try:
+        result = process_image(label, pk, field_name)
+    except Exception as exc:
+        # Storage or database trouble; the image itself failing to decode is recorded, not retried
+        raise self.retry(exc=exc)
+    return {'status': result['status'], 'items': len(result['items'])} if result else None
+
+
+def enqueue_processing(label: str, pk: Any, field_name: str) -> None:
+    """Queue processing, or run it inline when ``IMAGE_PROCESSING_ASYNC`` is off."""
+    if not getattr(settings, 'IMAGE_PROCESSING_ASYNC', True):
+        process_image(label, pk, field_name)
+        return
+    try:
+        process_image_renditions.delay(label, pk, field_name)
+    except Exception:
+        # The upload stays usable as-is; reprocessing picks it up later
+        logger.warning("Could not queue image processing for %s %s", label, pk, exc_info=True)
+
+
+def rendition_urls(image, data: Optional[Dict[str, Any]], request=None) -> Optional[List[Dict[str, Any]]]:
+    """
+    List the renditions of an image for serializers.
+
+    Items are ordered by format, then width, so the entries of one format
+    map directly onto an ``<img srcset>`` / ``<source type>`` pair. The
+    square ``thumbnail`` has a different aspect ratio; clients should use it
+    on its own rather than in a ``srcset``.
+
+    Args:
+        image: The image field value the renditions belong to
+        data: Value of the matching ``<field>_renditions`` JSON field
+        request: Optional request used to build absolute URLs
+
+    Returns:
+        Dicts with name, url, width, height and format, or None while the
+        current image is not processed yet
+    """
+    if not image or not data or data.get('status') != STATUS_READY or data.get('source') != image.name:
+        return None
+
+    renditions = []
+    for item in sorted(data['items'], key=lambda item: (item['format'], item['width'])):
+        url = image.storage.url(item['path'])
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        renditions.append({
+            'name': item['name'],
+            'url': url,
+            'width': item['width'],
+            'height': item['height'],
+            'format': item['format'],
+        })
+    return renditions
+
+
+def _make_save_receiver(label: str, field_name: str):
+    def schedule(sender, instance, update_fields=None, **kwargs):
+        if update_fields and field_name not in update_fields:
+            return
+        if not needs_processing(instance, field_name):
+            return
+        pk = instance.pk
+        transaction.on_commit(lambda: enqueue_processing(label, pk, field_name))
+    return schedule
+
+
+def _make_delete_receiver(field_name: str):
+    def cleanup(sender, instance, **kwargs):
+        data = getattr(instance, renditions_field(field_name)) or {}
+        items = data.get('items') or []
+        if items:
+            storage = getattr(instance, field_name).storage
+            transaction.on_commit(lambda: _delete_files(storage, items))
+    return cleanup
+
+
+def connect_media_pipeline() -> None:
+    """Process images of registered models after they are saved; remove renditions on delete."""
+    for label, field_name in MEDIA_IMAGE_FIELDS.items():
+        post_save.connect(
+            _make_save_receiver(label, field_name), sender=label, weak=False, dispatch_uid=f'media-save:{label}'
+        )
+        post_delete.connect(
+            _make_delete_receiver(field_name), sender=label, weak=False, dispatch_uid=f'media-delete:{label}'
+        )
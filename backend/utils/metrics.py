@@ -1,13 +1,298 @@
 """
 Metrics collection utilities for monitoring.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from django.core.cache import cache
 from django.db import connection
 from django.conf import settings
+import bisect
+import logging
+import os
+import socket
+import threading
 import time
+import weakref
 from datetime import datetime, timedelta
 
+from utils.cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 75, 100, 150, 250, 500, 750, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram that can be merged across threads and workers."""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: 'Histogram') -> None:
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.count += other.count
+        self.sum += other.sum
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Estimate a percentile by linear interpolation inside the matching bucket.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Estimated value in milliseconds, or None when empty
+        """
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    # Overflow bucket has no upper bound; report its lower edge
+                    return float(lower)
+                upper = self.buckets[index]
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+        return float(self.buckets[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'counts': list(self.counts), 'count': self.count, 'sum': self.sum}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS) -> 'Histogram':
+        histogram = cls(buckets)
+        histogram.counts = list(data['counts'])
+        histogram.count = data['count']
+        histogram.sum = data['sum']
+        return histogram
+
+
+def _merge_into(target: Dict[Tuple[str, str, int], Histogram], source: Dict[Tuple[str, str, int], Histogram]) -> None:
+    for key, histogram in list(source.items()):
+        merged = target.get(key)
+        if merged is None:
+            merged = target[key] = Histogram()
+        merged.merge(histogram)
+
+
+class _ShardOwner:
+    """Holds one thread's shard in its thread-local; collected when the thread ends."""
+
+    __slots__ = ('shard', '__weakref__')
+
+    def __init__(self) -> None:
+        self.shard: Dict[Tuple[str, str, int], Histogram] = {}
+
+
+class MetricsRegistry:
+    """
+    Per-worker request metrics keyed by (route, method, status).
+
+    Each thread records into its own shard, so the request path takes no lock
+    and does no cache round trips. Snapshots merge the shards; ``flush`` pushes
+    this worker's snapshot to the shared cache at most every
+    ``METRICS_FLUSH_INTERVAL`` seconds so the metrics endpoint can aggregate
+    every worker. When a thread ends its shard is folded into a retired
+    aggregate, so servers that start a thread per request keep a bounded
+    number of shards.
+    """
+
+    WORKERS_KEY = 'metrics:workers'
+    WORKER_TTL = 60 * 10
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        # Keyed by id() of the shard; dicts compare by value, not identity
+        self._shards: Dict[int, Dict[Tuple[str, str, int], Histogram]] = {}
+        self._retired: Dict[Tuple[str, str, int], Histogram] = {}
+        # Reentrant: a finalizer may retire a shard while this thread holds the lock
+        self._shards_lock = threading.RLock()
+        self._last_flush = time.monotonic()
+
+    @property
+    def worker_id(self) -> str:
+        # Resolved per call so workers forked from a preloaded master get their own id
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _shard(self) -> Dict[Tuple[str, str, int], Histogram]:
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            owner = _ShardOwner()
+            self._local.owner = owner
+            # Only taken once per thread
+            with self._shards_lock:
+                self._shards[id(owner.shard)] = owner.shard
+            # The thread-local drops the owner when its thread ends
+            weakref.finalize(owner, self._retire, owner.shard)
+        return owner.shard
+
+    def _retire(self, shard: Dict[Tuple[str, str, int], Histogram]) -> None:
+        with self._shards_lock:
+            self._shards.pop(id(shard), None)
+            _merge_into(self._retired, shard)
+
+    def observe(self, route: str, method: str, status: int, duration_ms: float) -> None:
+        """Record one request."""
+        shard = self._shard()
+        key = (route, method, status)
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = Histogram()
+        histogram.observe(duration_ms)
+
+    def snapshot(self) -> Dict[Tuple[str, str, int], Histogram]:
+        """Merge all thread shards of this worker."""
+        merged: Dict[Tuple[str, str, int], Histogram] = {}
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            _merge_into(merged, self._retired)
+        for shard in shards:
+            _merge_into(merged, shard)
+        return merged
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards.values():
+                shard.clear()
+            self._retired.clear()
+
+    def maybe_flush(self) -> None:
+        """Flush to the shared cache if the flush interval has elapsed."""
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 15)
+        now = time.monotonic()
+        if now - self._last_flush < interval:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self) -> None:
+        """Publish this worker's cumulative snapshot to the shared cache."""
+        try:
+            payload = [
+                [route, method, status, histogram.to_dict()]
+                for (route, method, status), histogram in self.snapshot().items()
+            ]
+            cache.set(f"metrics:worker:{self.worker_id}", payload, self.WORKER_TTL)
+            workers = cache.get(self.WORKERS_KEY) or []
+            if self.worker_id not in workers:
+                # Best effort: a lost update is repaired on the next flush
+                cache.set(self.WORKERS_KEY, (workers + [self.worker_id])[-256:], None)
+        except Exception:
+            logger.debug('Metrics flush failed', exc_info=True)
+
+    def aggregate(self) -> Dict[Tuple[str, str, int], Histogram]:
+        """
+        Merge the snapshots of every live worker.
+
+        This worker contributes its in-memory state; others contribute their last flush.
+        """
+        merged = self.snapshot()
+        try:
+            workers = [worker for worker in (cache.get(self.WORKERS_KEY) or []) if worker != self.worker_id]
+            payloads = cache.get_many([f"metrics:worker:{worker}" for worker in workers])
+        except Exception:
+            return merged
+        for payload in payloads.values():
+            for route, method, status, data in payload:
+                key = (route, method, status)
+                target = merged.get(key)
+                if target is None:
+                    target = merged[key] = Histogram()
+                target.merge(Histogram.from_dict(data))
+        return merged
+
+
+metrics_registry = MetricsRegistry()
+
+
+def summarize(histograms: Dict[Tuple[str, str, int], Histogram]) -> Dict[str, Any]:
+    """
+    Summarize histograms into totals, latency percentiles and a per-route breakdown.
+
+    Args:
+        histograms: Histograms keyed by (route, method, status)
+
+    Returns:
+        Dictionary with overall and per-route request metrics
+    """
+    def _round(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+    def _stats(histogram: Histogram) -> Dict[str, Any]:
+        return {
+            'count': histogram.count,
+            'average_ms': _round(histogram.sum / histogram.count if histogram.count else None),
+            'p50_ms': _round(histogram.percentile(50)),
+            'p95_ms': _round(histogram.percentile(95)),
+            'p99_ms': _round(histogram.percentile(99)),
+        }
+
+    overall = Histogram()
+    routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for (route, method, status), histogram in histograms.items():
+        overall.merge(histogram)
+        entry = routes.setdefault((route, method), {'histogram': Histogram(), 'status': {}})
+        entry['histogram'].merge(histogram)
+        entry['status'][str(status)] = entry['status'].get(str(status), 0) + histogram.count
+
+    per_route = [
+        {'route': route, 'method': method, 'status': entry['status'], **_stats(entry['histogram'])}
+        for (route, method), entry in sorted(routes.items(), key=lambda item: -item[1]['histogram'].count)
+    ]
+    return {**_stats(overall), 'routes': per_route}
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(histograms: Dict[Tuple[str, str, int], Histogram]) -> str:
+    """
+    Render request histograms in the Prometheus text exposition format.
+
+    Args:
+        histograms: Histograms keyed by (route, method, status)
+
+    Returns:
+        Prometheus text format body
+    """
+    lines = [
+        '# HELP pchm_http_requests_total Total HTTP requests.',
+        '# TYPE pchm_http_requests_total counter',
+    ]
+    for (route, method, status), histogram in sorted(histograms.items()):
+        labels = f'route="{_escape_label(route)}",method="{method}",status="{status}"'
+        lines.append(f'pchm_http_requests_total{{{labels}}} {histogram.count}')
+
+    lines += [
+        '# HELP pchm_http_request_duration_seconds HTTP request latency.',
+        '# TYPE pchm_http_request_duration_seconds histogram',
+    ]
+    for (route, method, status), histogram in sorted(histograms.items()):
+        labels = f'route="{_escape_label(route)}",method="{method}",status="{status}"'
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+            cumulative += bucket_count
+            lines.append(f'pchm_http_request_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'pchm_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'pchm_http_request_duration_seconds_sum{{{labels}}} {histogram.sum / 1000:.6f}')
+        lines.append(f'pchm_http_request_duration_seconds_count{{{labels}}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
 
 class MetricsCollector:
     """Collector for application metrics."""
@@ -15,18 +300,14 @@ class MetricsCollector:
     @staticmethod
     def get_request_metrics() -> Dict[str, Any]:
         """
-        Get request-related metrics.
+        Get request-related metrics aggregated across workers.
         
         Returns:
-            Dictionary with request metrics
+            Dictionary with request counts and latency percentiles
         """
-        # This would typically be populated by middleware
-        # For now, return basic structure
-        return {
-            'total_requests': cache.get('metrics:total_requests', 0),
-            'requests_per_minute': cache.get('metrics:requests_per_minute', 0),
-            'average_response_time_ms': cache.get('metrics:avg_response_time', 0),
-        }
+        summary = summarize(metrics_registry.aggregate())
+        summary['total_requests'] = summary['count']
+        return summary
     
     @staticmethod
     def get_database_metrics() -> Dict[str, Any]:
@@ -63,6 +344,17 @@ class MetricsCollector:
                 'error': str(e),
             }
     
+    @staticmethod
+    def get_query_metrics() -> Dict[str, Any]:
+        """
+        Get per-route query counts, DB time, top SQL fingerprints and slow query samples.
+        
+        Returns:
+            Dictionary with query profiler metrics
+        """
+        from utils.query_logging import query_metrics
+        return query_metrics.summary()
+    
     @staticmethod
     def get_cache_metrics() -> Dict[str, Any]:
         """
@@ -83,6 +375,7 @@ class MetricsCollector:
             return {
                 'status': 'healthy',
                 'response_time_ms': round(response_time, 2),
+                'namespaces': cache_stats.snapshot(),
             }
         except Exception as e:
             return {
@@ -133,35 +426,11 @@ class MetricsCollector:
             'timestamp': datetime.now().isoformat(),
             'request': MetricsCollector.get_request_metrics(),
             'database': MetricsCollector.get_database_metrics(),
+            'queries': MetricsCollector.get_query_metrics(),
             'cache': MetricsCollector.get_cache_metrics(),
             'system': MetricsCollector.get_system_metrics(),
         }
     
-    @staticmethod
-    def increment_request_count():
-        """Increment request counter."""
-        try:
-            cache.incr('metrics:total_requests', 1)
-        except (ValueError, AttributeError, Exception) as e:
-            # Key doesn't exist yet, initialize it
-            # Also handle any other cache-related errors silently
-            try:
-                cache.set('metrics:total_requests', 1, timeout=None)
-            except Exception:
-                # If cache is completely unavailable, just skip metrics
-                pass
-    
-    @staticmethod
-    def record_response_time(response_time_ms: float):
-        """Record response time."""
-        # Update average response time
-        current_avg = cache.get('metrics:avg_response_time', 0)
-        total_requests = cache.get('metrics:total_requests', 1)
-        
-        # Simple moving average
-        new_avg = ((current_avg * (total_requests - 1)) + response_time_ms) / total_requests
-        cache.set('metrics:avg_response_time', new_avg, timeout=3600)
-
 
 class PerformanceMiddleware:
     """Middleware to track request performance metrics."""
@@ -170,19 +439,21 @@ class PerformanceMiddleware:
         self.get_response = get_response
     
     def __call__(self, request):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         response = self.get_response(request)
         
         # Calculate response time
-        response_time_ms = (time.time() - start_time) * 1000
+        response_time_ms = (time.perf_counter() - start_time) * 1000
         
         # Record metrics (only for API requests)
         # Wrap in try-except to prevent any metrics errors from affecting the request
         if request.path.startswith('/api/'):
             try:
-                MetricsCollector.increment_request_count()
-                MetricsCollector.record_response_time(response_time_ms)
+                metrics_registry.observe(
+                    self.get_route(request), request.method, response.status_code, response_time_ms
+                )
+                metrics_registry.maybe_flush()
             except Exception:
                 # Silently ignore metrics errors - don't let them affect the request
                 pass
@@ -191,4 +462,11 @@ class PerformanceMiddleware:
             response['X-Response-Time'] = f"{response_time_ms:.2f}ms"
         
         return response
-
+    
+    @staticmethod
+    def get_route(request) -> str:
+        """Low-cardinality route label (URL pattern name, never the raw path)."""
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route or 'unmatched'
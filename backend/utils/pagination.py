@@ -1,9 +1,149 @@
 """
 Enhanced pagination classes for optimized API responses.
 """
-from rest_framework.pagination import PageNumberPagination, CursorPagination
+import base64
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+    _positive_int,
+)
 from rest_framework.response import Response
-from typing import Any, Dict
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from utils.cache import _canonicalize, get_cache_key
+
+
+_DISPLAY_METHOD = re.compile(r'^get_(?P<field>\w+)_display$')
+
+
+def serializer_only_fields(serializer_class, model, extra_fields: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+    """
+    Derive the model columns a serializer reads, for use with ``QuerySet.only()``.
+
+    Declared fields are resolved through their ``source``: model fields and
+    forward relations are kept, ``get_<field>_display`` maps to ``<field>``,
+    reverse relations and many-to-many fields are skipped (they load through
+    their own queries). Fields whose source cannot be resolved, such as
+    ``SerializerMethodField`` or properties, may read any attribute, so no
+    restriction is returned unless ``extra_fields`` names what they need.
+
+    Args:
+        serializer_class: Serializer used to render the rows
+        model: Model of the queryset
+        extra_fields: Columns read by method fields or properties
+
+    Returns:
+        Sorted field names, or None when ``only()`` would not help or is unsafe
+    """
+    try:
+        fields = serializer_class().fields
+    except Exception:
+        return None
+
+    names = {model._meta.pk.name}
+    opaque = False
+    for field in fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            opaque = True
+            continue
+        root = field.source.split('.')[0]
+        match = _DISPLAY_METHOD.match(root)
+        if match:
+            root = match.group('field')
+        try:
+            model_field = model._meta.get_field(root)
+        except FieldDoesNotExist:
+            opaque = True
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            continue
+        if model_field.concrete:
+            names.add(model_field.name)
+        else:
+            opaque = True
+
+    if opaque:
+        if extra_fields is None:
+            return None
+        names.update(extra_fields)
+
+    if len(names) >= len(model._meta.concrete_fields):
+        return None
+    return sorted(names)
+
+
+def estimate_count(queryset) -> Optional[int]:
+    """
+    Estimate a queryset's row count from PostgreSQL statistics.
+
+    Unfiltered querysets use ``pg_class.reltuples``; filtered ones use the
+    planner's row estimate from ``EXPLAIN``. Neither scans the table.
+
+    Args:
+        queryset: QuerySet to estimate
+
+    Returns:
+        Estimated row count, or None if unavailable (other databases, table never analyzed)
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    queryset = queryset.order_by()
+    try:
+        with transaction.atomic(using=queryset.db):
+            if not queryset.query.where:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                        [queryset.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                estimate = row[0] if row else -1
+            else:
+                plan = json.loads(queryset.explain(format='json'))
+                estimate = plan[0]['Plan']['Plan Rows']
+    except (DatabaseError, EmptyResultSet, KeyError, IndexError, ValueError):
+        return None
+    return int(estimate) if estimate >= 0 else None
+
+
+def cached_count(queryset, timeout: Optional[int] = None) -> int:
+    """
+    Count a queryset, reusing the result for identical queries for a short time.
+
+    Args:
+        queryset: QuerySet to count
+        timeout: Seconds to keep the count (defaults to PAGINATION_COUNT_CACHE_TIMEOUT)
+
+    Returns:
+        Row count
+    """
+    queryset = queryset.order_by()
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    cache_key = get_cache_key('page_count', queryset.model._meta.label_lower, sql, params)
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        if timeout is None:
+            timeout = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+        cache.set(cache_key, count, timeout)
+    return count
 
 
 class CustomPagination(PageNumberPagination):
@@ -30,7 +170,7 @@ class CustomPagination(PageNumberPagination):
 class OptimizedPagination(PageNumberPagination):
     """
     Optimized pagination for large datasets.
-    Uses only() and defer() to limit queryset fields.
+    Limits queryset columns with only() based on the serializer's fields.
     """
     page_size = 20
     page_size_query_param = 'page_size'
@@ -38,25 +178,14 @@ class OptimizedPagination(PageNumberPagination):
     
     def paginate_queryset(self, queryset, request, view=None):
         """Paginate queryset with optimization."""
-        # For list views, optimize queryset
-        if hasattr(view, 'action') and view.action == 'list':
-            # Try to use only() if model has common fields
-            if hasattr(queryset.model, '_meta'):
-                # Get common fields that are usually needed
-                common_fields = ['id', 'created_at', 'updated_at']
-                # Add model-specific fields if available
-                if hasattr(queryset.model, 'name'):
-                    common_fields.append('name')
-                if hasattr(queryset.model, 'status'):
-                    common_fields.append('status')
-                
-                # Only fetch necessary fields
-                try:
-                    queryset = queryset.only(*common_fields)
-                except Exception:
-                    # If only() fails, continue with full queryset
-                    pass
-        
+        # For list views, load only the columns the serializer reads
+        if getattr(view, 'action', None) == 'list':
+            only_fields = serializer_only_fields(
+                view.get_serializer_class(), queryset.model, getattr(view, 'only_extra_fields', None)
+            )
+            if only_fields:
+                queryset = queryset.only(*only_fields)
+
         return super().paginate_queryset(queryset, request, view)
     
     def get_paginated_response(self, data: list) -> Response:
@@ -92,3 +221,214 @@ class CursorBasedPagination(CursorPagination):
         })
 
 
+def _seek_filter(ordering: Sequence[str], values: Sequence[Any], reverse: bool) -> Q:
+    # (a, b) after (x, y) in "-a, -b" order  ->  a < x OR (a = x AND b < y)
+    condition = Q()
+    equal: Dict[str, Any] = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != reverse
+        condition |= Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": value})
+        equal[name] = value
+    return condition
+
+
+def _invert(ordering: Sequence[str]) -> List[str]:
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination for large admin lists.
+
+    Pages are selected with a ``WHERE`` on the ordering columns, starting after
+    the last row of the previous page, instead of ``OFFSET``, so deep pages cost
+    the same as the first one when the ordering is backed by an index.
+    ``ordering`` must end in a unique, non-null column.
+
+    Counts follow ``count_mode`` (default: the PAGINATION_COUNT_MODE setting):
+
+    * ``approximate``: PostgreSQL planner statistics; small results
+      (below PAGINATION_EXACT_COUNT_THRESHOLD) fall back to ``cached``
+    * ``cached``: exact ``COUNT(*)`` reused for PAGINATION_COUNT_CACHE_TIMEOUT seconds
+    * ``exact``: ``COUNT(*)`` on every request
+    * ``none``: no count
+
+    List views load only the columns the serializer reads (see
+    ``serializer_only_fields``); method fields declare theirs in ``only_extra_fields``.
+    The legacy ``page`` parameter is still accepted and served with ``OFFSET``.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    ordering: Tuple[str, ...] = ('-created_at', '-id')
+    count_mode: Optional[str] = None
+    serializer_class = None
+    only_extra_fields: Optional[Tuple[str, ...]] = None
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        self.count, self.count_is_estimate = self.get_count(queryset)
+
+        only_fields = self.get_only_fields(queryset, view)
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = False
+        offset = 0
+        if cursor is not None:
+            values, reverse = cursor
+            if reverse:
+                queryset = queryset.order_by(*_invert(self.ordering))
+            queryset = queryset.filter(_seek_filter(self.ordering, values, reverse))
+        else:
+            offset = (self.get_page_number(request) - 1) * self.page_size
+
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None or offset > 0
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request) -> int:
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_page_number(self, request) -> int:
+        try:
+            return _positive_int(request.query_params.get(self.page_query_param, 1), strict=True)
+        except ValueError:
+            return 1
+
+    def get_count(self, queryset) -> Tuple[Optional[int], bool]:
+        mode = self.count_mode or getattr(settings, 'PAGINATION_COUNT_MODE', 'approximate')
+        if mode == 'none':
+            return None, False
+        if mode == 'approximate':
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= getattr(settings, 'PAGINATION_EXACT_COUNT_THRESHOLD', 10000):
+                return estimate, True
+            mode = 'cached'
+        if mode == 'cached':
+            return cached_count(queryset), False
+        return queryset.order_by().count(), False
+
+    def get_only_fields(self, queryset, view=None) -> Optional[List[str]]:
+        serializer_class = self.serializer_class
+        if serializer_class is None and hasattr(view, 'get_serializer_class'):
+            serializer_class = view.get_serializer_class()
+        if serializer_class is None:
+            return None
+
+        select_related = queryset.query.select_related
+        if select_related is True:
+            return None
+        extra_fields = getattr(view, 'only_extra_fields', self.only_extra_fields)
+        fields = serializer_only_fields(serializer_class, queryset.model, extra_fields)
+        if fields is None:
+            return None
+        # Relations followed by select_related() cannot be deferred
+        fields.extend(select_related or ())
+        fields.extend(field.lstrip('-') for field in self.ordering)
+        return sorted(set(fields))
+
+    def encode_cursor(self, row, reverse: bool = False) -> str:
+        payload: Dict[str, Any] = {'v': [_canonicalize(getattr(row, field.lstrip('-'))) for field in self.ordering]}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, model) -> Optional[Tuple[List[Any], bool]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get('r'))
+
+    def _cursor_link(self, row, reverse: bool) -> str:
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self._cursor_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data: list) -> Response:
+        """Return paginated response with cursor links and the (possibly estimated) count."""
+        return Response({
+            'count': self.count,
+            'count_is_estimate': self.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'object',
+            'required': ['count', 'results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'count_is_estimate': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> List[Dict[str, Any]]:
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
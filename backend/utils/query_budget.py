@@ -0,0 +1,128 @@
+"""
+Query budgets: keep list endpoints from issuing queries per row.
+
+A list endpoint is over budget when its query count grows with the number of
+rows it renders, the usual sign of a serializer reading a relation that was
+not prefetched or annotated. Tests check this directly: ``assert_constant_queries``
+renders the same endpoint at two page sizes and fails if the larger page
+issued more queries, and ``assert_max_queries`` caps the queries of a block.
+
+At runtime ``QueryProfilerMiddleware`` passes each API request's profile to
+``check_request_budget``. With ``QUERY_BUDGET_ENFORCE`` on, it raises
+``QueryBudgetExceeded`` when a list response ran one SELECT at least once per
+row, or when a GET to a view with a ``query_budget`` attribute issued more
+queries than that. Enforcement is off by default; it is meant for
+development and CI.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from utils.query_logging import QueryProfile, fingerprint_sql
+
+# Smallest page on which one statement per row is told apart from coincidence
+MIN_ROWS = 3
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block or request issued more queries than its budget."""
+
+
+def _describe(statements: Iterable[str], limit: int = 5) -> str:
+    """The most repeated statements, one per line, most frequent first."""
+    counts = Counter(fingerprint_sql(sql)[1] for sql in statements)
+    return '\n'.join(f'  {count}x {sql[:200]}' for sql, count in counts.most_common(limit))
+
+
+@contextmanager
+def assert_max_queries(limit: int, using: str = 'default'):
+    """
+    Fail if the block issues more than ``limit`` queries.
+
+    Usage:
+        with assert_max_queries(4):
+            client.get('/api/car-listings/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > limit:
+        statements = [query['sql'] for query in context.captured_queries]
+        raise QueryBudgetExceeded(f"{len(context)} queries, budget {limit}:\n{_describe(statements)}")
+
+
+def assert_constant_queries(fetch: Callable[[int], object], sizes=(2, 5), using: str = 'default') -> int:
+    """
+    Fail if rendering more rows issues more queries.
+
+    Args:
+        fetch: Renders a page of the given number of rows, e.g. a GET with ``page_size``
+        sizes: Page sizes to compare; the data must have at least the largest
+        using: Database alias
+
+    Returns:
+        Query count per page
+    """
+    captured: List[List[str]] = []
+    for size in sizes:
+        with CaptureQueriesContext(connections[using]) as context:
+            fetch(size)
+        captured.append([query['sql'] for query in context.captured_queries])
+
+    smallest, largest = captured[0], captured[-1]
+    if len(largest) > len(smallest):
+        growth = Counter(fingerprint_sql(sql)[1] for sql in largest)
+        growth.subtract(fingerprint_sql(sql)[1] for sql in smallest)
+        grown = [sql for sql, count in growth.items() for _ in range(max(count, 0))]
+        raise QueryBudgetExceeded(
+            f"Queries scale with page size: {len(smallest)} for {sizes[0]} rows, "
+            f"{len(largest)} for {sizes[-1]} rows. Added per row:\n{_describe(grown)}"
+        )
+    return len(smallest)
+
+
+def response_rows(response) -> Optional[int]:
+    """Number of rows in a DRF list response (paginated or not), else None."""
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict):
+        data = data.get('results')
+    return len(data) if isinstance(data, list) else None
+
+
+def per_row_statements(profile: QueryProfile, rows: int) -> List[str]:
+    """SELECTs the profile ran at least once per row."""
+    if rows < MIN_ROWS:
+        return []
+    return [
+        sql for sql, count, _ in profile.fingerprints.values()
+        if count >= rows and sql.lstrip().upper().startswith('SELECT')
+    ]
+
+
+def check_request_budget(request, response, profile: QueryProfile) -> None:
+    """
+    Raise ``QueryBudgetExceeded`` for an over-budget API request when ``QUERY_BUDGET_ENFORCE`` is on.
+
+    Args:
+        request: The request
+        response: Its response; DRF responses identify the view and rows
+        profile: Queries the request issued
+    """
+    if not getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+        return
+    view = (getattr(response, 'renderer_context', None) or {}).get('view')
+    budget = getattr(view, 'query_budget', None) if request.method in ('GET', 'HEAD') else None
+    if budget is not None and profile.count > budget:
+        raise QueryBudgetExceeded(
+            f"{request.method} {request.path} issued {profile.count} queries, budget {budget}"
+        )
+    rows = response_rows(response)
+    repeated = per_row_statements(profile, rows) if rows else []
+    if repeated:
+        lines = '\n'.join(f'  {sql[:200]}' for sql in repeated)
+        raise QueryBudgetExceeded(
+            f"{request.method} {request.path} ran a query per row ({rows} rows):\n{lines}"
+        )
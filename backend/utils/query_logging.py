@@ -1,74 +1,423 @@
 """
-Database query logging utilities for development and debugging.
+Always-on database query profiling.
+
+``QueryProfilerMiddleware`` installs a ``connection.execute_wrapper`` for
+each API request. The wrapper counts queries and DB time and groups them by
+normalized SQL fingerprint, all in request-local state. Once per request
+the totals are merged into the per-worker ``query_metrics`` registry:
+per-route query count and DB time histograms, top fingerprints, and
+samples of slow queries with the code location that issued them. Responses
+carry ``X-DB-Queries`` and ``Server-Timing: db`` headers. Unlike
+``connection.queries`` this does not need ``DEBUG``.
 """
+import hashlib
 import logging
+import os
+import re
+import threading
 import time
-from typing import Any, Dict, List
+import traceback
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
 from django.conf import settings
-from django.db import connection
-from django.utils.deprecation import MiddlewareMixin
+from django.core.cache import cache
+from django.db import connection, connections
+
+from utils.metrics import Histogram, PerformanceMiddleware, _escape_label, metrics_registry
 
 logger = logging.getLogger('django.db.backends')
 
+# Queries-per-request histogram bucket upper bounds (last bucket is +Inf)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_sql(sql: str) -> Tuple[str, str]:
+    """
+    Normalize SQL so queries differing only in literal values group together.
+
+    Literals and placeholders become ``?`` and ``IN (?, ?, ...)`` lists collapse
+    to ``(...)``.
+
+    Args:
+        sql: SQL as passed to the cursor
+
+    Returns:
+        Tuple of (fingerprint id, normalized SQL)
+    """
+    normalized = _STRING_LITERAL.sub('?', sql)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _PLACEHOLDER_LIST.sub('(...)', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16], normalized
+
+
+def _query_origin() -> str:
+    """Innermost stack frame in project code, i.e. the line that issued the query."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = frame.filename
+        if not filename.startswith(base_dir) or filename == __file__ or 'site-packages' in filename:
+            continue
+        return f"{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class QueryProfile:
+    """Query totals for one request."""
+
+    __slots__ = ('count', 'time_ms', 'fingerprints')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time_ms = 0.0
+        # fingerprint -> [normalized sql, count, total ms]
+        self.fingerprints: Dict[str, List[Any]] = {}
+
+    def record(self, sql: str, duration_ms: float) -> Tuple[str, str]:
+        self.count += 1
+        self.time_ms += duration_ms
+        fingerprint, normalized = fingerprint_sql(sql)
+        entry = self.fingerprints.get(fingerprint)
+        if entry is None:
+            self.fingerprints[fingerprint] = [normalized, 1, duration_ms]
+        else:
+            entry[1] += 1
+            entry[2] += duration_ms
+        return fingerprint, normalized
+
+    def repeated(self, threshold: int) -> List[Tuple[str, str, int]]:
+        """Fingerprints executed at least ``threshold`` times (likely N+1 loops)."""
+        return [
+            (fingerprint, sql, count)
+            for fingerprint, (sql, count, _) in self.fingerprints.items()
+            if count >= threshold
+        ]
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar('query_profile', default=None)
+
+
+def get_current_profile() -> Optional[QueryProfile]:
+    """Return the profile of the request being handled, if any."""
+    return _current_profile.get()
+
+
+class QueryMetrics:
+    """
+    Per-worker query statistics, merged once per request.
+
+    Snapshots are flushed to the shared cache next to the request metrics of
+    ``metrics_registry`` so the metrics endpoint can aggregate every worker.
+    """
+
+    MAX_FINGERPRINTS = 500
+    MAX_SLOW_SAMPLES = 50
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (route, method) -> [queries histogram, db ms histogram, requests with repeated queries]
+        self._routes: Dict[Tuple[str, str], List[Any]] = {}
+        # fingerprint -> [normalized sql, count, total ms, max ms]
+        self._fingerprints: Dict[str, List[Any]] = {}
+        self._slow: deque = deque(maxlen=self.MAX_SLOW_SAMPLES)
+        self._last_flush = time.monotonic()
+
+    def observe(self, route: str, method: str, profile: QueryProfile, repeated: bool = False) -> None:
+        """Merge one request's profile."""
+        with self._lock:
+            entry = self._routes.get((route, method))
+            if entry is None:
+                entry = self._routes[(route, method)] = [Histogram(QUERY_COUNT_BUCKETS), Histogram(), 0]
+            entry[0].observe(profile.count)
+            entry[1].observe(profile.time_ms)
+            entry[2] += int(repeated)
+
+            for fingerprint, (sql, count, total_ms) in profile.fingerprints.items():
+                stats = self._fingerprints.get(fingerprint)
+                if stats is None:
+                    self._fingerprints[fingerprint] = [sql, count, total_ms, total_ms / count]
+                else:
+                    stats[1] += count
+                    stats[2] += total_ms
+                    stats[3] = max(stats[3], total_ms / count)
+            if len(self._fingerprints) > self.MAX_FINGERPRINTS:
+                # Keep the half that cost the most DB time
+                ranked = sorted(self._fingerprints.items(), key=lambda item: -item[1][2])
+                self._fingerprints = dict(ranked[:self.MAX_FINGERPRINTS // 2])
+
+    def record_slow(self, route: str, fingerprint: str, sql: str, duration_ms: float, origin: str) -> None:
+        self._slow.append({
+            'route': route,
+            'fingerprint': fingerprint,
+            'sql': sql,
+            'duration_ms': round(duration_ms, 2),
+            'origin': origin,
+            'at': time.time(),
+        })
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._fingerprints.clear()
+            self._slow.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This worker's statistics in a cache-serializable form."""
+        with self._lock:
+            return {
+                'routes': [
+                    [route, method, queries.to_dict(), db_ms.to_dict(), repeated]
+                    for (route, method), (queries, db_ms, repeated) in self._routes.items()
+                ],
+                'fingerprints': {key: list(value) for key, value in self._fingerprints.items()},
+                'slow': list(self._slow),
+            }
+
+    def maybe_flush(self) -> None:
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 15)
+        now = time.monotonic()
+        if now - self._last_flush < interval:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self) -> None:
+        try:
+            cache.set(
+                f"metrics:queries:{metrics_registry.worker_id}", self.snapshot(), metrics_registry.WORKER_TTL
+            )
+        except Exception:
+            logger.debug('Query metrics flush failed', exc_info=True)
+
+    def aggregate(self) -> List[Dict[str, Any]]:
+        """Snapshots of this worker (live) and every other worker (last flush)."""
+        snapshots = [self.snapshot()]
+        try:
+            own = metrics_registry.worker_id
+            workers = [worker for worker in (cache.get(metrics_registry.WORKERS_KEY) or []) if worker != own]
+            snapshots.extend(cache.get_many([f"metrics:queries:{worker}" for worker in workers]).values())
+        except Exception:
+            pass
+        return snapshots
+
+    def merged(self) -> Tuple[Dict[Tuple[str, str], List[Any]], Dict[str, List[Any]], List[Dict[str, Any]]]:
+        """Merge worker snapshots into (routes, fingerprints, slow samples)."""
+        routes: Dict[Tuple[str, str], List[Any]] = {}
+        fingerprints: Dict[str, List[Any]] = {}
+        slow: List[Dict[str, Any]] = []
+        for snapshot in self.aggregate():
+            for route, method, queries, db_ms, repeated in snapshot['routes']:
+                entry = routes.get((route, method))
+                if entry is None:
+                    entry = routes[(route, method)] = [Histogram(QUERY_COUNT_BUCKETS), Histogram(), 0]
+                entry[0].merge(Histogram.from_dict(queries, QUERY_COUNT_BUCKETS))
+                entry[1].merge(Histogram.from_dict(db_ms))
+                entry[2] += repeated
+            for fingerprint, (sql, count, total_ms, max_ms) in snapshot['fingerprints'].items():
+                stats = fingerprints.get(fingerprint)
+                if stats is None:
+                    fingerprints[fingerprint] = [sql, count, total_ms, max_ms]
+                else:
+                    stats[1] += count
+                    stats[2] += total_ms
+                    stats[3] = max(stats[3], max_ms)
+            slow.extend(snapshot['slow'])
+        return routes, fingerprints, slow
 
-class QueryLoggingMiddleware(MiddlewareMixin):
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Summarize query statistics for the metrics endpoint.
+
+        Args:
+            limit: Number of fingerprints and slow samples to include
+
+        Returns:
+            Per-route query counts and DB time, top fingerprints by total time, slowest samples
+        """
+        def _round(value: Optional[float]) -> Optional[float]:
+            return round(value, 2) if value is not None else None
+
+        routes, fingerprints, slow = self.merged()
+        per_route = [
+            {
+                'route': route,
+                'method': method,
+                'requests': queries.count,
+                'average_queries': _round(queries.sum / queries.count if queries.count else None),
+                'p95_queries': _round(queries.percentile(95)),
+                'average_db_ms': _round(db_ms.sum / db_ms.count if db_ms.count else None),
+                'p95_db_ms': _round(db_ms.percentile(95)),
+                'repeated_query_requests': repeated,
+            }
+            for (route, method), (queries, db_ms, repeated) in sorted(
+                routes.items(), key=lambda item: -item[1][1].sum
+            )
+        ]
+        top = sorted(fingerprints.items(), key=lambda item: -item[1][2])[:limit]
+        return {
+            'routes': per_route,
+            'fingerprints': [
+                {
+                    'fingerprint': fingerprint,
+                    'sql': sql,
+                    'count': count,
+                    'total_ms': _round(total_ms),
+                    'average_ms': _round(total_ms / count),
+                    'max_ms': _round(max_ms),
+                }
+                for fingerprint, (sql, count, total_ms, max_ms) in top
+            ],
+            'slow_queries': sorted(slow, key=lambda sample: -sample['duration_ms'])[:limit],
+        }
+
+
+query_metrics = QueryMetrics()
+
+
+def render_query_prometheus(routes: Dict[Tuple[str, str], List[Any]]) -> str:
     """
-    Middleware to log database queries in development.
-    Only active when DEBUG=True.
+    Render per-route query histograms in the Prometheus text exposition format.
+
+    Args:
+        routes: Merged route statistics from ``QueryMetrics.merged``
+
+    Returns:
+        Prometheus text format body
+    """
+    lines = []
+    series = (
+        ('pchm_db_queries_per_request', 'Database queries per request.', 0, 1),
+        ('pchm_db_time_seconds', 'Database time per request.', 1, 1000),
+    )
+    for name, help_text, index, scale in series:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (route, method), entry in sorted(routes.items()):
+            histogram = entry[index]
+            labels = f'route="{_escape_label(route)}",method="{method}"'
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{labels},le="{bound / scale:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum / scale:g}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryProfiler:
+    """``execute_wrapper`` recording every query into the current request's profile."""
+
+    def __init__(self, request) -> None:
+        self.request = request
+        self.slow_ms = getattr(settings, 'QUERY_PROFILER_SLOW_MS', 100)
+
+    def __call__(self, execute, sql, params, many, context):
+        profile = _current_profile.get()
+        if profile is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            fingerprint, normalized = profile.record(sql, duration_ms)
+            if duration_ms >= self.slow_ms:
+                route = PerformanceMiddleware.get_route(self.request)
+                query_metrics.record_slow(route, fingerprint, normalized, duration_ms, _query_origin())
+
+
+class QueryProfilerMiddleware:
     """
-    
-    def process_request(self, request):
-        """Reset query count at start of request."""
-        if settings.DEBUG:
-            connection.queries_log.clear()
-            self.start_time = time.time()
-        return None
-    
-    def process_response(self, request, response):
-        """Log queries at end of request."""
-        if settings.DEBUG and hasattr(connection, 'queries'):
-            queries = connection.queries
-            query_count = len(queries)
-            total_time = sum(float(q['time']) for q in queries)
-            
-            # Only log if there are queries or if it's an API request
-            if query_count > 0 and request.path.startswith('/api/'):
-                request_time = time.time() - getattr(self, 'start_time', 0)
-                
-                # Log warning if too many queries (N+1 problem indicator)
-                if query_count > 20:
-                    logger.warning(
-                        f"High query count ({query_count}) for {request.path}",
-                        extra={
-                            'query_count': query_count,
-                            'total_query_time': total_time,
-                            'request_time': request_time,
-                            'path': request.path,
-                            'method': request.method,
-                        }
-                    )
-                elif query_count > 10:
-                    logger.info(
-                        f"Query count ({query_count}) for {request.path}",
-                        extra={
-                            'query_count': query_count,
-                            'total_query_time': total_time,
-                            'request_time': request_time,
-                            'path': request.path,
-                            'method': request.method,
-                        }
-                    )
-        
+    Profile the database queries of every API request.
+
+    Adds ``X-DB-Queries`` and ``Server-Timing: db;dur=...`` headers, records
+    per-route statistics in ``query_metrics`` and logs requests with high
+    query counts or repeated queries (likely N+1 loops). With
+    ``QUERY_BUDGET_ENFORCE`` on, over-budget requests raise (see
+    ``utils.query_budget``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', True) or not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+        profiler = QueryProfiler(request)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(profiler))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        try:
+            self.record(request, response, profile)
+        except Exception:
+            logger.debug('Query profiling failed', exc_info=True)
+        # Outside the guard above: an enforced budget is meant to fail the request
+        from utils.query_budget import check_request_budget
+        check_request_budget(request, response, profile)
         return response
 
+    def record(self, request, response, profile: QueryProfile) -> None:
+        route = PerformanceMiddleware.get_route(request)
+        repeated = profile.repeated(getattr(settings, 'QUERY_PROFILER_REPEAT_THRESHOLD', 10))
+        query_metrics.observe(route, request.method, profile, repeated=bool(repeated))
+        query_metrics.maybe_flush()
+
+        response['X-DB-Queries'] = str(profile.count)
+        timing = f'db;dur={profile.time_ms:.2f};desc="{profile.count} queries"'
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        for fingerprint, sql, count in repeated:
+            logger.warning(
+                f"Query repeated {count} times in {route} (possible N+1): {sql[:200]}",
+                extra={'route': route, 'fingerprint': fingerprint, 'count': count, 'path': request.path},
+            )
+        if profile.count > getattr(settings, 'QUERY_PROFILER_WARN_COUNT', 20):
+            logger.warning(
+                f"High query count ({profile.count}) for {request.path}",
+                extra={
+                    'query_count': profile.count,
+                    'total_query_time': profile.time_ms / 1000,
+                    'path': request.path,
+                    'method': request.method,
+                },
+            )
+
+
+# Backwards-compatible name; the profiler works without DEBUG
+QueryLoggingMiddleware = QueryProfilerMiddleware
+
 
 def get_query_count() -> int:
     """
-    Get the number of queries executed so far.
-    
+    Get the number of queries executed so far in the current request.
+
     Returns:
         Number of queries
     """
+    profile = _current_profile.get()
+    if profile is not None:
+        return profile.count
     if settings.DEBUG and hasattr(connection, 'queries'):
         return len(connection.queries)
     return 0
@@ -77,21 +426,21 @@ def get_query_count() -> int:
 def get_slow_queries(threshold: float = 0.1) -> List[Dict[str, Any]]:
     """
     Get queries that took longer than threshold.
-    
+
     Args:
         threshold: Time threshold in seconds
-    
+
     Returns:
         List of slow queries
     """
     if not settings.DEBUG or not hasattr(connection, 'queries'):
         return []
-    
+
     slow_queries = [
         q for q in connection.queries
         if float(q['time']) > threshold
     ]
-    
+
     return slow_queries
 
 
@@ -102,15 +451,15 @@ def log_queries_summary():
     """
     if not settings.DEBUG or not hasattr(connection, 'queries'):
         return
-    
+
     queries = connection.queries
     if not queries:
         return
-    
+
     query_count = len(queries)
     total_time = sum(float(q['time']) for q in queries)
     slow_queries = get_slow_queries(0.1)
-    
+
     logger.info(
         f"Query Summary: {query_count} queries, {total_time:.3f}s total",
         extra={
@@ -120,10 +469,9 @@ def log_queries_summary():
             'queries': queries[:10],  # First 10 queries
         }
     )
-    
+
     if slow_queries:
         logger.warning(
             f"Slow queries detected: {len(slow_queries)}",
             extra={'slow_queries': slow_queries}
         )
-
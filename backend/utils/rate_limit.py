@@ -0,0 +1,192 @@
+"""
+Atomic sliding-window rate limiting shared by throttles and form spam checks.
+
+Uses the sliding-window counter algorithm: one counter per fixed window, with
+the previous window's count weighted by how much of it still overlaps the
+sliding window. Each check is O(1) in time and memory per key.
+
+With the Redis cache backend, counters live in Redis and every check is one
+Lua script call, so concurrent workers can never both pass the last slot.
+Without Redis, or if Redis is unreachable, counters are kept in process
+memory under a lock (limits are then enforced per worker).
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS: current window, previous window
+# ARGV: limit, weight of previous window, cost, expiry in seconds
+SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[3])
+if previous * tonumber(ARGV[2]) + current + cost > limit then
+    return {0, current, previous}
+end
+current = redis.call('INCRBY', KEYS[1], cost)
+if current == cost then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return {1, current, previous}
+"""
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a DRF-style rate string.
+
+    Args:
+        rate: Rate such as '10/minute' or '3/hour'
+
+    Returns:
+        Tuple of (allowed requests, window in seconds)
+    """
+    num, period = rate.split('/')
+    return int(num), RATE_PERIODS[period.strip()[0]]
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+class LocalRateLimitBackend:
+    """In-process sliding-window counters, atomic under a lock."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # key -> (window index, current count, previous count)
+        self._windows: Dict[str, Tuple[int, int, int]] = {}
+
+    def hit(self, key: str, limit: int, window: int, cost: int, now: float) -> Tuple[bool, int, int]:
+        index = int(now // window)
+        weight = 1 - (now % window) / window
+        with self._lock:
+            stored_index, current, previous = self._windows.get(key, (index, 0, 0))
+            if stored_index == index - 1:
+                current, previous = 0, current
+            elif stored_index != index:
+                current, previous = 0, 0
+
+            allowed = previous * weight + current + cost <= limit
+            if allowed:
+                current += cost
+            self._windows[key] = (index, current, previous)
+
+            if len(self._windows) > self.maxsize:
+                # Keys idle for two windows carry no state worth keeping
+                self._windows = {k: v for k, v in self._windows.items() if v[0] >= index - 1}
+        return allowed, current, previous
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+class RedisRateLimitBackend:
+    """Sliding-window counters in Redis, checked and incremented by one Lua script."""
+
+    def __init__(self, client) -> None:
+        self._script = client.register_script(SLIDING_WINDOW_LUA)
+
+    def hit(self, key: str, limit: int, window: int, cost: int, now: float) -> Tuple[bool, int, int]:
+        index = int(now // window)
+        weight = 1 - (now % window) / window
+        keys = [cache.make_key(f"{key}:{index}"), cache.make_key(f"{key}:{index - 1}")]
+        allowed, current, previous = self._script(keys=keys, args=[limit, weight, cost, window * 2])
+        return bool(allowed), int(current), int(previous)
+
+
+local_backend = LocalRateLimitBackend()
+_redis_backend: Optional[RedisRateLimitBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the Redis backend when the default cache is django-redis, else the in-process one."""
+    global _redis_backend
+    if _redis_backend is None and type(cache).__module__.startswith('django_redis'):
+        with _backend_lock:
+            if _redis_backend is None:
+                from django_redis import get_redis_connection
+                _redis_backend = RedisRateLimitBackend(get_redis_connection('default'))
+    return _redis_backend or local_backend
+
+
+def _retry_after(limit: int, window: int, cost: int, now: float, current: int, previous: int) -> float:
+    """Seconds until ``cost`` more hits fit, assuming no other traffic meanwhile."""
+    elapsed = (now % window) / window
+    if current + cost <= limit:
+        # Fits once enough of the previous window has slid out
+        needed = 1 - (limit - current - cost) / previous if previous else elapsed
+        return max(0.0, (needed - elapsed) * window)
+    # Wait for the next window, where this window's count becomes the weighted one
+    needed = 1 - (limit - cost) / current if current else 0.0
+    return (1 - elapsed + max(0.0, needed)) * window
+
+
+class RateLimiter:
+    """
+    Allow at most ``limit`` hits per ``window`` seconds per key.
+
+    Usage:
+        limiter = RateLimiter(3, 3600)
+        if not limiter.hit(f"inquiry:{ip}").allowed:
+            ...
+    """
+
+    def __init__(self, limit: int, window: int, backend=None) -> None:
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+
+    @classmethod
+    def from_rate(cls, rate: str, backend=None) -> 'RateLimiter':
+        limit, window = parse_rate(rate)
+        return cls(limit, window, backend)
+
+    def hit(self, key: str, cost: int = 1) -> RateLimitResult:
+        """
+        Record a hit for ``key`` if it is within the limit.
+
+        Args:
+            key: Identity being limited, e.g. 'inquiry:1.2.3.4'
+            cost: Number of slots the hit consumes
+
+        Returns:
+            RateLimitResult; denied hits are not counted
+        """
+        now = time.time()
+        key = f"ratelimit:{key}"
+        backend = self.backend or get_backend()
+        try:
+            allowed, current, previous = backend.hit(key, self.limit, self.window, cost, now)
+        except Exception as exc:
+            if backend is local_backend:
+                raise
+            logger.warning("Rate limit backend unavailable, limiting in process: %s", exc)
+            allowed, current, previous = local_backend.hit(key, self.limit, self.window, cost, now)
+
+        weight = 1 - (now % self.window) / self.window
+        used = previous * weight + current
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=max(0, int(self.limit - used)),
+            retry_after=0.0 if allowed else _retry_after(self.limit, self.window, cost, now, current, previous),
+        )
@@ -1,10 +1,9 @@
-from datetime import timedelta
 from typing import Optional
 
 import requests
 from django.conf import settings
-from django.core.cache import cache
-from django.utils import timezone
+
+from utils.rate_limit import RateLimiter
 
 
 def validate_recaptcha(token: str, ip_address: Optional[str] = None) -> bool:
@@ -41,19 +40,8 @@ def validate_recaptcha(token: str, ip_address: Optional[str] = None) -> bool:
 
 def check_rate_limit(ip_address: str, action_type: str, max_requests: int = 3, window_minutes: int = 60) -> bool:
     """
-    Simple rate limiter based on IP address and action type.
+    Rate limiter based on IP address and action type.
     Returns True if the limit is exceeded.
     """
-    cache_key = f"rate_limit:{action_type}:{ip_address}"
-    now = timezone.now()
-    window_start = now - timedelta(minutes=window_minutes)
-
-    request_times = cache.get(cache_key, [])
-    request_times = [timestamp for timestamp in request_times if timestamp > window_start]
-
-    if len(request_times) >= max_requests:
-        return True
-
-    request_times.append(now)
-    cache.set(cache_key, request_times, window_minutes * 60)
-    return False
+    limiter = RateLimiter(max_requests, window_minutes * 60)
+    return not limiter.hit(f"{action_type}:{ip_address}").allowed
@@ -12,6 +12,7 @@ from utils.backup import (
     cleanup_old_backups,
     create_backup_archive,
 )
+from utils.view_counter import flush_view_counts
 
 logger = logging.getLogger(__name__)
 
@@ -78,3 +79,8 @@ def cleanup_expired_backups(self) -> None:
     cleanup_old_backups(days=retention_days)
     logger.info('Scheduled cleanup removed backups older than %s days.', retention_days)
 
+
+@shared_task(bind=True)
+def flush_pending_view_counts(self) -> int:
+    """Flush buffered view counts so they land even when no further views arrive."""
+    return flush_view_counts()
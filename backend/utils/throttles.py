@@ -3,32 +3,67 @@ Custom throttling classes for per-endpoint rate limiting.
 """
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle, SimpleRateThrottle
 
+from utils.rate_limit import RateLimiter
 
-class AnonBurstRateThrottle(AnonRateThrottle):
+
+class SlidingWindowThrottleMixin:
+    """
+    Check ``SimpleRateThrottle`` subclasses with the atomic sliding-window limiter.
+
+    DRF's default implementation keeps a list of request timestamps per client
+    in the cache and rewrites it with a non-atomic read-then-set; this keeps
+    ``get_cache_key``/rate handling and replaces only the counting.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.result = RateLimiter(self.num_requests, self.duration).hit(self.key)
+        return self.result.allowed
+
+    def wait(self):
+        result = getattr(self, 'result', None)
+        return result.retry_after if result is not None else None
+
+
+class SlidingAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    """Default throttle for anonymous users."""
+
+
+class SlidingUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    """Default throttle for authenticated users."""
+
+
+class AnonBurstRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
     """Throttle for anonymous users - burst requests."""
     scope = 'anon_burst'
     rate = '20/minute'
 
 
-class AnonSustainedRateThrottle(AnonRateThrottle):
+class AnonSustainedRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
     """Throttle for anonymous users - sustained requests."""
     scope = 'anon_sustained'
     rate = '100/hour'
 
 
-class UserBurstRateThrottle(UserRateThrottle):
+class UserBurstRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
     """Throttle for authenticated users - burst requests."""
     scope = 'user_burst'
     rate = '60/minute'
 
 
-class UserSustainedRateThrottle(UserRateThrottle):
+class UserSustainedRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
     """Throttle for authenticated users - sustained requests."""
     scope = 'user_sustained'
     rate = '1000/hour'
 
 
-class ChatbotRateThrottle(SimpleRateThrottle):
+class ChatbotRateThrottle(SlidingWindowThrottleMixin, SimpleRateThrottle):
     """Throttle for chatbot endpoint - stricter limits."""
     scope = 'chatbot'
     rate = '10/minute'
@@ -45,7 +80,7 @@ class ChatbotRateThrottle(SimpleRateThrottle):
         }
 
 
-class AuthRateThrottle(SimpleRateThrottle):
+class AuthRateThrottle(SlidingWindowThrottleMixin, SimpleRateThrottle):
     """Throttle for authentication endpoints - prevent brute force."""
     scope = 'auth'
     rate = '5/minute'
@@ -59,7 +94,7 @@ class AuthRateThrottle(SimpleRateThrottle):
         }
 
 
-class ContactFormRateThrottle(SimpleRateThrottle):
+class ContactFormRateThrottle(SlidingWindowThrottleMixin, SimpleRateThrottle):
     """Throttle for contact/inquiry forms - prevent spam."""
     scope = 'contact'
     rate = '3/hour'
@@ -73,7 +108,7 @@ class ContactFormRateThrottle(SimpleRateThrottle):
         }
 
 
-class AdminActionRateThrottle(UserRateThrottle):
+class AdminActionRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
     """Throttle for admin actions - moderate limits."""
     scope = 'admin_action'
     rate = '100/minute'
@@ -0,0 +1,247 @@
+"""
+Write-behind view counters for any model with an integer ``views`` field.
+
+Detail views record a hit instead of writing the row. Hits are buffered,
+deduplicated per viewer within a window, and periodically flushed as one
+``UPDATE ... SET views = views + n`` per distinct delta, so popular rows
+never become write hot spots and concurrent hits are never lost.
+
+With the Redis cache backend, buffers live in Redis (shared by all workers)
+and each hit is one Lua script call. Without Redis, or if Redis is
+unreachable, buffers are kept in process memory under a lock and each
+process flushes its own. Counts still pending when a process dies are lost;
+view counts are a popularity signal, not a ledger.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from utils.permissions import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'viewcounts:pending'
+FLUSH_LOCK_KEY = 'viewcounts:flush-lock'
+
+# KEYS: pending hash, dedupe marker
+# ARGV: counter member, dedupe window in seconds (0 disables dedupe)
+RECORD_VIEW_LUA = """
+if tonumber(ARGV[2]) > 0 then
+    if not redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[2]) then
+        return 0
+    end
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+return 1
+"""
+
+# KEYS: pending hash, key to claim it under
+CLAIM_PENDING_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+return 1
+"""
+
+
+def _member(instance, field: str) -> str:
+    return f"{instance._meta.label}:{field}:{instance.pk}"
+
+
+def _parse_member(member: str) -> Tuple[str, str, str]:
+    label, field, pk = member.split(':', 2)
+    return label, field, pk
+
+
+class LocalViewCounterBackend:
+    """In-process buffer of pending deltas and recently seen viewers."""
+
+    def __init__(self, maxsize: int = 100000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = defaultdict(int)
+        # Dedupe key -> expiry (monotonic)
+        self._seen: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, member: str, seen_key: Optional[str], window: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if seen_key and window > 0:
+                if self._seen.get(seen_key, 0) > now:
+                    return False
+                self._seen[seen_key] = now + window
+                if len(self._seen) > self.maxsize:
+                    self._seen = {key: expiry for key, expiry in self._seen.items() if expiry > now}
+            self._pending[member] += 1
+        return True
+
+    def claim(self, interval: float) -> Optional[Dict[str, int]]:
+        """Take the pending deltas if ``interval`` seconds passed since the last claim."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_flush < interval:
+                return None
+            self._last_flush = now
+            pending, self._pending = dict(self._pending), defaultdict(int)
+        return pending
+
+    def restore(self, deltas: Dict[str, int]) -> None:
+        with self._lock:
+            for member, delta in deltas.items():
+                self._pending[member] += delta
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._seen.clear()
+            self._last_flush = time.monotonic()
+
+
+class RedisViewCounterBackend:
+    """Pending deltas in one Redis hash; dedupe markers as expiring keys."""
+
+    def __init__(self, client) -> None:
+        self._client = client
+        self._record = client.register_script(RECORD_VIEW_LUA)
+        self._claim = client.register_script(CLAIM_PENDING_LUA)
+
+    def record(self, member: str, seen_key: Optional[str], window: int) -> bool:
+        keys = [cache.make_key(PENDING_KEY), cache.make_key(seen_key or 'viewcounts:unused')]
+        return bool(self._record(keys=keys, args=[member, window if seen_key else 0]))
+
+    def claim(self, interval: float) -> Optional[Dict[str, int]]:
+        """Take the shared pending hash, at most once per ``interval`` across all processes."""
+        if interval > 0 and not self._client.set(cache.make_key(FLUSH_LOCK_KEY), '1', nx=True, ex=max(1, int(interval))):
+            return None
+        claimed = cache.make_key(f"viewcounts:flushing:{uuid.uuid4().hex}")
+        if not self._claim(keys=[cache.make_key(PENDING_KEY), claimed]):
+            return {}
+        pending = self._client.hgetall(claimed)
+        self._client.delete(claimed)
+        return {member.decode() if isinstance(member, bytes) else member: int(delta) for member, delta in pending.items()}
+
+    def restore(self, deltas: Dict[str, int]) -> None:
+        pipe = self._client.pipeline()
+        for member, delta in deltas.items():
+            pipe.hincrby(cache.make_key(PENDING_KEY), member, delta)
+        pipe.execute()
+
+
+local_backend = LocalViewCounterBackend()
+_redis_backend: Optional[RedisViewCounterBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the Redis backend when the default cache is django-redis, else the in-process one."""
+    global _redis_backend
+    if _redis_backend is None and type(cache).__module__.startswith('django_redis'):
+        with _backend_lock:
+            if _redis_backend is None:
+                from django_redis import get_redis_connection
+                _redis_backend = RedisViewCounterBackend(get_redis_connection('default'))
+    return _redis_backend or local_backend
+
+
+def _viewer(request) -> str:
+    """Stable identity of the viewer: user, else session, else IP and user agent."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        return f"session:{session.session_key}"
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    return f"ip:{get_client_ip(request)}:{agent}"
+
+
+def _apply(deltas: Dict[str, int]) -> int:
+    """Write aggregated deltas; one UPDATE per model, field and distinct delta."""
+    grouped: Dict[Tuple[str, str, int], list] = defaultdict(list)
+    for member, delta in deltas.items():
+        if delta:
+            label, field, pk = _parse_member(member)
+            grouped[(label, field, delta)].append(pk)
+
+    updated = 0
+    with transaction.atomic():
+        for (label, field, delta), pks in grouped.items():
+            model = apps.get_model(label)
+            updated += model._default_manager.filter(pk__in=pks).update(**{field: F(field) + delta})
+    return updated
+
+
+def flush_view_counts(interval: float = 0, backend=None) -> int:
+    """
+    Write pending view counts to the database.
+
+    Args:
+        interval: Skip unless this many seconds passed since the last flush
+        backend: Counter backend (default: ``get_backend()``)
+
+    Returns:
+        Number of rows updated
+    """
+    backend = backend or get_backend()
+    try:
+        deltas = backend.claim(interval)
+    except Exception as exc:
+        logger.warning("View counter backend unavailable, flushing skipped: %s", exc)
+        return 0
+    if not deltas:
+        return 0
+    try:
+        return _apply(deltas)
+    except Exception:
+        logger.exception("Could not flush %d view counters; keeping them for the next flush", len(deltas))
+        try:
+            backend.restore(deltas)
+        except Exception:
+            logger.exception("Could not restore %d view counters; they are lost", len(deltas))
+        return 0
+
+
+def record_view(instance, request, field: str = 'views') -> bool:
+    """
+    Count a view of ``instance`` once per viewer per ``VIEW_COUNTER_DEDUPE_SECONDS``.
+
+    The row is not written here; the count reaches the database on the next
+    flush (at most every ``VIEW_COUNTER_FLUSH_SECONDS``).
+
+    Args:
+        instance: Saved model instance with an integer ``field``
+        request: Current request, used to identify the viewer
+        field: Counter field name
+
+    Returns:
+        True if the view was counted, False if it was a repeat
+    """
+    window = getattr(settings, 'VIEW_COUNTER_DEDUPE_SECONDS', 1800)
+    member = _member(instance, field)
+    viewer = hashlib.sha256(_viewer(request).encode('utf-8')).hexdigest()[:16]
+    seen_key = f"viewcounts:seen:{member}:{viewer}" if window > 0 else None
+
+    backend = get_backend()
+    try:
+        counted = backend.record(member, seen_key, window)
+    except Exception as exc:
+        if backend is local_backend:
+            raise
+        logger.warning("View counter backend unavailable, buffering in process: %s", exc)
+        backend = local_backend
+        counted = backend.record(member, seen_key, window)
+
+    flush_view_counts(getattr(settings, 'VIEW_COUNTER_FLUSH_SECONDS', 10), backend)
+    return counted
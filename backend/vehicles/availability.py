@@ -0,0 +1,129 @@
+"""
+Vehicle availability for date ranges.
+
+A vehicle is busy on the days of every claim assigned to it that is not
+cancelled (``bookings.models.BLOCKING_CLAIMS``); dates are inclusive at both
+ends. A claim with a start date but no end date is an open-ended hire and
+keeps the vehicle busy from its start onwards. Vehicles in maintenance are
+never free.
+
+On PostgreSQL the question is answered in the database: ``Claim.period`` is a
+generated ``daterange`` with a partial GiST index, so finding the vehicles
+with an overlapping claim reads only the overlapping claims, however much
+claim history accumulates. Other databases, which have no range types, load the
+claims that touch the requested window and answer with an in-memory
+``IntervalTree``; the tree also suits callers that ask many range questions
+about the same set of claims.
+"""
+import datetime
+from typing import Any, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Exists, OuterRef, Q
+
+from bookings.models import BLOCKING_CLAIMS, Claim
+
+from .models import Vehicle
+
+T = TypeVar('T')
+Interval = Tuple[Any, Any, T]
+
+
+class IntervalTree(Generic[T]):
+    """
+    Static interval tree over closed intervals ``(start, end, payload)``.
+
+    Intervals are kept sorted by start as an implicit balanced binary tree;
+    every node stores the largest end in its subtree, so an overlap query
+    skips subtrees that end before the query starts. Building is
+    O(n log n) and a query is O(log n + k) for k matches.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]) -> None:
+        self._items: List[Interval] = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._max_end: List[Any] = [None] * len(self._items)
+        self._build(0, len(self._items) - 1)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _build(self, low: int, high: int) -> Optional[Any]:
+        if low > high:
+            return None
+        mid = (low + high) // 2
+        max_end = self._items[mid][1]
+        for child in (self._build(low, mid - 1), self._build(mid + 1, high)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end) -> List[Interval]:
+        """Intervals sharing at least one point with ``[start, end]``, in start order."""
+        found: List[Interval] = []
+        stack = [(0, len(self._items) - 1)]
+        while stack:
+            low, high = stack.pop()
+            if low > high:
+                continue
+            mid = (low + high) // 2
+            if self._max_end[mid] < start:
+                # Nothing in this subtree reaches the query
+                continue
+            item = self._items[mid]
+            if item[0] <= end:
+                if item[1] >= start:
+                    found.append(item)
+                # Later starts may still be inside the query
+                stack.append((mid + 1, high))
+            stack.append((low, mid - 1))
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+
+def claim_intervals(start: datetime.date, end: datetime.date) -> IntervalTree[int]:
+    """Tree of blocking claims touching ``[start, end]``, with vehicle ids as payloads."""
+    rows = (
+        Claim.objects.filter(BLOCKING_CLAIMS, Q(end_date__isnull=True) | Q(end_date__gte=start), start_date__lte=end)
+        .values_list('start_date', 'end_date', 'vehicle_id')
+    )
+    # Open-ended claims run to the end of time
+    return IntervalTree((row_start, row_end or datetime.date.max, vehicle_id) for row_start, row_end, vehicle_id in rows
+                        if row_end is None or row_start <= row_end)
+
+
+def busy_vehicle_ids(start: datetime.date, end: datetime.date, tree: Optional[IntervalTree[int]] = None) -> Set[int]:
+    """Ids of vehicles with a blocking claim in ``[start, end]``, answered in memory."""
+    tree = tree if tree is not None else claim_intervals(start, end)
+    return {vehicle_id for _, _, vehicle_id in tree.overlapping(start, end)}
+
+
+def free_vehicles(start: datetime.date, end: datetime.date, queryset=None, in_memory: Optional[bool] = None):
+    """
+    Vehicles free on every day from ``start`` to ``end`` inclusive.
+
+    Args:
+        start: First day needed
+        end: Last day needed
+        queryset: Vehicles to choose from, e.g. filtered by type (default: all)
+        in_memory: Use the interval tree instead of the database range query
+            (default: only when the database is not PostgreSQL)
+
+    Returns:
+        Queryset of free vehicles
+    """
+    if queryset is None:
+        queryset = Vehicle.objects.all()
+    queryset = queryset.exclude(status='maintenance')
+    if in_memory is None:
+        in_memory = connection.vendor != 'postgresql'
+    if in_memory:
+        return queryset.exclude(pk__in=busy_vehicle_ids(start, end))
+
+    booked = Claim.objects.filter(
+        BLOCKING_CLAIMS,
+        vehicle=OuterRef('pk'),
+        period__overlap=DateRange(start, end, '[]'),
+    )
+    return queryset.filter(~Exists(booked))
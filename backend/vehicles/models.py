@@ -38,6 +38,8 @@ class Vehicle(models.Model):
     fuel_type = models.CharField(max_length=20, choices=FUEL_CHOICES, default='petrol')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     image = models.ImageField(upload_to='vehicles/', null=True, blank=True)
+    # Optimized copy and renditions written by utils.media_pipeline
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
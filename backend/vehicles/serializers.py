@@ -2,11 +2,13 @@ from decimal import Decimal
 
 from rest_framework import serializers
 
+from utils.media_pipeline import rendition_urls
 from .models import Vehicle
 
 
 class VehicleSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Vehicle
@@ -19,6 +21,9 @@ class VehicleSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj.image, obj.image_renditions, self.context.get('request'))
+
 
 class VehicleCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -48,3 +53,12 @@ class VehicleCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class VehicleAvailabilityQuerySerializer(serializers.Serializer):
+    """Query parameters of the free-vehicles endpoint."""
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'End date must be on or after start date.'})
+        return attrs
@@ -1,8 +1,16 @@
+import datetime
+import random
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from accounts.models import User
+from bookings.models import Claim
+from .availability import IntervalTree, free_vehicles
 from .models import Vehicle
 
 
@@ -39,3 +47,88 @@ class VehicleAPITests(APITestCase):
         response = self.client.post(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Vehicle.objects.filter(registration='AUDI001').exists())
+
+
+def book(vehicle, start, end, claim_status='approved'):
+    return Claim.objects.create(
+        first_name='Test', last_name='Driver', email='driver@example.com', phone='0123',
+        address='1 Street', accident_date=datetime.date(2025, 1, 1), vehicle_registration='AB12CDE',
+        insurance_company='Insurer', policy_number='P1', accident_details='Rear ended',
+        vehicle=vehicle, start_date=start, end_date=end, pickup_location='A', drop_location='B',
+        status=claim_status,
+    )
+
+
+class VehicleAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.suv = Vehicle.objects.create(name='SUV 1', type='suv', registration='SUV1')
+        self.booked_suv = Vehicle.objects.create(name='SUV 2', type='suv', registration='SUV2')
+        self.sedan = Vehicle.objects.create(name='Sedan', type='sedan', registration='SED1')
+        self.workshop = Vehicle.objects.create(name='SUV 3', type='suv', registration='SUV3', status='maintenance')
+        book(self.booked_suv, datetime.date(2025, 6, 10), datetime.date(2025, 6, 15))
+        book(self.suv, datetime.date(2025, 6, 1), datetime.date(2025, 6, 30), claim_status='cancelled')
+        self.url = reverse('vehicle-available')
+
+    def free_ids(self, start, end, **kwargs):
+        return set(free_vehicles(start, end, **kwargs).values_list('pk', flat=True))
+
+    def test_overlapping_claims_block_inclusive_dates(self):
+        june = datetime.date(2025, 6, 1)
+        self.assertNotIn(self.booked_suv.pk, self.free_ids(june.replace(day=15), june.replace(day=20)))
+        self.assertNotIn(self.booked_suv.pk, self.free_ids(june.replace(day=1), june.replace(day=10)))
+        self.assertIn(self.booked_suv.pk, self.free_ids(june.replace(day=16), june.replace(day=20)))
+        # Cancelled claims and maintenance
+        self.assertIn(self.suv.pk, self.free_ids(june.replace(day=12), june.replace(day=12)))
+        self.assertNotIn(self.workshop.pk, self.free_ids(june.replace(day=1), june.replace(day=2)))
+
+    def test_open_ended_claims_block_from_their_start(self):
+        book(self.sedan, datetime.date(2025, 6, 10), None)
+        for in_memory in (False, True):
+            free = self.free_ids(datetime.date(2026, 1, 1), datetime.date(2026, 1, 2), in_memory=in_memory)
+            self.assertNotIn(self.sedan.pk, free)
+            free = self.free_ids(datetime.date(2025, 6, 1), datetime.date(2025, 6, 9), in_memory=in_memory)
+            self.assertIn(self.sedan.pk, free)
+
+    def test_in_memory_matches_database(self):
+        rng = random.Random(7)
+        base = datetime.date(2025, 1, 1)
+        for index in range(40):
+            start = base + datetime.timedelta(days=rng.randrange(300))
+            book(self.sedan if index % 2 else self.suv, start, start + datetime.timedelta(days=rng.randrange(10)))
+        for _ in range(50):
+            start = base + datetime.timedelta(days=rng.randrange(300))
+            end = start + datetime.timedelta(days=rng.randrange(15))
+            self.assertEqual(self.free_ids(start, end), self.free_ids(start, end, in_memory=True))
+
+    def test_endpoint_filters_by_type_in_one_query(self):
+        params = {'start_date': '2025-06-12', 'end_date': '2025-06-13', 'type': 'suv'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.suv.pk])
+        # Page count and page rows
+        self.assertEqual(len(queries.captured_queries), 2)
+
+    def test_endpoint_validates_dates(self):
+        response = self.client.get(self.url, {'start_date': '2025-06-12', 'end_date': '2025-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'start_date': '2025-06-12'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_linear_scan(self):
+        rng = random.Random(3)
+        intervals = []
+        for index in range(300):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(50), index))
+        tree = IntervalTree(intervals)
+        for _ in range(200):
+            start = rng.randrange(1050)
+            end = start + rng.randrange(30)
+            expected = sorted(item for item in intervals if item[0] <= end and item[1] >= start)
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(IntervalTree([]).overlapping(1, 2), [])
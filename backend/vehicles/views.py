@@ -4,8 +4,11 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from .availability import free_vehicles
 from .models import Vehicle
-from .serializers import VehicleSerializer, VehicleCreateSerializer
+from .serializers import VehicleAvailabilityQuerySerializer, VehicleSerializer, VehicleCreateSerializer
+from utils.cache import CachedListMixin
+from utils.conditional import ConditionalGetMixin
 from utils.permissions import IsAdmin, IsPublicOrAdmin
 
 
@@ -21,23 +24,16 @@ class VehicleFilter(filters.FilterSet):
         fields = ['type', 'status', 'transmission', 'fuel_type', 'seats']
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet):
+    cache_namespace = 'vehicles'
     queryset = Vehicle.objects.all().order_by('-created_at')
     filter_backends = [DjangoFilterBackend]
     filterset_class = VehicleFilter
     
     def get_queryset(self):
-        """Optimize queryset with select_related/prefetch_related."""
-        queryset = Vehicle.objects.all().order_by('-created_at')
-        
-        # For list views, we can use only() to limit fields
-        if self.action == 'list':
-            queryset = queryset.only(
-                'id', 'name', 'manufacturer', 'model', 'type', 'status',
-                'daily_rate', 'image', 'created_at'
-            )
-        
-        return queryset
+        # VehicleSerializer renders every column, so deferring any of them
+        # would reload it with one query per row
+        return Vehicle.objects.all().order_by('-created_at')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -45,7 +41,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
         return VehicleSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'available']:
             permission_classes = [IsPublicOrAdmin]
         else:
             permission_classes = [IsAdmin]
@@ -64,3 +60,21 @@ class VehicleViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(vehicle)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        Vehicles free for every day of ``start_date``..``end_date`` (inclusive).
+
+        Accepts the list filters (``type``, ``transmission``, ...) as well.
+        """
+        params = VehicleAvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = free_vehicles(
+            params.validated_data['start_date'],
+            params.validated_data['end_date'],
+            self.filter_queryset(self.get_queryset()),
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
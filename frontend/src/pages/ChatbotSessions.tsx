@@ -31,7 +31,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from "@/components/ui/dialog";
-import { chatbotApi, type Conversation } from "@/services/chatbotApi";
+import { chatbotApi, type Conversation, type ConversationMessage } from "@/services/chatbotApi";
 import { useToast } from "@/hooks/use-toast";
 
 
@@ -46,6 +46,10 @@ const ChatbotSessions = () => {
   const [searchQuery, setSearchQuery] = useState("");
   const [statusFilter, setStatusFilter] = useState<string>("all");
   const [selectedConversation, setSelectedConversation] = useState<Conversation | null>(null);
+  // Transcript of the selected conversation, oldest first, loaded a page at a time
+  const [messages, setMessages] = useState<ConversationMessage[]>([]);
+  const [olderMessagesCursor, setOlderMessagesCursor] = useState<string | null>(null);
+  const [isLoadingMessages, setIsLoadingMessages] = useState(false);
   const [showConversationModal, setShowConversationModal] = useState(false);
   const [manualReplyMessage, setManualReplyMessage] = useState("");
   const [isManualReplyLoading, setIsManualReplyLoading] = useState(false);
@@ -99,9 +103,41 @@ const ChatbotSessions = () => {
     return matchesSearch;
   });
 
-  const handleViewConversation = (conversation: Conversation) => {
+  const loadMessages = async (conversationId: number, cursor?: string | null) => {
+    setIsLoadingMessages(true);
+    try {
+      // Pages come newest first; earlier pages are prepended
+      const page = await chatbotApi.getConversationMessages(conversationId, cursor);
+      const older = [...page.results].reverse();
+      setMessages(current => (cursor ? [...older, ...current] : older));
+      setOlderMessagesCursor(page.next);
+    } catch (error: any) {
+      toast({
+        title: "Failed to load messages",
+        description: error?.message || "Please try again.",
+        variant: "destructive",
+      });
+    } finally {
+      setIsLoadingMessages(false);
+    }
+  };
+
+  const handleViewConversation = async (conversation: Conversation) => {
+    // The list row already has everything but the transcript
     setSelectedConversation(conversation);
+    setMessages([]);
+    setOlderMessagesCursor(null);
     setShowConversationModal(true);
+    await loadMessages(conversation.id);
+    if (conversation.unread_count > 0) {
+      chatbotApi.markConversationRead(conversation.id)
+        .then(() => setConversations(current => current.map(conv =>
+          conv.id === conversation.id ? { ...conv, unread_count: 0 } : conv
+        )))
+        .catch(() => {
+          // The badge simply stays until the next reload
+        });
+    }
   };
 
   const handleToggleManualReply = async () => {
@@ -140,9 +176,8 @@ const ChatbotSessions = () => {
         description: "Your reply has been sent successfully.",
       });
       setManualReplyMessage("");
-      // Reload conversation to get updated messages
-      const updatedConv = await chatbotApi.getConversation(selectedConversation.id);
-      setSelectedConversation(updatedConv);
+      // Show the reply without reloading the transcript
+      setMessages(current => [...current, response.sent_message]);
       loadConversations();
     } catch (error: any) {
       toast({
@@ -317,9 +352,17 @@ const ChatbotSessions = () => {
                             </TableCell>
                             <TableCell>
                               <div className="space-y-1">
-                                <div className="font-medium">
+                                <div className="font-medium flex items-center gap-2">
                                   {conv.user_name || "Anonymous"}
+                                  {conv.unread_count > 0 && (
+                                    <Badge variant="destructive">{conv.unread_count} unread</Badge>
+                                  )}
                                 </div>
+                                {conv.last_message_preview && (
+                                  <div className="text-sm text-muted-foreground truncate max-w-xs">
+                                    {conv.last_message_preview}
+                                  </div>
+                                )}
                                 {conv.user_email && (
                                   <div className="text-sm text-muted-foreground">
                                     {conv.user_email}
@@ -439,12 +482,24 @@ const ChatbotSessions = () => {
 
               {/* Messages Container */}
               <div className="flex-1 overflow-y-auto px-6 py-4 space-y-4 bg-gradient-to-b from-background to-muted/20">
-                {selectedConversation.messages.length === 0 ? (
+                {olderMessagesCursor && (
+                  <div className="text-center">
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      disabled={isLoadingMessages}
+                      onClick={() => loadMessages(selectedConversation.id, olderMessagesCursor)}
+                    >
+                      Load earlier messages
+                    </Button>
+                  </div>
+                )}
+                {messages.length === 0 ? (
                   <div className="text-center text-muted-foreground py-8">
-                    No messages yet
+                    {isLoadingMessages ? "Loading messages..." : "No messages yet"}
                   </div>
                 ) : (
-                  selectedConversation.messages.map((msg) => {
+                  messages.map((msg) => {
                     const isUser = msg.message_type === 'user';
                     const isAdmin = msg.message_type === 'admin' || msg.is_admin_reply;
                     const isAssistant = msg.message_type === 'assistant' && !isAdmin;
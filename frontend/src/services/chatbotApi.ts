@@ -35,8 +35,20 @@ export interface Conversation {
   started_at: string;
   ended_at: string | null;
   last_activity: string;
-  messages: ConversationMessage[];
+  // Inbox summary; the transcript is paged with getConversationMessages
   message_count: number;
+  unread_count: number;
+  last_message_id: number | null;
+  last_message_at: string | null;
+  last_message_type: ConversationMessage['message_type'] | '';
+  last_message_preview: string;
+  last_read_message_id: number | null;
+}
+
+// One page of a transcript, newest first; pass `next` back as the cursor for older messages
+export interface ConversationMessagePage {
+  next: string | null;
+  results: ConversationMessage[];
 }
 
 export interface ConversationMessage {
@@ -134,6 +146,26 @@ export const chatbotApi = {
     return response.json();
   },
 
+  async getConversationMessages(id: number, cursor?: string | null): Promise<ConversationMessagePage> {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    const response = await authFetch(`${CONVERSATIONS_URL}${id}/messages/?${params.toString()}`);
+    if (!response.ok) {
+      throw new Error("Unable to load messages.");
+    }
+    return response.json();
+  },
+
+  async markConversationRead(id: number): Promise<{ unread_count: number; last_read_message_id: number | null }> {
+    const response = await authFetch(`${CONVERSATIONS_URL}${id}/mark_read/`, {
+      method: "POST",
+    });
+    if (!response.ok) {
+      throw new Error("Unable to mark conversation read.");
+    }
+    return response.json();
+  },
+
   async toggleManualReply(id: number): Promise<{ message: string; manual_reply_active: boolean }> {
     const response = await authFetch(`${CONVERSATIONS_URL}${id}/toggle_manual_reply/`, {
       method: "POST",
@@ -145,7 +177,7 @@ export const chatbotApi = {
     return response.json();
   },
 
-  async sendManualReply(id: number, message: string): Promise<{ message: string }> {
+  async sendManualReply(id: number, message: string): Promise<{ message: string; sent_message: ConversationMessage }> {
     const response = await authFetch(`${CONVERSATIONS_URL}${id}/send_manual_reply/`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
@@ -1,5 +1,6 @@
 import { withBasePath } from './apiConfig';
 import { authFetch } from './authFetch';
+import { hasStoredSession } from './authStorage';
 
 export interface ThemeConfig {
   name: string;
@@ -64,6 +65,8 @@ export const themeApi = {
         Accept: 'application/json',
       },
       credentials: 'include', // Include cookies for session
+      // Visitors may reuse the publicly cached theme; signed-in admins revalidate so edits and previews show at once
+      cache: hasStoredSession() ? 'no-cache' : 'default',
     });
 
     if (!response.ok) {